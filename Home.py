@@ -1,12 +1,19 @@
 import streamlit as st
 import pandas as pd
 import re
-from typing import Any
+import time
+from typing import Any, Optional
 import logging
 logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
 # logging.basicConfig(level=logging.INFO, filename='logs/page_home.log', filemode='w', format='%(name)s - %(levelname)s - %(message)s')
-from utils.streamlit_utilities import gradient, local_css, init_to_null
+from utils.streamlit_utilities import gradient, local_css, init_to_null, set_titles
+from utils.frame_cache import cache_frame_data
 from utils.imdb_acquisition import IMDB
+from utils.scrape_manager import ScrapeTask, get_scrape_manager
+from utils.list_registry import LIST_TTL
+from utils.frame_store import get_frame_store
+from utils.quiz import DEFAULT_FILTERS, Verdict, get_quiz_deck, judge_guess
+from utils.title_index import TitleIndex
 from utils.palettes import blue_bath1, streamlit_blue, fft_knight_male
 import utils.utilities as utl
 
@@ -15,15 +22,18 @@ import utils.utilities as utl
 class PageHome():
     """Layout class for Home page.
     """
+    POLL_SECONDS = 1.0      ## how often the page reruns to show a background scrape's progress
+
     def __init__(self):
         st.set_page_config(page_title="IMDb Lists", layout="wide", page_icon='🎥', initial_sidebar_state="expanded")
         # local_css("style/style.css")
         self.initialize_state()
+        self.scrape_running = False
         # st.sidebar.markdown(info['Photo'], unsafe_allow_html=True)
         self.page_header()
         
-        if st.session_state.df is not None:
-            self.df = st.session_state.df
+        if st.session_state.df_handle is not None:
+            self.df = st.session_state.df_handle.frame()
 
         self.get_list_input()
 
@@ -34,13 +44,17 @@ class PageHome():
         if st.session_state.list_processed:
             self.name_that_film(self.df)
 
+        if self.scrape_running:
+            self.poll_scrape()
+
 
     def initialize_state(self):
         state = st.session_state
         init_to_null(state, 'list_id', None)
         init_to_null(state, 'list_processed', False)
         init_to_null(state, 'film_frame', False)
-        init_to_null(state, 'df', None)
+        init_to_null(state, 'df_handle', None)    ## FrameHandle of the list shown; the frame itself is shared by every session
+        init_to_null(state, 'scrape_job', None)
         init_to_null(state, 'demo_name', None)
         init_to_null(state, 'url', None)
         init_to_null(state, 'correct_guesses', 0)
@@ -49,9 +63,11 @@ class PageHome():
         init_to_null(state, 'film_guess', False)
         init_to_null(state, 'show_answer', False)
         init_to_null(state, 'film_title', None)
+        init_to_null(state, 'film_title_norm', None)    ## clean_film_name() of film_title, what guesses are checked against
         init_to_null(state, 'film_description', None)
         init_to_null(state, 'guessed_titles', [])
-        init_to_null(state, 'used_films', [])
+        init_to_null(state, 'quiz_deck', None)          ## QuizDeck of the list's films not yet drawn this session
+        init_to_null(state, 'quiz_filters', DEFAULT_FILTERS)    ## which films the quiz draws from, see utils.quiz
         init_to_null(state, 'completed_game', False)
         init_to_null(state, 'all_films_used', False)
         
@@ -90,44 +106,99 @@ class PageHome():
 
                         ## Oscar Best Pictures
                         # self.url = st.text_input("Paste the URL of the IMDb list you want to scrape (any page of the list is fine):", key='list_url_input', value='https://www.imdb.com/list/ls524226422/?ref_=tt_c_osc_csegosc_bpwinners_cta').strip()
+                        refresh = st.checkbox("Only fetch what's new since this list was last scraped", value=True, key='refresh_input')
+                        ttl_hours = st.number_input("Reuse a copy of the list scraped within the last (hours)", min_value=0, value=LIST_TTL // 3600, step=1, key='list_ttl_input',
+                                                    help='0 always scrapes the list again.')
                         submitted = st.form_submit_button("Submit")
                         if submitted:
                             if 'www.imdb.com/list/' in self.url or 'www.imdb.com/user/' in self.url:
                                 get_list_id(self.url)
-                                with st.spinner('Scraping...'):
-                                    self.acquire_list(self.url)
-                                st.success('List scraped successfully!', icon='✅')
-                                st.session_state.film_frame = True
+                                self.acquire_list(self.url, refresh, ttl_hours * 3600)
                             else:
                                 st.write('Provided URL not of an IMDb list. Please try again.')
+                        elif st.session_state.scrape_job is not None:
+                            ## page was rerun (or reopened) mid-scrape.  The scrape carried on in the background, so pick it back up.
+                            self.follow_scrape(get_scrape_manager().get(st.session_state.scrape_job))
             with col2:
                 if st.button('Or use a Demo List', key='demo_list_button'):
                     self.demo_list(fname='wff')
                     st.session_state.film_frame = True
-                if st.session_state.df is not None:
-                    self.save_list_to_csv(st.session_state.df)
-
-    def acquire_list(self, url):
-        '''load page based on user input'''
-        self.imdb = IMDB(url)
-        self.df = self.imdb.df
-        st.session_state.df = self.df
+                if st.session_state.df_handle is not None:
+                    self.save_list_to_csv(st.session_state.df_handle.frame())
+
+    def acquire_list(self, url, refresh: bool=False, ttl: float=0):
+        '''load page based on user input.  A list scraped within ttl seconds is served from its saved copy right away.
+        Otherwise the scrape runs in the background, shared with any other session scraping the same list.  A ttl of 0 fetches every page from IMDb
+        again rather than from the response cache.
+        With refresh, a list scraped before is brought up to date from its saved copy, fetching only the pages that changed.'''
+        frame = IMDB(url, scrape=False).load_registered(st.session_state.list_id, ttl) if ttl > 0 else None
+        if frame is not None:
+            self.df = self.keep_frame(st.session_state.list_id, frame)
+            st.success('Loaded the copy of this list scraped earlier.', icon='✅')
+            st.session_state.film_frame = True
+            return self.df
+
+        task = get_scrape_manager().submit(url, refresh, revalidate=ttl <= 0)
+        st.session_state.scrape_job = task.list_id
+        return self.follow_scrape(task)
+
+    def follow_scrape(self, task: Optional[ScrapeTask]):
+        '''show a background scrape's progress, previewing the films processed so far.  While it runs, the page is drawn once and rerun by
+        poll_scrape(), rather than the script waiting on the scrape; once it's finished, its list is kept'''
+        if task is None:
+            st.session_state.scrape_job = None
+            return None
+        if not task.done.is_set():
+            self.streaming_preview(task)
+            self.scrape_running = True
+            return None
+        st.session_state.scrape_job = None
+
+        if task.state == 'failed':
+            st.error(f'🚨 List acquisition failed: {task.error}')
+            return None
+        st.session_state.df_handle = task.handle     ## the task already put its list in the shared store
+        self.df = task.handle.frame()
+        st.success('List scraped successfully!', icon='✅')
+        st.session_state.film_frame = True
+        return self.df
+
+    def poll_scrape(self):
+        '''rerun the page shortly to show more of the scrape.  Called once the rest of the page is drawn, so the session stays usable meanwhile'''
+        time.sleep(self.POLL_SECONDS)
+        st.rerun()
+
+    def streaming_preview(self, task: ScrapeTask):
+        '''growing preview of a list while the rest of it is scraped'''
+        progress = task.progress()
+        pages = max(progress['pages'], progress['pages_done'], 1)
+        eta = f", ~{progress['eta']:.0f} seconds left" if progress['eta'] is not None else ''
+        st.progress(progress['pages_done'] / pages, text=f"Scraping... {progress['films']:,} films from {progress['pages_done']} of {pages} pages{eta}")
+        frame = task.frame()
+        if frame is not None:
+            st.dataframe(self.format_frame(frame).set_index('title').head(5))
+            self.intro_summary(frame)
 
     def demo_list(self, fname: str='rando'):
         st.markdown(f'<font color={streamlit_blue}>Using a pre-saved list.</font>', unsafe_allow_html=True)
         st.session_state.demo_name = {'rando': 'imdb_demo_list_big_rando',
-                                        'wff': 'imdb_demo_list_WFF',
-                                        'small': 'imdb_demo_list_small'}[fname]
-        self.df = pd.read_csv(f'data/input/{st.session_state.demo_name}.csv')
-        st.session_state.df = self.df
+                                        'wff': 'imdb_demo_list_wff',
+                                        'small': 'imdb_demo_list_SMALL'}[fname]
+        st.session_state.df_handle = get_frame_store().share_file(st.session_state.demo_name, f'data/input/{st.session_state.demo_name}.parquet')
+        self.df = st.session_state.df_handle.frame()
+
+    def keep_frame(self, list_id: str, frame: pd.DataFrame) -> pd.DataFrame:
+        '''put frame in the shared store and keep just its handle in the session'''
+        st.session_state.df_handle = get_frame_store().share(list_id, frame)
+        return st.session_state.df_handle.frame()
 
     def save_list_to_csv(self, frame: pd.DataFrame):
         '''download list of films to local machine'''
-        @st.cache_data
+        @cache_frame_data
         def convert_df(df):
-            return df.to_csv().encode('utf-8')
+            return df.set_index('title').to_csv().encode('utf-8')
 
-        csv = convert_df(frame.set_index('title'))
+        csv = convert_df(frame)
         savename = f'imdb_list_{st.session_state.list_id}.csv' if st.session_state.list_id else f'{st.session_state.demo_name}.csv'
 
         st.download_button(
@@ -180,26 +251,25 @@ class PageHome():
 
     def name_that_film(self, frame: pd.DataFrame):
         '''show a random film from the list'''
+        titles = set_titles()
+        titles = TitleIndex.from_frame(frame) if titles is None else titles     ## guesses are matched against the list's titles
         
         def header():
             gradient(grad_clr1=blue_bath1[1], grad_clr2=blue_bath1[3], title_clr=blue_bath1[5], subtitle_clr='#fcfbfb', title=f"🤔 How Well Do You Know Film?", subtitle="A Quiz On Your List", htag_lvl=3, title_size=45, subtitle_size=23)
        
         def set_title_and_description():
                 if not st.session_state.film_title: 
-                    film = frame[frame['genre1'].ne('Documentary')].sample(1) ## maybe show info about film upon completion
-                    
-                    if set(frame['title'].values).issubset(st.session_state.used_films):
+                    st.session_state.quiz_deck = get_quiz_deck(st.session_state.quiz_deck, frame, st.session_state.quiz_filters)
+                    row = st.session_state.quiz_deck.draw()
+                    if row is None:
                         st.write(f"""<BR><div align=center><font size="6" color={fft_knight_male[5]}>Game Over -- All films used!</font></div>""", unsafe_allow_html=True)
                         st.session_state.update(completed_game=True, all_films_used=True)
+                        return
 
-                    if st.session_state.all_films_used == False: ## prevent infinite loop
-                        while film['title'].values[0] in st.session_state.used_films:
-                            film = frame[frame['genre1'].ne('Documentary')].sample(1)
-                    st.session_state.film_title = film['title'].values[0]
-                    st.session_state.used_films.append(film['title'].values[0])
-
-                if not st.session_state.film_description: 
-                    st.session_state.film_description = film['description'].values[0]
+                    film = frame.iloc[row]      ## maybe show info about film upon completion
+                    st.session_state.film_title = film['title']
+                    st.session_state.film_title_norm = film['title_norm'] if 'title_norm' in frame.columns else utl.clean_film_name(film['title'])
+                    st.session_state.film_description = film['description']
      
         def show_description():
             st.markdown(f"**<BR><BR> <div align=center>Here's a description of a film from the list you just scraped - what's its name?**</font>", unsafe_allow_html=True)
@@ -214,29 +284,34 @@ class PageHome():
                     st.session_state.single_film_guesses += 1
                     st.session_state.total_session_guesses += 1
                     st.session_state.guessed_titles.append(ans)
-                    if utl.clean_film_name(ans) == utl.clean_film_name(st.session_state.film_title):
-                        st.write("""<div align=center><font size="5">✅ Correct!</font></div>""", unsafe_allow_html=True)
+                    verdict = judge_guess(titles, ans, st.session_state.film_title_norm)
+                    if verdict.correct:
+                        close = '' if verdict.exact else f' It\'s "{st.session_state.film_title}".'        ## a typo, or 'II' for '2'
+                        st.write(f"""<div align=center><font size="5">✅ Correct!{close}</font></div>""", unsafe_allow_html=True)
                         st.session_state.correct_guesses += 1
                     else:
                         st.write(f"""<div align=center><font size="5">"{ans}" is <font color={fft_knight_male[5]}>incorrect.</font></div>""", unsafe_allow_html=True)
-                        
-                return ans
+                        if verdict.suggestions:
+                            st.write(f"""<div align=center>Did you mean {' or '.join(f'"{title}"' for title in frame['title'].iloc[verdict.suggestions])}?</div>""", unsafe_allow_html=True)
+                    return verdict
+                return Verdict(False, False, [])
 
         def show_answer_text(text: str=''):
             st.write(f"""<div align=center>{text}<font color="{streamlit_blue}" size="10">{st.session_state.film_title}</font></div>""", unsafe_allow_html=True)
-            st.session_state.update(film_description=None, film_title=None, guessed_titles=[], single_film_guesses=0, film_guess=False, completed_game=True)
+            st.session_state.update(film_description=None, film_title=None, film_title_norm=None, guessed_titles=[], single_film_guesses=0, film_guess=False, completed_game=True)
             play_again()
 
-        def parse_answer(ans):
+        def parse_answer(verdict):
             if st.session_state.film_guess and st.session_state.completed_game == False:
+                correct = verdict.correct
 
                 ## No more guesses
-                if st.session_state.single_film_guesses == 3 and utl.clean_film_name(ans) != utl.clean_film_name(st.session_state.film_title):
+                if st.session_state.single_film_guesses == 3 and not correct:
                     answer_text = 'Strike number three... The film is: <BR>'
                     st.session_state.show_answer = True
 
                 ## Correct guess
-                elif utl.clean_film_name(ans) == utl.clean_film_name(st.session_state.film_title):
+                elif correct:
                     answer_text = ''
                     st.session_state.show_answer = True
                     
@@ -262,7 +337,7 @@ class PageHome():
 
         def play_again():
             st.markdown('<BR><BR>', unsafe_allow_html=True)
-            if st.button('Play Again', key='play_again_button', use_container_width=True, on_click=lambda: st.session_state.update(film_guess=False, show_answer=False, film_description=None, film_title=None, guessed_titles=[], single_film_guesses=0, completed_game=False)):
+            if st.button('Play Again', key='play_again_button', use_container_width=True, on_click=lambda: st.session_state.update(film_guess=False, show_answer=False, film_description=None, film_title=None, film_title_norm=None, guessed_titles=[], single_film_guesses=0, completed_game=False)):
                 header()    ## restart game with new random selection
 
         def show_total_sesh_stats():
@@ -282,8 +357,9 @@ class PageHome():
                 play_again()
             else:    
                 set_title_and_description()
-                show_description()
-                parse_answer(get_answer_form())
+                if st.session_state.all_films_used == False:
+                    show_description()
+                    parse_answer(get_answer_form())
 
         show_total_sesh_stats()
 
@@ -0,0 +1,59 @@
+'''Benchmark a cache hit on a page's transform_frame: st.cache_data hashing the whole DataFrame argument to find the entry, against
+cache_frame_data keying a SharedFrame on its fingerprint.  Both return the same cached result; only finding it differs.
+Runs inside a Streamlit script (AppTest), as st.cache_data doesn't cache outside one.
+
+Run from the repo root:
+    python -m benchmarks.bench_cache_keys
+    python -m benchmarks.bench_cache_keys --films 10000 50000
+Lists are built as in bench_columns; Streamlit samples frames of 50k+ rows when hashing, so larger lists cost it less per row.
+'''
+import argparse
+import tempfile
+from streamlit.testing.v1 import AppTest
+from utils.frame_store import get_frame_store
+from utils.imdb_acquisition import IMDB
+from benchmarks.bench_columns import scraped_films, columnar
+
+SCRIPT = '''
+import statistics, time
+import streamlit as st
+from utils.frame_store import FrameHandle
+from utils.frame_cache import cache_frame_data
+
+def top_directors(df, x, n):
+    return df[df[x] > 0].groupby('director', observed=True)[x].mean().round(1).sort_values(ascending=False).head(n).to_frame()
+
+def timed_hits(func, frame):
+    func(frame, 'combo_score', 10)      ## miss, fills the cache
+    secs = []
+    for _ in range({repeats}):
+        start = time.perf_counter()
+        func(frame, 'combo_score', 10)
+        secs.append(time.perf_counter() - start)
+    return statistics.median(secs)
+
+shared = FrameHandle(*{handle}).frame()
+plain = timed_hits(st.cache_data(top_directors), shared.copy())
+fingerprinted = timed_hits(cache_frame_data(top_directors), shared)
+st.write(f'{{len(shared):>7,}} films   st.cache_data hit {{plain * 1000:7.2f}} ms   cache_frame_data hit {{fingerprinted * 1000:6.2f}} ms   {{plain / fingerprinted:6.1f}}x')
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, nargs='+', default=[1000, 10000, 40000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    store = get_frame_store(tempfile.mkdtemp())
+    for n in args.films:
+        handle = store.share(f'bench{n}', imdb.process_frame(columnar(imdb, scraped_films(n, imdb))).reset_index(drop=True))
+        at = AppTest.from_string(SCRIPT.format(repeats=args.repeats, handle=tuple(handle)), default_timeout=300).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        print(at.markdown[0].value)
+
+
+if __name__ == '__main__':
+    main()
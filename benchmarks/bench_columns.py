@@ -0,0 +1,68 @@
+'''Benchmark building the list frame: scraped films collected in a dict of dicts and transposed into an object frame (create_frame,
+as scrape_list used to) against FilmColumns, which types each value as it's appended.  Times the build and process_frame and
+records peak traced memory, and checks both end in the same saved CSV.
+
+Run from the repo root:
+    python -m benchmarks.bench_columns
+    python -m benchmarks.bench_columns --films 50000
+Films are parsed from 100 tests/list_pages.py film blocks, then copied under new titles up to --films.
+'''
+import argparse
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from utils.imdb_acquisition import IMDB, FilmColumns
+from tests.list_pages import film_html
+
+
+def scraped_films(n: int, imdb: IMDB) -> list:
+    parsed = [imdb.get_film_data(BeautifulSoup(film_html(rank), 'html.parser').div) for rank in range(1, 101)]
+    return [dict(parsed[i % 100], title=f'Film Number {i + 1}', title_id=f'tt{i + 1:07d}') for i in range(n)]
+
+
+def legacy(imdb: IMDB, films: list):
+    all_films = {}
+    for data in films:
+        all_films[data['title']] = data
+    return imdb.create_frame(all_films)
+
+
+def columnar(imdb: IMDB, films: list):
+    columns = FilmColumns(imdb.ATTRS)
+    columns.extend(films)
+    return columns.to_frame()
+
+
+def measure(build, imdb: IMDB, films: list):
+    start = time.perf_counter()
+    frame = build(imdb, films)
+    built = time.perf_counter()
+    frame = imdb.process_frame(frame)
+    done = time.perf_counter()
+    tracemalloc.start()     ## a separate run, tracing slows allocation-heavy code a lot
+    imdb.process_frame(build(imdb, films))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return built - start, done - built, peak, frame
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=10000)
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    films = scraped_films(args.films, imdb)
+    print(f'{len(films):,} films')
+    results = {}
+    for name, build in (('dict + transpose', legacy), ('FilmColumns', columnar)):
+        build_secs, process_secs, peak, frame = results[name] = measure(build, imdb, films)
+        print(f'{name:<17} build {build_secs * 1000:8.1f} ms   process_frame {process_secs * 1000:8.1f} ms   '
+              f'peak {peak / 1024**2:6.1f} MB   frame {frame.memory_usage(deep=True).sum() / 1024**2:6.1f} MB')
+    old, new = results['dict + transpose'], results['FilmColumns']
+    print(f'FilmColumns is {(old[0] + old[1]) / (new[0] + new[1]):.1f}x faster end to end, {old[2] / new[2]:.1f}x less peak memory')
+    print('same CSV:', old[3].to_csv() == new[3].to_csv())
+
+
+if __name__ == '__main__':
+    main()
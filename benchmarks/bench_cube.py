@@ -0,0 +1,57 @@
+'''Benchmark the aggregate cube: every grouping x metric the cube holds aggregated from the frame with groupby (as page transforms did on
+each cache miss) against sliced from the cube, plus the one-off costs of building the cube and reading it back from its Parquet file, and
+of updating the cube of the list without its last 10 films instead of building it (a refresh that found 10 appended films).
+
+Run from the repo root:
+    python -m benchmarks.bench_cube
+    python -m benchmarks.bench_cube --films 10000 50000
+Lists are built as in bench_columns.
+'''
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pandas import read_parquet
+from utils.frame_cube import GROUPINGS, aggregate, build_cube, cube_metrics, frame_delta, slice_cube, update_cube
+from utils.imdb_acquisition import IMDB
+from benchmarks.bench_columns import scraped_films, columnar
+
+
+def timed(func, repeats: int) -> float:
+    secs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        secs.append(time.perf_counter() - start)
+    return statistics.median(secs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, nargs='+', default=[1000, 10000, 40000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.films:
+            frame = imdb.process_frame(columnar(imdb, scraped_films(n, imdb))).reset_index(drop=True)
+            cube = build_cube(frame)
+            path = os.path.join(directory, f'{n}.cube.parquet')
+            cube.to_parquet(path, index=False)
+            queries = [(by, metric) for by in GROUPINGS for metric in cube_metrics(frame)]
+
+            groupby = timed(lambda: [aggregate(frame, by, [metric]) for by, metric in queries], args.repeats) / len(queries)
+            sliced = timed(lambda: [slice_cube(cube, by, metric) for by, metric in queries], args.repeats) / len(queries)
+            build = timed(lambda: build_cube(frame), args.repeats)
+            load = timed(lambda: read_parquet(path), args.repeats)
+            before = frame.iloc[:-10]
+            before_cube = build_cube(before)
+            update = timed(lambda: update_cube(before_cube, frame, *frame_delta(before, frame)), args.repeats)
+            print(f'{n:>7,} films  {cube.shape[0]:>6,} groups   groupby {groupby * 1000:6.2f} ms   cube slice {sliced * 1000:5.2f} ms   {groupby / sliced:5.1f}x'
+                  f'   build {build * 1000:6.1f} ms   reload {load * 1000:5.1f} ms   update {update * 1000:5.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+'''Benchmark IMDB.get_film_data() against the old per-film extraction (str(film) + 13 regexes in get_all_attributes() + get_stars()).
+
+Run from the repo root:
+    python -m benchmarks.bench_extract --films 10000
+Films are the Shawshank block from tests/test_imdb_acquisition.py, replicated.  Parsing the page is not timed, only extraction.
+'''
+import argparse
+import contextlib
+import io
+import time
+from bs4 import BeautifulSoup
+from utils.imdb_acquisition import IMDB
+from tests.test_imdb_acquisition import SHAWSHANK_HTML
+
+
+def legacy_film_data(imdb: IMDB, film) -> dict:
+    text = str(film)
+    data = imdb.get_all_attributes(text)
+    data.update({'star': imdb.get_stars(text)})
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=10_000)
+    args = parser.parse_args()
+
+    soup = BeautifulSoup(f'<div class="lister-list">{SHAWSHANK_HTML * args.films}</div>', 'html.parser')
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    films = imdb.get_films(soup)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     ## get_all_attributes prints every title
+        old = [legacy_film_data(imdb, film) for film in films]
+    old_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [imdb.get_film_data(film) for film in films]
+    new_secs = time.perf_counter() - start
+
+    diffs = sorted({k for o, n in zip(old, new) for k in o if o[k] != n[k]})
+    print(f"films: {len(films):,}")
+    print(f"str + regexes:  {old_secs:.3f} s  ({old_secs / len(films) * 1e6:,.0f} us/film)")
+    print(f"get_film_data:  {new_secs:.3f} s  ({new_secs / len(films) * 1e6:,.0f} us/film)")
+    print(f"speedup: {old_secs / new_secs:.1f}x")
+    print(f"fields that differ: {diffs or 'none'}")
+    for k in diffs:
+        print(f"  {k}: {old[0][k]!r} -> {new[0][k]!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+'''Benchmark the vectorized CPI table against the old per-row adjust_for_inflation() in create_col_gross_adj().
+
+Run from the repo root:
+    python -m benchmarks.bench_inflation --rows 100000
+The legacy path re-reads the CPI CSV for every film, so it is timed on --legacy-rows and extrapolated linearly.
+'''
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.imdb_acquisition import IMDB
+from utils.inflation import CPI_PATH, get_cpi_table
+
+
+def legacy_adjust_for_inflation(dollars, cpi_start_year, cpi_target_year):
+    '''adjust_for_inflation() as it was before utils.inflation: reads the CSV and does two .loc lookups per call.'''
+    cpi = pd.read_csv(CPI_PATH, dtype={'Year': int, 'CPI': float})
+    cpi_start_year, cpi_target_year = int(cpi_start_year), int(cpi_target_year)
+    cpi_target_year = min(max(cpi_target_year, cpi['Year'].min()), cpi['Year'].max())
+    cpi_start_year = min(max(cpi_start_year, cpi['Year'].min()), cpi['Year'].max())
+    cpi = cpi.set_index('Year')
+    return (dollars * cpi.loc[cpi_target_year]).div(cpi.loc[cpi_start_year]).round(2).item()
+
+
+def legacy_create_col_gross_adj(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    mask = (frame['year'].isnull()) | (frame['year'] == 0)
+    frame.loc[mask, 'gross_adj_2023'] = 0
+    frame[~mask] = frame[~mask].assign(gross_adj_2023=lambda f: f.apply(lambda row: legacy_adjust_for_inflation(row['gross'], row['year'], 2023), axis=1))
+    return frame.assign(gross_adj_2023=lambda f: f['gross_adj_2023'].astype(int)).assign(gross_adj_2023_rk=lambda f: f['gross_adj_2023'].rank(ascending=False, method='dense').astype(int))
+
+
+def synthetic_frame(rows: int, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1900, 2030, rows)
+    years[rng.random(rows) < .01] = 0     ## a few films with missing years, like TV movies
+    return pd.DataFrame({'title': [f'film {i}' for i in range(rows)],
+                         'year': years,
+                         'gross': rng.integers(0, 900_000_000, rows)})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--legacy-rows', type=int, default=2_000)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    imdb = IMDB.__new__(IMDB)   ## skip __init__, which scrapes
+
+    get_cpi_table()     ## load once, as the app does on first use
+    start = time.perf_counter()
+    new = imdb.create_col_gross_adj(frame)
+    new_secs = time.perf_counter() - start
+
+    sample = frame.head(args.legacy_rows)
+    start = time.perf_counter()
+    old = legacy_create_col_gross_adj(sample)
+    old_secs = (time.perf_counter() - start) * args.rows / len(sample)
+
+    mismatches = (old['gross_adj_2023'].to_numpy() != new['gross_adj_2023'].head(len(sample)).to_numpy()).sum()
+    print(f"rows: {args.rows:,}")
+    print(f"vectorized create_col_gross_adj: {new_secs:.3f} s")
+    print(f"per-row adjust_for_inflation:    {old_secs:.1f} s (extrapolated from {len(sample):,} rows)")
+    print(f"speedup: {old_secs / new_secs:,.0f}x")
+    print(f"mismatched gross_adj_2023 values in sample: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
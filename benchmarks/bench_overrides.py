@@ -0,0 +1,61 @@
+'''Benchmark specific_fixes: one title/year mask over the whole frame per override (as specific_fixes used to loop over gross_dct)
+against OverrideTable's single join of the frame's (title, year) keys, for growing lists and override tables.
+
+Run from the repo root:
+    python -m benchmarks.bench_overrides
+    python -m benchmarks.bench_overrides --films 50000 --overrides 100 5000
+Lists are built as in bench_columns, with the title_norm column enrich_frame() adds; a tenth of the overrides name films in the list.
+'''
+import argparse
+import statistics
+import time
+import pandas as pd
+from numpy import where
+from utils.film_overrides import OverrideTable
+from utils.imdb_acquisition import IMDB
+from benchmarks.bench_columns import scraped_films, columnar
+
+
+def timed(func, repeats: int) -> float:
+    secs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        secs.append(time.perf_counter() - start)
+    return statistics.median(secs)
+
+
+def mask_loop(frame: pd.DataFrame, dct: dict) -> pd.DataFrame:
+    frame = frame.copy()
+    titles, years = frame['title'].str.lower(), frame['year'].astype(str)
+    for film, (gross, year) in dct.items():
+        mask = (titles == film.lower()) & (years == str(year))
+        if mask.any():
+            frame.loc[mask, 'gross'] = where(frame.loc[mask, 'gross'].astype(str) == '0', gross, frame.loc[mask, 'gross'])
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--overrides', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    for n in args.films:
+        frame = imdb.add_title_norm_col(columnar(imdb, scraped_films(n, imdb)).reset_index(drop=True))
+        frame['gross'] = frame['gross'].where(frame.index % 3 > 0, 0)
+        for k in args.overrides:
+            films = frame.sample(k // 10, random_state=0)
+            dct = {**{f'Not Listed {i}': [1000 + i, 1990] for i in range(k - len(films))},
+                   **{title: [1000 + i, year] for i, (title, year) in enumerate(films[['title', 'year']].values)}}
+            table = OverrideTable(OverrideTable.from_gross_dct(dct))
+            pd.testing.assert_frame_equal(mask_loop(frame, dct), table.apply(frame))
+            loop = timed(lambda: mask_loop(frame, dct), args.repeats)
+            join = timed(lambda: table.apply(frame), args.repeats)
+            print(f'{n:>7,} films  {k:>6,} overrides   mask loop {loop * 1000:8.1f} ms   join {join * 1000:6.1f} ms   {loop / join:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
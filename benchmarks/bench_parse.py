@@ -0,0 +1,76 @@
+'''Benchmark parsing a list page: the full tree (as get_soup used to) against the SoupStrainer partial parse, per available parser.
+
+Run from the repo root:
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --html saved_list_page.html
+Without --html the page is 100 films from tests/list_pages.py, padded with --chrome-kb of navigation/script markup
+to stand in for everything else on a real IMDb page.
+'''
+import argparse
+import statistics
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from utils.imdb_acquisition import IMDB, LIST_PAGE_STRAINER
+from tests.list_pages import list_page_html
+
+CHROME = '''<div class="nav-link-category"><ul>{links}</ul></div>
+<script type="text/javascript">window.ueLogError = function (a, b) {{ return {{ "ue": a, "b": b, "t": Date.now() }}; }};</script>
+<div class="aux-content-widget-2"><span class="ab_widget"><img src="/images/ad.png" alt="ad" height="250" width="300"></span></div>
+'''
+
+
+def padded_page(chrome_kb: int) -> bytes:
+    page = list_page_html(1, 1000)
+    links = ''.join(f'<li><a href="/chart/{i}/?ref_=nv_ch_{i}" class="ipc-list__item">Chart {i}</a></li>' for i in range(20))
+    block = CHROME.format(links=links)
+    chrome = block * max(1, chrome_kb * 1024 // len(block))
+    return page.replace('<body>', '<body>' + chrome, 1).replace('<footer>', chrome + '<footer>', 1).encode('utf-8')
+
+
+def measure(body: bytes, parser: str, partial: bool, repeats: int):
+    parse_only = LIST_PAGE_STRAINER if partial else None
+    secs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        BeautifulSoup(body, parser, parse_only=parse_only)
+        secs.append(time.perf_counter() - start)
+    tracemalloc.start()
+    soup = BeautifulSoup(body, parser, parse_only=parse_only)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    films = len(IMDB('https://www.imdb.com/list/ls000000001/', scrape=False).get_films(soup))
+    return statistics.median(secs), peak, films
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--html', help='saved IMDb list page to parse instead of the synthetic one')
+    parser.add_argument('--chrome-kb', type=int, default=400)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, 'rb') as f:
+            body = f.read()
+    else:
+        body = padded_page(args.chrome_kb)
+
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        print('lxml not installed, only html.parser is timed')
+
+    print(f"page: {len(body) / 1024:,.0f} KB")
+    for name in parsers:
+        results = {partial: measure(body, name, partial, args.repeats) for partial in (False, True)}
+        for partial, (secs, peak, films) in results.items():
+            print(f"{name:<12} {'partial' if partial else 'full tree':<10} {secs * 1000:8.1f} ms   peak {peak / 1024**2:6.1f} MB   {films} films")
+        full, part = results[False], results[True]
+        print(f"{name:<12} partial is {full[0] / part[0]:.1f}x faster, {full[1] / part[1]:.1f}x less peak memory")
+
+
+if __name__ == '__main__':
+    main()
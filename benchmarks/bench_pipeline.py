@@ -0,0 +1,47 @@
+'''Benchmark the fetch/parse pipeline against parsing in the fetch threads, on a list served locally with simulated latency.
+
+Run from the repo root:
+    python -m benchmarks.bench_pipeline --films 2000 --latency 0.3 --workers 1 2 4
+Prints wall time per configuration and the pipeline's per-stage throughput and queue high-water mark, for sizing the parse pool.
+'''
+import argparse
+import logging
+import tempfile
+import time
+from utils.imdb_acquisition import IMDB
+from utils.rate_limiter import TokenBucket
+from tests.list_pages import ListPageServer
+
+
+def run(server: ListPageServer, parse_workers: int, fetchers: int, queue_size: int):
+    imdb = IMDB(server.url, max_workers=fetchers, limiter=TokenBucket(requests=1000, window=1.0), use_cache=False, scrape=False,
+                parse_workers=parse_workers, queue_size=queue_size)
+    imdb.JOB_DIR = tempfile.mkdtemp()      ## a fresh job each run, rather than resuming the last run's checkpoints
+    start = time.perf_counter()
+    films = sum(len(batch) for batch in imdb.iter_films(server.url))
+    return time.perf_counter() - start, films, imdb.pipeline_stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds the server takes per page')
+    parser.add_argument('--fetchers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='parse pool sizes to try')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with ListPageServer(total=args.films, delay=args.latency) as server:
+        run(server, max(args.workers), args.fetchers, args.queue_size)     ## start the worker processes before timing
+        secs, films, _ = run(server, 0, args.fetchers, args.queue_size)
+        print(f"{films:,} films, {args.latency}s latency/page, {args.fetchers} fetchers")
+        print(f"parse in fetch threads:  {secs:6.2f} s")
+        for workers in args.workers:
+            run(server, workers, args.fetchers, args.queue_size)
+            secs, films, stats = run(server, workers, args.fetchers, args.queue_size)
+            print(f"pipeline, {workers} parse workers: {secs:6.2f} s  {stats.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+'''Benchmark drawing every film of a list for the quiz: sample(1) of the non-documentaries, retried until the title isn't in a list of
+those used so far (as name_that_film did), against dealing a QuizDeck once and drawing from it.
+
+Run from the repo root:
+    python -m benchmarks.bench_quiz
+    python -m benchmarks.bench_quiz --films 500 2000
+Lists are built as in bench_columns.  Rejection sampling slows down toward the end of a game, so whole games are timed.
+'''
+import argparse
+import time
+from utils.imdb_acquisition import IMDB
+from utils.quiz import QuizDeck
+from benchmarks.bench_columns import scraped_films, columnar
+
+
+def rejection_game(frame) -> int:
+    used, draws = [], 0
+    while len(used) < (frame['genre1'] != 'Documentary').sum():
+        film = frame[frame['genre1'].ne('Documentary')].sample(1)
+        draws += 1
+        while film['title'].values[0] in used:
+            film = frame[frame['genre1'].ne('Documentary')].sample(1)
+            draws += 1
+        used.append(film['title'].values[0])
+    return draws
+
+
+def deck_game(frame) -> int:
+    deck, draws = QuizDeck.deal(frame), 0
+    while deck.draw() is not None:
+        draws += 1
+    return draws
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, nargs='+', default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    for n in args.films:
+        frame = imdb.process_frame(columnar(imdb, scraped_films(n, imdb))).reset_index(drop=True)
+        start = time.perf_counter()
+        sampled = rejection_game(frame)
+        rejection = time.perf_counter() - start
+        start = time.perf_counter()
+        dealt = deck_game(frame)
+        deck = time.perf_counter() - start
+        print(f'{n:>6,} films   rejection sampling {sampled:>7,} draws {rejection:8.2f} s   deck {dealt:>6,} draws {deck * 1000:7.2f} ms'
+              f'   per film {rejection / dealt * 1000:7.2f} ms vs {deck / dealt * 1e6:5.2f} us')
+
+
+if __name__ == '__main__':
+    main()
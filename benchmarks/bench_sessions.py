@@ -0,0 +1,74 @@
+'''Benchmark memory held by many sessions looking at the same list: each loading its own copy (as st.session_state.df did) against each
+holding a FrameHandle into the shared FrameStore.  Each way runs in a fresh process and reports the growth in RSS over the process's baseline.
+
+Run from the repo root:
+    python -m benchmarks.bench_sessions
+    python -m benchmarks.bench_sessions --sessions 100 --films 50000
+The list is --films films built as in bench_columns, saved as Parquet like a scraped list; --films 0 uses the wff demo list instead.
+'''
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+from utils.frame_schema import read_film_list, write_film_list
+from utils.frame_store import get_frame_store
+
+DEMO = 'data/input/imdb_demo_list_wff.parquet'
+
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+    return kb / 1024
+
+
+def run_sessions(mode: str, path: str, sessions: int, store_dir: str) -> None:
+    store = get_frame_store(store_dir)
+    if mode == 'handles':
+        store.share_file('bench', path)     ## the list's first load, which a copy per session pays too
+    gc.collect()
+    baseline = rss_mb()
+    held = []
+    for _ in range(sessions):
+        if mode == 'copies':
+            held.append(read_film_list(path))
+        else:
+            handle = store.share_file('bench', path)
+            handle.frame()
+            held.append(handle)
+    gc.collect()
+    print(f'{mode:<8} {sessions} sessions: +{rss_mb() - baseline:7.1f} MB RSS')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--mode', choices=['copies', 'handles'], help='run one way in this process (used by the comparison)')
+    parser.add_argument('--path')
+    parser.add_argument('--store-dir')
+    args = parser.parse_args()
+
+    if args.mode:
+        run_sessions(args.mode, args.path, args.sessions, args.store_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = DEMO
+        if args.films:
+            from utils.imdb_acquisition import IMDB
+            from benchmarks.bench_columns import scraped_films, columnar
+            imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+            path = os.path.join(directory, 'list.parquet')
+            write_film_list(imdb.process_frame(columnar(imdb, scraped_films(args.films, imdb))).reset_index(drop=True), path)
+        frame = read_film_list(path)
+        print(f'{frame.shape[0]:,} films, {frame.memory_usage(deep=True).sum() / 1024**2:.1f} MB as a DataFrame')
+        for mode in ('copies', 'handles'):
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_sessions', '--mode', mode, '--path', path, '--sessions', str(args.sessions),
+                            '--store-dir', os.path.join(directory, 'frames')], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+'''Benchmark storing a processed list: CSV (read back with read_film_csv, which parses and casts to FILM_SCHEMA) against Parquet as
+write_film_list saves it, read whole and for just a few columns, with Feather for comparison.  Reports file size and median load time.
+
+Run from the repo root:
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --films 50000
+Uses the demo lists in data/input, plus a list of --films films built as in bench_columns.
+'''
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pandas import read_feather
+from utils.frame_schema import read_film_csv, read_film_list, write_film_list
+from utils.imdb_acquisition import IMDB
+from benchmarks.bench_columns import scraped_films, columnar
+
+DEMOS = ['imdb_demo_list_big_rando', 'imdb_demo_list_wff']
+PAGE_COLUMNS = ['title', 'director', 'year', 'combo_score']    ## e.g. the most frequent directors table
+
+
+def timed(load, repeats: int) -> float:
+    secs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load()
+        secs.append(time.perf_counter() - start)
+    return statistics.median(secs)
+
+
+def compare(name: str, frame, directory: str, repeats: int) -> None:
+    paths = {fmt: os.path.join(directory, f'{name}.{fmt}') for fmt in ('csv', 'parquet', 'feather')}
+    frame.to_csv(paths['csv'], index=None)
+    write_film_list(frame, paths['parquet'])
+    frame.to_feather(paths['feather'])
+    loads = {
+        'csv': lambda: read_film_csv(paths['csv']),
+        'csv, 4 cols': lambda: read_film_csv(paths['csv'], usecols=PAGE_COLUMNS),
+        'parquet': lambda: read_film_list(paths['parquet']),
+        'parquet, 4 cols': lambda: read_film_list(paths['parquet'], PAGE_COLUMNS),
+        'feather': lambda: read_feather(paths['feather']),
+    }
+    print(f'{name}: {frame.shape[0]:,} films')
+    csv_secs = None
+    for label, load in loads.items():
+        secs = timed(load, repeats)
+        csv_secs = csv_secs or secs
+        size = os.path.getsize(paths[label.split(',')[0]])
+        print(f'  {label:<16} {size / 1024:8,.0f} KB   load {secs * 1000:7.1f} ms   {csv_secs / secs:5.1f}x csv')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+    frames = {stem: read_film_list(f'data/input/{stem}.parquet') for stem in DEMOS}
+    frames['synthetic'] = imdb.process_frame(columnar(imdb, scraped_films(args.films, imdb)))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, frame in frames.items():
+            compare(name, frame, directory, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+'''Benchmark fuzzy title matching for the quiz: TitleIndex.closest() (n-gram inverted index, then edit similarity of the best candidates)
+against comparing a guess with every title of the list (difflib ratio), on synthetic lists of made-up titles.
+Guesses are titles of the list with a typo (a letter dropped, doubled or swapped) or a word missing.  Reports the one-off cost of building
+the index, query latency percentiles, how often the intended title is the nearest (titles this alike are often a typo apart), and how often
+the nearest the index finds is as near as the nearest of every title.
+
+Run from the repo root:
+    python -m benchmarks.bench_titles
+    python -m benchmarks.bench_titles --titles 10000 50000 --guesses 500
+'''
+import argparse
+import random
+import statistics
+import time
+from difflib import SequenceMatcher
+from pandas import DataFrame
+from utils.title_index import TitleIndex, fuzzy_key
+from utils.utilities import clean_film_name
+
+WORDS = ('night', 'city', 'last', 'dark', 'love', 'war', 'river', 'king', 'dead', 'man', 'woman', 'house', 'blood', 'star', 'ghost', 'road',
+         'summer', 'winter', 'secret', 'lost', 'golden', 'silent', 'wild', 'black', 'red', 'dream', 'fire', 'island', 'shadow', 'heart',
+         'moon', 'storm', 'empire', 'garden', 'stranger', 'paradise', 'violet', 'angel', 'devil', 'return')
+
+
+def synthetic_titles(n: int, rng: random.Random) -> list:
+    titles = set()
+    while len(titles) < n:
+        words = rng.sample(WORDS, rng.randint(1, 4))
+        title = ' '.join(words).title()
+        title = rng.choice(['The ', '', '', '']) + title + rng.choice(['', '', '', f' {rng.choice(["II", "III", "2"])}', f' {rng.randint(1950, 2023)}'])
+        titles.add(title)
+    return sorted(titles)
+
+
+def misspell(title: str, rng: random.Random) -> str:
+    words = title.split()
+    if len(words) > 2 and rng.random() < 0.25:
+        del words[rng.randrange(len(words))]
+        return ' '.join(words)
+    i = rng.randrange(len(title))
+    return rng.choice([title[:i] + title[i+1:], title[:i] + title[i] + title[i:], title[:i] + title[i+1:i+2] + title[i:i+1] + title[i+2:]])
+
+
+def brute_force(keys: list, guess: str) -> float:
+    key = fuzzy_key(clean_film_name(guess))
+    return max(SequenceMatcher(None, key, other).ratio() for other in keys)
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--guesses', type=int, default=300)
+    parser.add_argument('--brute-guesses', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for n in args.titles:
+        titles = synthetic_titles(n, rng)
+        index = TitleIndex.from_frame(DataFrame({'title': titles}))
+        start = time.perf_counter()
+        index.ngram_index()
+        build = time.perf_counter() - start
+
+        answers = rng.sample(titles, args.guesses)
+        guesses = [misspell(title, rng) for title in answers]
+        secs, hits, best = [], 0, []
+        for answer, guess in zip(answers, guesses):
+            start = time.perf_counter()
+            matches = index.closest(guess, k=5)
+            secs.append(time.perf_counter() - start)
+            hits += bool(matches) and matches[0].title_norm == clean_film_name(answer)
+            best.append(matches[0].score if matches else 0.0)
+
+        keys = [fuzzy_key(clean_film_name(title)) for title in titles]
+        start = time.perf_counter()
+        exact = [brute_force(keys, guess) for guess in guesses[:args.brute_guesses]]
+        brute = (time.perf_counter() - start) / args.brute_guesses
+        agree = sum(found >= nearest - 1e-9 for found, nearest in zip(best, exact)) / len(exact)
+        print(f'{n:>7,} titles   build {build * 1000:7.1f} ms   closest p50 {statistics.median(secs) * 1000:5.2f} ms  p95 {percentile(secs, 0.95) * 1000:5.2f} ms'
+              f'  max {max(secs) * 1000:5.2f} ms   intended {hits / len(answers):.0%}   every title {brute * 1000:7.1f} ms, as near {agree:.0%}')
+
+
+if __name__ == '__main__':
+    main()
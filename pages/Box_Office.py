@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 from plotly import graph_objects as go
 import plotly.express as px
-from utils.streamlit_utilities import gradient, local_css, init_to_null, plot_xy_radio_buttons, set_frame
+from utils.streamlit_utilities import gradient, local_css, init_to_null, plot_xy_radio_buttons, set_frame, set_cube, set_adjusted_frame, select_inflation_year
+from utils.frame_cube import group_stats, with_missing
+from utils.frame_cache import cache_frame_data
+from utils.inflation import gross_adj_col
 from utils.palettes import blue_bath1, fft_knight_male
 
 # import pickle
@@ -20,6 +23,8 @@ class PageBoxOffice():
         self.initialize_state()
         # st.cache_data.clear() ## change to use button to clear cache....?  Punt for now.
         self.df = set_frame(load_demo=True)
+        self.cube = set_cube()
+        self.set_inflation_year()
         self.page_header()
         self.show_page()
 
@@ -57,10 +62,17 @@ class PageBoxOffice():
         self.remarks_gross_by_director()
         st.markdown('***')
 
+    def set_inflation_year(self):
+        '''Add the inflation adjusted gross for the year chosen in the sidebar.  Switching years doesn't re-run the acquisition pipeline,
+        and the frame for a year is shared by every session, so the page's transforms stay keyed on its fingerprint.'''
+        self.target_year = select_inflation_year()
+        self.adj_col = gross_adj_col(self.target_year)
+        self.df = set_adjusted_frame(self.df, self.target_year)
+
     def initialize_state(self):
         state = st.session_state
         init_to_null(state, 'show_more_info', False)
-        init_to_null(state, 'df', None)
+        init_to_null(state, 'df_handle', None)
         init_to_null(state, 'df_cache', None)
 
     def element_header(self, text: str, header_tag: str='h4', color: str=blue_bath1[1]):
@@ -107,28 +119,28 @@ class PageBoxOffice():
     def table_top_grossing_films(self, df: pd.DataFrame=pd.DataFrame()):
         self.element_header("Top Grossing Films From Your List")
         
-        n, sorter = plot_xy_radio_buttons(x_label='Select Number of Films', x_buttons=[5, 25, 'All'], xindex=0, y_label='Select Box Office Revenue', y_buttons=['gross', 'gross_adj_2023'], xkey='x_top_grossing_films_table_radio', ykey='y_top_grossing_table_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
+        n, sorter = plot_xy_radio_buttons(x_label='Select Number of Films', x_buttons=[5, 25, 'All'], xindex=0, y_label='Select Box Office Revenue', y_buttons=['gross', self.adj_col], xkey='x_top_grossing_films_table_radio', ykey='y_top_grossing_table_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, n: str, sorter: str):
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, n: str, sorter: str, adj_col: str):
             # Sort the dataframe by gross in descending order
             df = df.sort_values(sorter, ascending=False)
 
             # Get the top n grossing films of each decade
             if sorter == 'gross': 
-                cols = ['title', 'year', 'gross_rk', 'gross', 'gross_adj_2023_rk', 'gross_adj_2023', 'combo_score', 'imdb_score', 'metacritic_score']  
+                cols = ['title', 'year', 'gross_rk', 'gross', f'{adj_col}_rk', adj_col, 'combo_score', 'imdb_score', 'metacritic_score']  
             else: 
-                cols = ['title', 'year', 'gross_adj_2023_rk', 'gross_adj_2023', 'gross_rk', 'gross', 'combo_score', 'imdb_score', 'metacritic_score']
+                cols = ['title', 'year', f'{adj_col}_rk', adj_col, 'gross_rk', 'gross', 'combo_score', 'imdb_score', 'metacritic_score']
 
             top_films = df[cols].head(int(n) if n != 'All' else df.shape[0])\
                 .set_index('title')\
                 .assign(gross=lambda f: f['gross'].div(1000000).map("${:,.1f} M".format),
-                        gross_adj_2023=lambda f: f['gross_adj_2023'].div(1000000).map("${:,.1f} M".format), 
+                        **{adj_col: lambda f: f[adj_col].div(1000000).map("${:,.1f} M".format)}, 
                         year=lambda f: f['year'].astype(int).map("{:d}".format))\
-                .rename(columns={'gross_adj_2023_rk': 'inflation_adj_rk', 'gross_adj_2023': 'inflation_adj'})
+                .rename(columns={f'{adj_col}_rk': 'inflation_adj_rk', adj_col: 'inflation_adj'})
             return top_films
         
-        top_films = transform_frame(df, n, sorter)
+        top_films = transform_frame(df, n, sorter, self.adj_col)
 
         st.dataframe(top_films, use_container_width=False)
 
@@ -143,9 +155,9 @@ class PageBoxOffice():
         with col2:
             n = int(st.slider('Select Number of Films', 10, 100, 10, 10, help='Shows the N top films and N bottom films average gross and scores.', key='top_bottom_slider'))
         with col4:
-            gross = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], index=0, key='y_top_bottom_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            gross = st.radio('Select Box Office Revenue', ['gross', self.adj_col], index=0, key='y_top_bottom_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, n: int, gross: str):
             df = df[df['metacritic_score']>0].sort_values(gross, ascending=False) # Remove films with no metacritic score
             top_films = df.head(n)
@@ -201,9 +213,9 @@ class PageBoxOffice():
             chosen_genre = st.selectbox('Select Genre', ['All'] + list(df['genre1'].unique()))
             st.markdown(f"<div align=center>{df[df['genre1']==chosen_genre].shape[0]} {chosen_genre} films</div>" if chosen_genre != 'All' else '', unsafe_allow_html=True)
         with c4:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_rating_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_rating_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, x: str):
             return df[df[x]>0].assign(score_decile=pd.cut(df[x], 10, labels=False, duplicates='drop')).sort_values(x, ascending=False)
 
@@ -268,10 +280,10 @@ class PageBoxOffice():
             chosen_genre = st.selectbox('Select Genre', ['All'] + list(df['genre1'].unique()), key='genre_over_time_radio')
             st.markdown(f"<div align=center>{df[df['genre1']==chosen_genre].shape[0]} {chosen_genre} films</div>" if chosen_genre != 'All' else '', unsafe_allow_html=True)
         with c4:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_year_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_year_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
 
-        @st.cache_data  # Cache the function so it doesn't run every time the user changes the radio buttons
+        @cache_frame_data  # Cache the function so it doesn't run every time the user changes the radio buttons
         def transform_frame(df):
             return df[df['decade']>0].sort_values('decade', ascending=False)
         df_plot = transform_frame(df)
@@ -328,11 +340,11 @@ class PageBoxOffice():
     def table_grid_top_genres_over_time(self, df: pd.DataFrame=pd.DataFrame()):
         self.element_header("Highest Grossing Genres Over Time")
         
-        genre, gross = plot_xy_radio_buttons(x_label='Select Genre', x_buttons=('genre1', 'genre2'), x_format=lambda label: 'Primary' if label == 'genre1' else 'Secondary', xkey='x_top_gross_genre_radio', y_label='Select Box Office Revenue', y_buttons=['gross', 'gross_adj_2023'], ykey='y_top_gross_genre_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
+        genre, gross = plot_xy_radio_buttons(x_label='Select Genre', x_buttons=('genre1', 'genre2'), x_format=lambda label: 'Primary' if label == 'genre1' else 'Secondary', xkey='x_top_gross_genre_radio', y_label='Select Box Office Revenue', y_buttons=['gross', self.adj_col], ykey='y_top_gross_genre_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, decade: int):
-            tmp = df.groupby(['decade', genre])[gross].agg(['mean', 'count'])\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, decade: int):
+            tmp = with_missing(group_stats(df, ['decade', genre], gross, cube))[['mean', 'count']]\
                     .sort_values(by=['decade', 'mean'], ascending=False)\
                     .groupby('decade').head()\
                     .assign(**{f"{decade}s": lambda f: f.groupby('decade')['mean'].rank(ascending=False, method='dense')})\
@@ -348,7 +360,7 @@ class PageBoxOffice():
                 .rename(columns={'mean': 'Avg. Gross', 'count': 'Film Count', 'genre1': 'Primary', 'genre2': 'Secondary', 'index': 'decade'})\
                 .set_index(f"{decade}s")
                 
-        frames = [transform_frame(df, decade).drop('decade', axis=1) for decade in sorted(df['decade'].unique())]
+        frames = [transform_frame(df, self.cube, decade).drop('decade', axis=1) for decade in sorted(df['decade'].unique())]
 
         # Print the tables in a grid, 3 per row, one table per decadde
         for idx in range(len(frames)):
@@ -378,18 +390,18 @@ class PageBoxOffice():
             elif label == 'genre3': lab = 'third genre'
             return lab
 
-        x, y = plot_xy_radio_buttons(x_label='Select Genre', y_label='Select Box Office Revenue', x_buttons=['genre1', 'genre2', 'genre3'], y_buttons=['gross', 'gross_adj_2023'], xkey='x_gross_by_genre_radio', ykey='y_gross_by_genre_radio', x_format=xlabel, y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.45, .3, .25], horizontal=True)
+        x, y = plot_xy_radio_buttons(x_label='Select Genre', y_label='Select Box Office Revenue', x_buttons=['genre1', 'genre2', 'genre3'], y_buttons=['gross', self.adj_col], xkey='x_gross_by_genre_radio', ykey='y_gross_by_genre_radio', x_format=xlabel, y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.45, .3, .25], horizontal=True)
         
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str, power: float=0.8, lower: int=12, upper: int=80):
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str, power: float=0.8, lower: int=12, upper: int=80):
             ## create a 'count_plot' column for the size of the bubble and bound it to a minimum of 12 and a maximum of 80
-            avg_gross_by_genre = df.groupby(x)[y].agg(['mean', 'count'])\
+            avg_gross_by_genre = with_missing(group_stats(df, x, y, cube))[['mean', 'count']]\
                 .reset_index()\
                 .rename(columns={'mean': 'avg_gross'})\
                 .assign(count_plot=lambda f: f['count'].pow(power).clip(upper=upper).clip(lower=lower)) 
             return avg_gross_by_genre.sort_values(x, ascending=True)
         
-        df_plot = transform_frame(df, x, y, power=1 if x == 'genre3' else 0.8)
+        df_plot = transform_frame(df, self.cube, x, y, power=1 if x == 'genre3' else 0.8)
         colors = 3 * px.colors.qualitative.Pastel ## extend the color palette if there are more genres than default palette   
 
         fig = go.Figure()
@@ -401,7 +413,7 @@ class PageBoxOffice():
                 y=data['avg_gross'], 
                 mode='markers', 
                 marker=dict(line=dict(color='black', width=0.5), color=colors[idx], size=data['count_plot']),
-                hovertemplate='<b>Genre</b>: ' + data[x] + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Count</b>: ' + data['count'].astype(str) + '<extra></extra>',
+                hovertemplate='<b>Genre</b>: ' + data[x].astype(str) + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Count</b>: ' + data['count'].astype(str) + '<extra></extra>',
                 showlegend=False)
                 )
         
@@ -415,13 +427,13 @@ class PageBoxOffice():
     def table_top_decades_by_gross_per_film(self, df: pd.DataFrame=pd.DataFrame(), y: str='gross'):
         # self.element_header("Top Decades by Gross per Film")
         
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame):
-            decade_stats = df.groupby('decade')[y].mean()
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame):
+            decade_stats = with_missing(group_stats(df, 'decade', y, cube))['mean'].rename(y)
             decade_stats = decade_stats.div(1000000).map("${:,.0f} M".format)
             return decade_stats.to_frame().sort_index(axis=1).rename(columns={y: 'Avg. Gross per Film'})
         
-        decade_stats = transform_frame(df).T.rename(columns=lambda col: f"{col}s")
+        decade_stats = transform_frame(df, self.cube).T.rename(columns=lambda col: f"{col}s")
         
         col1, _ = st.columns([.98, .02])
         with col1:
@@ -461,19 +473,19 @@ class PageBoxOffice():
         with col2:
             minfilms = st.radio("Min. Number of Films", [1, 2, 3], index=minfilms_idx, help='Minimum number of films by director. Helps weed out one-hit wonders', key='min_films_by_director_radio', horizontal=True)
         with col3:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_director_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_director_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
         
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str, thresh: int, power: float=0.8, lower: int=12, upper: int=80):
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str, thresh: int, power: float=0.8, lower: int=12, upper: int=80):
             ## create a 'count_plot' column for the size of the bubble and bound it to a minimum of 12 and a maximum of 80
-            avg_gross_by_director = df.groupby(x)[y].agg(['mean', 'count'])\
+            avg_gross_by_director = with_missing(group_stats(df, x, y, cube))[['mean', 'count']]\
                 .reset_index()\
                 .rename(columns={'mean': 'avg_gross'})\
                 .query(f"avg_gross >= @thresh")\
                 .assign(count_plot=lambda f: f['count'].pow(power).clip(upper=upper).clip(lower=lower)) 
             return avg_gross_by_director.sort_values('avg_gross', ascending=True)
 
-        df_plot = transform_frame(df, 'director', y, int(thresh) if thresh != 'All' else 0)
+        df_plot = transform_frame(df, self.cube, 'director', y, int(thresh) if thresh != 'All' else 0)
         colors = 50 * px.colors.qualitative.Pastel ## extend the color palette
 
         fig = go.Figure()
@@ -486,7 +498,7 @@ class PageBoxOffice():
                 y=data['avg_gross'], 
                 mode='markers', 
                 marker=dict(line=dict(color='black', width=0.5), color=colors[idx], size=data['count_plot']),
-                hovertemplate='<b>Genre</b>: ' + data['director'] + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Films</b>: ' + data['count'].astype(str) + '<extra></extra>',
+                hovertemplate='<b>Genre</b>: ' + data['director'].astype(str) + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Films</b>: ' + data['count'].astype(str) + '<extra></extra>',
                 showlegend=False)
                 )
 
@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 from plotly import graph_objects as go
 import plotly.express as px
-from utils.streamlit_utilities import gradient, local_css, init_to_null, plot_xy_radio_buttons, set_frame
+from utils.streamlit_utilities import gradient, local_css, init_to_null, plot_xy_radio_buttons, set_frame, set_cube, set_adjusted_frame, select_inflation_year
+from utils.frame_cube import group_stats, with_missing
+from utils.frame_cache import cache_frame_data
+from utils.inflation import gross_adj_col
 from utils.palettes import blue_bath1, fft_knight_male, streamlit_blue, vermeer_pearl
 
 ## top rated dirs
@@ -31,6 +34,8 @@ class PageBoxOffice():
         self.initialize_state()
         # st.cache_data.clear() ## change to use button to clear cache....?  Punt for now.
         self.df = set_frame(load_demo=True)
+        self.cube = set_cube()
+        self.set_inflation_year()
         self.page_header()
         self.show_page()
 
@@ -59,10 +64,17 @@ class PageBoxOffice():
 
 
 
+    def set_inflation_year(self):
+        '''Add the inflation adjusted gross for the year chosen in the sidebar.  Switching years doesn't re-run the acquisition pipeline,
+        and the frame for a year is shared by every session, so the page's transforms stay keyed on its fingerprint.'''
+        self.target_year = select_inflation_year()
+        self.adj_col = gross_adj_col(self.target_year)
+        self.df = set_adjusted_frame(self.df, self.target_year)
+
     def initialize_state(self):
         state = st.session_state
         init_to_null(state, 'show_more_info', False)
-        init_to_null(state, 'df', None)
+        init_to_null(state, 'df_handle', None)
         init_to_null(state, 'df_cache', None)
 
     def element_header(self, text: str, header_tag: str='h4', color: str=blue_bath1[1]):
@@ -109,7 +121,7 @@ class PageBoxOffice():
     def table_most_freq_directors(self, df: pd.DataFrame=pd.DataFrame()):
         self.element_header("Most Frequent Directors")
         
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame):
             return df['director'].value_counts()\
                                 .head(15)\
@@ -140,20 +152,21 @@ class PageBoxOffice():
         with c3:
             n = int(st.slider('Min. Number of Films', 1, 10, 2, 1, key='n_top_rated_dir_radio'))
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, n: int):
-            return df[df[x] > 0].groupby('director')[x].mean().round(1)\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, n: int):
+            stats = group_stats(df, 'director', x, cube)
+            return stats[stats['count'] > 0]['mean'].round(1)\
                                 .sort_values(ascending=False)\
                                 .to_frame()\
                                 .reset_index()\
-                                .rename(columns={x: f'avg. score'})\
-                                .assign(films=lambda df_: df_['director'].map(df['director'].value_counts()))\
+                                .rename(columns={'mean': f'avg. score'})\
+                                .assign(films=lambda df_: df_['director'].map(stats['films']))\
                                 .query("films > @n")\
                                 .assign(rank=lambda df_: df_[f'avg. score'].rank(ascending=False, method='dense').astype(int))\
                                 .set_index('rank')\
                                 .head(15)
         
-        frame = transform_frame(df, x, n)
+        frame = transform_frame(df, self.cube, x, n)
 
         col1, col2, col3 = st.columns([.33, .33, .34])
         with col1:
@@ -171,7 +184,7 @@ class PageBoxOffice():
         self.element_header("Director Rating Over Time")
 
         ## Sort this so the default multiselect is the top 3 directors by rating
-        @st.cache_data
+        @cache_frame_data
         def sort_frame(df: pd.DataFrame):
             return df.sort_values('metacritic_score', ascending=False)
         df = sort_frame(df)
@@ -189,9 +202,10 @@ class PageBoxOffice():
             y = st.radio('Select Rating System', ['metacritic_score', 'imdb_score', 'combo_score'], index=1, key='y_dir_rating_over_time_radio', format_func=lambda label: label.replace('_score', ''), horizontal=True)
 
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str):
-            frame = df[(df[y] > 0) & (df['year'] > 0)].groupby([x, 'director'])[y].agg(['mean', 'count'])\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str):
+            stats = group_stats(df, [x, 'director'], y, cube)
+            frame = stats[(stats['count'] > 0) & (stats.index.get_level_values(x) > 0)][['mean', 'count']]\
                                                         .rename(columns={'mean': y, 'count': 'films'})\
                                                         .round(1)\
                                                         .reset_index()
@@ -199,7 +213,7 @@ class PageBoxOffice():
                 frame = frame.merge(df[['year', 'director', 'title']], left_on=['year', 'director'], right_on=['year', 'director'], how='left')
             return frame
         
-        df_plot = transform_frame(df, x, y)
+        df_plot = transform_frame(df, self.cube, x, y)
 
         dir_mask = (df_plot['director'].isin(chosen_dir))
         size = 11 if x == 'year' else 9
@@ -208,7 +222,7 @@ class PageBoxOffice():
             if x == 'year':
                 hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
             else:
-                hov = '<b>Dir</b>: ' + data_clr['director'] + ' (' + data_clr['decade'].astype(str) +'s) ' + '<br><b>Films</b>: ' + data_clr['films'].astype(str) + '<br><b>Avg. Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
+                hov = '<b>Dir</b>: ' + data_clr['director'].astype(str) + ' (' + data_clr['decade'].astype(str) +'s) ' + '<br><b>Films</b>: ' + data_clr['films'].astype(str) + '<br><b>Avg. Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
             return hov
 
         
@@ -261,7 +275,7 @@ class PageBoxOffice():
         self.element_header("How Are Directors Rated Per Film?")
         
         ## Sort this so the default multiselect is the top 3 directors by rating
-        @st.cache_data
+        @cache_frame_data
         def sort_frame(df: pd.DataFrame):
             return df.sort_values('combo_score', ascending=False)
         df = sort_frame(df)
@@ -280,10 +294,10 @@ class PageBoxOffice():
             y = st.radio('Select Rating System', ['metacritic_score', 'imdb_score', 'combo_score'], index=1, key='y_dir_per_film_rating_radio', format_func=lambda label: label.replace('_score', ''), horizontal=True)
 
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, y: str):
             return df[(df[y] > 0) & (df['year'] > 0)].sort_values('year')\
-                                                    .assign(nth_film=lambda f: f.groupby('director')['year']\
+                                                    .assign(nth_film=lambda f: f.groupby('director', observed=True)['year']\
                                                             .transform(lambda f: f.rank(method='first')))\
                                                     .sort_values('nth_film')
         
@@ -294,7 +308,7 @@ class PageBoxOffice():
             if len(chosen_dir) <= 1:
                 hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
             else:
-                hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Dir</b>: ' + data_clr['director']+ '<br><b>Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
+                hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Dir</b>: ' + data_clr['director'].astype(str) + '<br><b>Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
             return hov
 
 
@@ -353,7 +367,7 @@ class PageBoxOffice():
         st.markdown("<div align=center>This chart shows the career rating of a director after N films, giving insight into how a director's rating changes over time</div><BR><BR>", unsafe_allow_html=True)
         
         ## Sort this so the default multiselect is the top 3 directors by rating
-        @st.cache_data
+        @cache_frame_data
         def sort_frame(df: pd.DataFrame):
             return df.sort_values('combo_score', ascending=False)
         df = sort_frame(df)
@@ -361,7 +375,7 @@ class PageBoxOffice():
 
         c1, c2, c3 = st.columns([.25, .5, .25])
         with c1:
-            n = int(st.slider('Select Number of Films', 1, df.groupby('director').size().max(), 3, 1, help='Rating by director after N films', key='n_films_rating_slider'))
+            n = int(st.slider('Select Number of Films', 1, df.groupby('director', observed=True).size().max(), 3, 1, help='Rating by director after N films', key='n_films_rating_slider'))
         with c2:
             chosen_dir = st.multiselect(
                             'Select Director(s)',
@@ -372,13 +386,13 @@ class PageBoxOffice():
             y = st.radio('Select Rating System', ['metacritic_score', 'imdb_score', 'combo_score'], index=1, key='y_dir_n_films_rating_radio', format_func=lambda label: label.replace('_score', ''), horizontal=True)
 
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, y: str):
             return df[(df[y] > 0) & (df['year'] > 0)].sort_values('year')\
-                                                    .assign(nth_film=lambda f: f.groupby('director')['year']\
+                                                    .assign(nth_film=lambda f: f.groupby('director', observed=True)['year']\
                                                             .transform(lambda s: s.rank(method='first')))\
                                                     .sort_values(['nth_film', 'director'])\
-                                                    .assign(career_rating=lambda f: f.groupby('director')[y].transform(lambda s: s.expanding().mean().round(1)))
+                                                    .assign(career_rating=lambda f: f.groupby('director', observed=True)[y].transform(lambda s: s.expanding().mean().round(1)))
         
         df_plot = transform_frame(df, y)
         dir_mask = (df_plot['director'].isin(chosen_dir))
@@ -387,7 +401,7 @@ class PageBoxOffice():
             if len(chosen_dir) <= 1:
                 hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Career Rating</b>: ' + data_clr['career_rating'].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
             else:
-                hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Dir</b>: ' + data_clr['director']+ '<br><b>Career Rating</b>: ' + data_clr['career_rating'].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
+                hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Dir</b>: ' + data_clr['director'].astype(str) + '<br><b>Career Rating</b>: ' + data_clr['career_rating'].map('{:.1f}'.format).astype(str) + '<br><b>Film No.</b>: ' + data_clr['nth_film'].astype(int).astype(str) + '<extra></extra>'
             return hov
 
 
@@ -443,12 +457,12 @@ class PageBoxOffice():
         """ 
         """
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, y: str, n: int):
             ## .query("nth_film == @n") or .query("nth_film <= @n").... 
             return df[df[y] > 0].sort_values('nth_film', ascending=True)\
                                 .query("nth_film == @n")\
-                                .groupby('director')[['nth_film', 'career_rating']].last()\
+                                .groupby('director', observed=True)[['nth_film', 'career_rating']].last()\
                                 .sort_values(['career_rating', 'director'], ascending=[False, True])\
                                 .assign(rank=lambda f: f['career_rating'].rank(ascending=False, method='dense').astype(int))\
                                 .rename(columns={'career_rating': 'Career Rating'})
@@ -483,24 +497,25 @@ class PageBoxOffice():
 
         c1, _, c3 = st.columns([.35, .4, .25])
         with c1:
-            x = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='x_dir_gross_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            x = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='x_dir_gross_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
         with c3:
             n = int(st.slider('Min. Number of Films', 1, 10, 2, 1, key='n_dir_gross_radio'))
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, n: int):
-            return df[df[x] > 0].groupby('director')[x].mean().round(1)\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, n: int):
+            stats = group_stats(df, 'director', x, cube)
+            return stats[stats['count'] > 0]['mean'].round(1)\
                                 .sort_values(ascending=False)\
                                 .to_frame()\
                                 .reset_index()\
-                                .rename(columns={x: f'avg. gross'})\
-                                .assign(films=lambda df_: df_['director'].map(df['director'].value_counts()))\
+                                .rename(columns={'mean': f'avg. gross'})\
+                                .assign(films=lambda df_: df_['director'].map(stats['films']))\
                                 .query("films > @n")\
                                 .assign(rank=lambda df_: df_[f'avg. gross'].rank(ascending=False, method='dense').astype(int))\
                                 .set_index('rank')\
                                 .head(15)
         
-        frame = transform_frame(df, x, n)
+        frame = transform_frame(df, self.cube, x, n)
 
         col1, col2, col3 = st.columns([.33, .33, .34])
         with col1:
@@ -527,12 +542,13 @@ class PageBoxOffice():
                             df['director'].unique().tolist()[:2],
                             key='dir_rating_over_time_multiselect')
         with c3:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_dir_gross_over_time_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_dir_gross_over_time_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str):
-            frame = df[(df[y] > 0) & (df['year'] > 0)].groupby([x, 'director'])[y].agg(['mean', 'count'])\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str):
+            stats = group_stats(df, [x, 'director'], y, cube)
+            frame = stats[(stats['count'] > 0) & (stats.index.get_level_values(x) > 0)][['mean', 'count']]\
                                                         .rename(columns={'mean': y, 'count': 'films'})\
                                                         .round(1)\
                                                         .reset_index()
@@ -540,7 +556,7 @@ class PageBoxOffice():
                 frame = frame.merge(df[['year', 'director', 'title']], left_on=['year', 'director'], right_on=['year', 'director'], how='left')
             return frame
         
-        df_plot = transform_frame(df, x, y)
+        df_plot = transform_frame(df, self.cube, x, y)
 
         # dir_mask = (df_plot['director'] == chosen_dir) if chosen_dir != 'All' else (df_plot['director'] == df_plot['director'])
         dir_mask = (df_plot['director'].isin(chosen_dir))
@@ -550,7 +566,7 @@ class PageBoxOffice():
             if x == 'year':
                 hov = '<b>Title</b>: ' + data_clr['title'] + ' (' + data_clr['year'].astype(str) +') ' + '<br><b>Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
             else:
-                hov = '<b>Dir</b>: ' + data_clr['director'] + ' (' + data_clr['decade'].astype(str) +'s) ' + '<br><b>Films</b>: ' + data_clr['films'].astype(str) + '<br><b>Avg. Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
+                hov = '<b>Dir</b>: ' + data_clr['director'].astype(str) + ' (' + data_clr['decade'].astype(str) +'s) ' + '<br><b>Films</b>: ' + data_clr['films'].astype(str) + '<br><b>Avg. Rating</b>: ' + data_clr[y].map('{:.1f}'.format).astype(str) + '<extra></extra>'
             return hov
 
         
@@ -613,9 +629,9 @@ class PageBoxOffice():
         with col2:
             n = int(st.slider('Select Number of Films', 10, 100, 10, 10, help='Shows the N top films and N bottom films average gross and scores.', key='top_bottom_slider'))
         with col4:
-            gross = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], index=0, key='y_top_bottom_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            gross = st.radio('Select Box Office Revenue', ['gross', self.adj_col], index=0, key='y_top_bottom_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, n: int, gross: str):
             df = df[df['metacritic_score']>0].sort_values(gross, ascending=False) # Remove films with no metacritic score
             top_films = df.head(n)
@@ -671,9 +687,9 @@ class PageBoxOffice():
             chosen_genre = st.selectbox('Select Genre', ['All'] + list(df['genre1'].unique()))
             st.markdown(f"<div align=center>{df[df['genre1']==chosen_genre].shape[0]} {chosen_genre} films</div>" if chosen_genre != 'All' else '', unsafe_allow_html=True)
         with c4:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_rating_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_rating_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
-        @st.cache_data
+        @cache_frame_data
         def transform_frame(df: pd.DataFrame, x: str):
             return df[df[x]>0].assign(score_decile=pd.cut(df[x], 10, labels=False, duplicates='drop')).sort_values(x, ascending=False)
 
@@ -738,10 +754,10 @@ class PageBoxOffice():
             chosen_genre = st.selectbox('Select Genre', ['All'] + list(df['genre1'].unique()), key='genre_over_time_radio')
             st.markdown(f"<div align=center>{df[df['genre1']==chosen_genre].shape[0]} {chosen_genre} films</div>" if chosen_genre != 'All' else '', unsafe_allow_html=True)
         with c4:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_year_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_year_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
 
 
-        @st.cache_data  # Cache the function so it doesn't run every time the user changes the radio buttons
+        @cache_frame_data  # Cache the function so it doesn't run every time the user changes the radio buttons
         def transform_frame(df):
             return df[df['decade']>0].sort_values('decade', ascending=False)
         df_plot = transform_frame(df)
@@ -798,11 +814,11 @@ class PageBoxOffice():
     def table_grid_top_genres_over_time(self, df: pd.DataFrame=pd.DataFrame()):
         self.element_header("Highest Grossing Genres Over Time")
         
-        genre, gross = plot_xy_radio_buttons(x_label='Select Genre', x_buttons=('genre1', 'genre2'), x_format=lambda label: 'Primary' if label == 'genre1' else 'Secondary', xkey='x_top_gross_genre_radio', y_label='Select Box Office Revenue', y_buttons=['gross', 'gross_adj_2023'], ykey='y_top_gross_genre_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
+        genre, gross = plot_xy_radio_buttons(x_label='Select Genre', x_buttons=('genre1', 'genre2'), x_format=lambda label: 'Primary' if label == 'genre1' else 'Secondary', xkey='x_top_gross_genre_radio', y_label='Select Box Office Revenue', y_buttons=['gross', self.adj_col], ykey='y_top_gross_genre_radio', y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.5, .25, .25], horizontal=True)
 
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, decade: int):
-            tmp = df.groupby(['decade', genre])[gross].agg(['mean', 'count'])\
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, decade: int):
+            tmp = with_missing(group_stats(df, ['decade', genre], gross, cube))[['mean', 'count']]\
                     .sort_values(by=['decade', 'mean'], ascending=False)\
                     .groupby('decade').head()\
                     .assign(**{f"{decade}s": lambda f: f.groupby('decade')['mean'].rank(ascending=False, method='dense')})\
@@ -818,7 +834,7 @@ class PageBoxOffice():
                 .rename(columns={'mean': 'Avg. Gross', 'count': 'Film Count', 'genre1': 'Primary', 'genre2': 'Secondary', 'index': 'decade'})\
                 .set_index(f"{decade}s")
                 
-        frames = [transform_frame(df, decade).drop('decade', axis=1) for decade in sorted(df['decade'].unique())]
+        frames = [transform_frame(df, self.cube, decade).drop('decade', axis=1) for decade in sorted(df['decade'].unique())]
 
         # Print the tables in a grid, 3 per row, one table per decadde
         for idx in range(len(frames)):
@@ -848,18 +864,18 @@ class PageBoxOffice():
             elif label == 'genre3': lab = 'third genre'
             return lab
 
-        x, y = plot_xy_radio_buttons(x_label='Select Genre', y_label='Select Box Office Revenue', x_buttons=['genre1', 'genre2', 'genre3'], y_buttons=['gross', 'gross_adj_2023'], xkey='x_gross_by_genre_radio', ykey='y_gross_by_genre_radio', x_format=xlabel, y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.45, .3, .25], horizontal=True)
+        x, y = plot_xy_radio_buttons(x_label='Select Genre', y_label='Select Box Office Revenue', x_buttons=['genre1', 'genre2', 'genre3'], y_buttons=['gross', self.adj_col], xkey='x_gross_by_genre_radio', ykey='y_gross_by_genre_radio', x_format=xlabel, y_format=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', col_spacing=[.45, .3, .25], horizontal=True)
         
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str, power: float=0.8, lower: int=12, upper: int=80):
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str, power: float=0.8, lower: int=12, upper: int=80):
             ## create a 'count_plot' column for the size of the bubble and bound it to a minimum of 12 and a maximum of 80
-            avg_gross_by_genre = df.groupby(x)[y].agg(['mean', 'count'])\
+            avg_gross_by_genre = with_missing(group_stats(df, x, y, cube))[['mean', 'count']]\
                 .reset_index()\
                 .rename(columns={'mean': 'avg_gross'})\
                 .assign(count_plot=lambda f: f['count'].pow(power).clip(upper=upper).clip(lower=lower)) 
             return avg_gross_by_genre.sort_values(x, ascending=True)
         
-        df_plot = transform_frame(df, x, y, power=1 if x == 'genre3' else 0.8)
+        df_plot = transform_frame(df, self.cube, x, y, power=1 if x == 'genre3' else 0.8)
         colors = 3 * px.colors.qualitative.Pastel ## extend the color palette if there are more genres than default palette   
 
         fig = go.Figure()
@@ -871,7 +887,7 @@ class PageBoxOffice():
                 y=data['avg_gross'], 
                 mode='markers', 
                 marker=dict(line=dict(color='black', width=0.5), color=colors[idx], size=data['count_plot']),
-                hovertemplate='<b>Genre</b>: ' + data[x] + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Count</b>: ' + data['count'].astype(str) + '<extra></extra>',
+                hovertemplate='<b>Genre</b>: ' + data[x].astype(str) + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Count</b>: ' + data['count'].astype(str) + '<extra></extra>',
                 showlegend=False)
                 )
         
@@ -918,19 +934,19 @@ class PageBoxOffice():
         with col2:
             minfilms = st.radio("Min. Number of Films", [1, 2, 3], index=minfilms_idx, help='Minimum number of films by director. Helps weed out one-hit wonders', key='min_films_by_director_radio', horizontal=True)
         with col3:
-            y = st.radio('Select Box Office Revenue', ['gross', 'gross_adj_2023'], key='y_gross_by_director_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
+            y = st.radio('Select Box Office Revenue', ['gross', self.adj_col], key='y_gross_by_director_radio', format_func=lambda label: 'raw gross' if label == 'gross' else 'inflation adj.', horizontal=True)
         
-        @st.cache_data
-        def transform_frame(df: pd.DataFrame, x: str, y: str, thresh: int, power: float=0.8, lower: int=12, upper: int=80):
+        @cache_frame_data
+        def transform_frame(df: pd.DataFrame, cube: pd.DataFrame, x: str, y: str, thresh: int, power: float=0.8, lower: int=12, upper: int=80):
             ## create a 'count_plot' column for the size of the bubble and bound it to a minimum of 12 and a maximum of 80
-            avg_gross_by_director = df.groupby(x)[y].agg(['mean', 'count'])\
+            avg_gross_by_director = with_missing(group_stats(df, x, y, cube))[['mean', 'count']]\
                 .reset_index()\
                 .rename(columns={'mean': 'avg_gross'})\
                 .query(f"avg_gross >= @thresh")\
                 .assign(count_plot=lambda f: f['count'].pow(power).clip(upper=upper).clip(lower=lower)) 
             return avg_gross_by_director.sort_values('avg_gross', ascending=True)
 
-        df_plot = transform_frame(df, 'director', y, int(thresh) if thresh != 'All' else 0)
+        df_plot = transform_frame(df, self.cube, 'director', y, int(thresh) if thresh != 'All' else 0)
         colors = 50 * px.colors.qualitative.Pastel ## extend the color palette
 
         fig = go.Figure()
@@ -943,7 +959,7 @@ class PageBoxOffice():
                 y=data['avg_gross'], 
                 mode='markers', 
                 marker=dict(line=dict(color='black', width=0.5), color=colors[idx], size=data['count_plot']),
-                hovertemplate='<b>Genre</b>: ' + data['director'] + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Films</b>: ' + data['count'].astype(str) + '<extra></extra>',
+                hovertemplate='<b>Genre</b>: ' + data['director'].astype(str) + '<br><b>Gross</b>: ' + data['avg_gross'].div(1000000).map("${:,.1f} M".format)  + '<br><b>Films</b>: ' + data['count'].astype(str) + '<extra></extra>',
                 showlegend=False)
                 )
 
@@ -0,0 +1,169 @@
+'''Stand-ins for recorded IMDb list pages (detail mode, 100 films per page) and a local HTTP server that serves them.'''
+import gzip
+import hashlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+FILM = '''<div class="lister-item-content">
+<h3 class="lister-item-header">
+<span class="lister-item-index unbold text-primary">{rank}.</span>
+<a href="/title/tt{title_id:07d}/">Film Number {rank}</a>
+<span class="lister-item-year text-muted unbold">({year})</span>
+</h3>
+<p class="text-muted text-small">
+<span class="certificate">R</span>
+<span class="ghost">|</span>
+<span class="runtime">{runtime} min</span>
+<span class="ghost">|</span>
+<span class="genre">
+Drama, Crime            </span>
+</p>
+<div class="ipl-rating-widget">
+<div class="ipl-rating-star small">
+<span class="ipl-rating-star__rating">{imdb}</span>
+</div>
+</div>
+<div class="inline-block ratings-metascore">
+<span class="metascore favorable">{metascore}        </span>
+        Metascore
+</div>
+<p class="">
+A film about the number {rank}.</p>
+<p class="text-muted text-small">
+Director:
+<a href="/name/nm{director:07d}/">Director {director}</a>
+<span class="ghost">|</span>
+Stars:
+<a href="/name/nm0000209/">Tim Robbins</a>,
+<a href="/name/nm0000151/">Morgan Freeman</a>,
+<a href="/name/nm0006669/">Bob Gunton</a>,
+<a href="/name/nm0006667/">William Sadler</a>
+</p>
+<p class="text-muted text-small">
+<span class="text-muted">Votes:</span>
+<span data-value="{votes}" name="nv">{votes:,}</span>
+<span class="ghost">|</span>
+<span class="text-muted">Gross:</span>
+<span name="GrossMillions" data-value="{gross:,}">${gross_m:.2f}M</span>
+</p>
+</div>'''
+
+PAGE = '''<!DOCTYPE html>
+<html><head><title>{title} - IMDb</title><script>var ads = "lots of script";</script></head>
+<body>
+<nav><a href="/">Home</a><a href="/chart/top/">Top 250</a></nav>
+<h1 class="header list-name">{title}</h1>
+<div class="desc lister-total-num-results">
+{total:,} titles
+</div>
+<div class="lister-list">
+{films}
+</div>
+<footer>IMDb footer</footer>
+</body></html>'''
+
+
+def film_html(rank: int) -> str:
+    gross = 1_000_000 + rank * 12_345
+    return FILM.format(rank=rank, title_id=rank, year=1950 + rank % 70, runtime=90 + rank % 60, imdb=f"{5 + rank % 5}.{rank % 10}",
+                       metascore=40 + rank % 60, director=rank % 40, votes=1000 + rank * 7, gross=gross, gross_m=gross / 1e6)
+
+
+def list_page_html(page: int, total: int, title: str='Test List', per_page: int=100, ranks: list=None) -> str:
+    '''Page `page` (1-based) of a list of `total` films, or of the films `ranks` if given.'''
+    ranks = ranks if ranks is not None else range(1, total + 1)
+    return PAGE.format(title=title, total=len(ranks), films='\n'.join(film_html(rank) for rank in ranks[(page - 1) * per_page:page * per_page]))
+
+
+class ListPageServer():
+    '''Serves /list/ls<id>/?...&page=N from 127.0.0.1 on a free port.
+    throttle : {page: n} answers the first n requests for that page with HTTP 429
+    errors : {page: n} answers the first n requests for that page with HTTP 500
+    delay : seconds each response takes, so overlapping requests can be observed
+    ranks : films listed, in order, when set; otherwise films 1 to total
+    Bodies are gzipped when the client accepts it, and carry an ETag so unchanged pages answer conditional GETs with 304.
+    '''
+    def __init__(self, total: int=250, throttle: dict=None, errors: dict=None, delay: float=0.0) -> None:
+        self.total = total
+        self.throttle = dict(throttle or {})
+        self.errors = dict(errors or {})
+        self.delay = delay
+        self.ranks = None
+        self.requests = []
+        self.headers = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   ## keep-alive
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/list/ls000000001/'
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        page = int(parse_qs(urlparse(request.path).query).get('page', ['1'])[0])
+        with self._lock:
+            self.requests.append(page)
+            self.headers.append(dict(request.headers))
+            self.connections.add(request.client_address)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            status = 200
+            for code, counts in ((429, self.throttle), (500, self.errors)):
+                if counts.get(page, 0) > 0:
+                    counts[page] -= 1
+                    status = code
+                    break
+        try:
+            time.sleep(self.delay)
+            if status != 200:
+                request.send_response(status)
+                request.send_header('Retry-After', '0')
+                request.send_header('Content-Length', '0')
+                request.end_headers()
+                return
+            body = list_page_html(page, self.total, ranks=self.ranks).encode('utf-8')
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if request.headers.get('If-None-Match') == etag:
+                request.send_response(304)
+                request.send_header('ETag', etag)
+                request.send_header('Content-Length', '0')
+                request.end_headers()
+                return
+            request.send_response(200)
+            request.send_header('Content-Type', 'text/html; charset=utf-8')
+            request.send_header('ETag', etag)
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(body)
+                request.send_header('Content-Encoding', 'gzip')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def film_titles(soup) -> list:
+    return re.findall(r'Film Number \d+', str(soup))
@@ -0,0 +1,36 @@
+import unittest
+from bs4 import BeautifulSoup
+from utils.imdb_acquisition import IMDB, FilmColumns
+from tests.list_pages import film_html
+
+
+class TestFilmColumns(unittest.TestCase):
+    def setUp(self):
+        self.imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+        self.films = [self.imdb.get_film_data(BeautifulSoup(film_html(rank), 'html.parser').div) for rank in range(1, 121)]
+
+    def test_typed_columns(self):
+        frame = self.imdb.create_typed_frame(self.films)
+        for col in FilmColumns.INTS:
+            self.assertEqual(frame[col].dtype, 'int64', col)
+        for col in FilmColumns.FLOATS:
+            self.assertEqual(frame[col].dtype, 'float64', col)
+        self.assertEqual(frame.loc['Film Number 1', 'gross'], 1012345)
+        self.assertEqual(frame.loc['Film Number 1', 'star'][0], 'Tim Robbins')
+
+    def test_same_saved_frame_as_transpose(self):
+        typed = self.imdb.process_frame(self.imdb.create_typed_frame(self.films))
+        legacy = self.imdb.process_frame(self.imdb.create_frame({data['title']: data for data in self.films}))
+        self.assertEqual(typed.to_csv(), legacy.to_csv())
+
+    def test_repeated_title_keeps_position(self):
+        columns = FilmColumns(self.imdb.ATTRS)
+        columns.extend(self.films[:3] + [dict(self.films[0], gross='5', year='n/a')])
+        frame = columns.to_frame()
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(frame.index[0], 'Film Number 1')
+        self.assertEqual((frame.iloc[0]['gross'], frame.iloc[0]['year']), (5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
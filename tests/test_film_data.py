@@ -0,0 +1,68 @@
+import contextlib
+import io
+import unittest
+from bs4 import BeautifulSoup
+from utils.imdb_acquisition import IMDB
+from tests.list_pages import list_page_html
+from tests.test_imdb_acquisition import SHAWSHANK_HTML
+
+
+def legacy_film_data(imdb: IMDB, film) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):     ## get_all_attributes prints every attribute it misses
+        data = imdb.get_all_attributes(str(film))
+    data.update({'star': imdb.get_stars(str(film))})
+    return data
+
+
+class TestGetFilmData(unittest.TestCase):
+    def setUp(self):
+        self.imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+
+    def test_shawshank(self):
+        film = BeautifulSoup(SHAWSHANK_HTML, 'html.parser').div
+        data = self.imdb.get_film_data(film)
+        self.assertEqual(data['title'], 'The Shawshank Redemption')
+        self.assertEqual(data['title_id'], 'tt0111161')
+        self.assertEqual((data['year'], data['metacritic_rk'], data['metacritic_score'], data['imdb_score']), ('1994', '1', '80', '9.3'))
+        self.assertEqual((data['certificate'], data['runtime_mins'], data['genre'].strip()), ('R', '142', 'Drama'))
+        self.assertEqual(data['director'], 'Frank Darabont')
+        self.assertEqual(data['star'], ['Tim Robbins', 'Morgan Freeman', 'Bob Gunton', 'William Sadler'])
+        ## the legacy regexes miss these: the description spans a line break and the rating isn't in an ipl widget
+        self.assertEqual(data['description'], 'Two imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.')
+
+    def test_matches_legacy_extraction(self):
+        soup = BeautifulSoup(list_page_html(1, 100), 'html.parser')
+        films = self.imdb.get_films(soup)
+        self.assertEqual(len(films), 100)
+        for film in films:
+            self.assertEqual(self.imdb.get_film_data(film), legacy_film_data(self.imdb, film))
+
+    def test_missing_fields_default(self):
+        film = BeautifulSoup('<div class="lister-item-content"><h3><a href="/title/tt0000001/">Lost Film</a></h3></div>', 'html.parser').div
+        data = self.imdb.get_film_data(film)
+        self.assertEqual((data['title'], data['title_id'], data['year'], data['imdb_score']), ('Lost Film', 'tt0000001', '0', '0'))
+        self.assertEqual((data['director'], data['description'], data['gross'], data['star']), ('N/A', 'N/A', '0', ['N/A'] * 4))
+
+
+class TestPartialParse(unittest.TestCase):
+    def setUp(self):
+        self.body = list_page_html(1, 250, title='Partial List').encode('utf-8')
+        self.full = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False, partial=False)
+        self.partial = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+
+    def test_only_list_content_is_built(self):
+        soup = self.partial.parse(self.body)
+        self.assertEqual({tag.name for tag in soup.find_all(recursive=False)}, {'h1', 'div'})
+        self.assertIsNone(soup.find('nav'))
+        self.assertIsNone(soup.find('script'))
+
+    def test_same_data_as_full_tree(self):
+        full, partial = self.full.parse(self.body), self.partial.parse(self.body)
+        self.assertEqual(self.partial.get_list_title(partial), self.full.get_list_title(full))
+        self.assertEqual(self.partial.get_pages_in_list(partial), self.full.get_pages_in_list(full))
+        self.assertEqual([self.partial.get_film_data(film) for film in self.partial.get_films(partial)],
+                         [self.full.get_film_data(film) for film in self.full.get_films(full)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pandas import DataFrame
+from utils.film_overrides import OverrideTable, get_override_table
+
+
+def table(*rows):
+    return OverrideTable(DataFrame(list(rows), columns=['title', 'year', 'field', 'value']))
+
+
+class TestOverrideTable(unittest.TestCase):
+    def setUp(self):
+        self.frame = DataFrame({'title': ['Chinatown', 'CHINATOWN', 'Network', 'Roma'], 'year': [1974, 1990, 1976, 0],
+                                'gross': [0, 0, 5, 0]})
+
+    def test_fills_missing_gross_of_matching_films(self):
+        fixed = table(('Chinatown', 1974, 'gross', 23169837), ('Network', 1976, 'gross', 23700000)).apply(self.frame)
+        self.assertEqual(list(fixed['gross']), [23169837, 0, 5, 0])     ## other year; gross already known
+        self.assertEqual(list(self.frame['gross']), [0, 0, 5, 0])
+
+    def test_titles_matched_normalized(self):
+        fixed = table(('The Chinatown!', 1974, 'gross', 1)).apply(self.frame.assign(title_norm=['chinatown', 'chinatown', 'network', 'roma']))
+        self.assertEqual(list(fixed['gross']), [1, 0, 5, 0])
+
+    def test_untyped_frames_get_text(self):
+        fixed = table(('chinatown', '1974', 'gross', 23169837)).apply(self.frame.astype(str))
+        self.assertEqual(list(fixed['gross']), ['23169837', '0', '5', '0'])
+
+    def test_other_fields(self):
+        fixed = table(('Roma', '', 'year', 2018), ('Roma', '', 'gross', 5100000), ('Roma', '', 'director', 'Alfonso Cuarón')).apply(self.frame)
+        self.assertEqual((fixed['year'][3], fixed['gross'][3]), (2018, 5100000))
+        self.assertNotIn('director', fixed.columns)
+
+    def test_later_rows_win(self):
+        fixed = table(('Chinatown', 1974, 'gross', 1), ('Chinatown', 1974, 'gross', 2)).apply(self.frame)
+        self.assertEqual(fixed['gross'][0], 2)
+
+    def test_no_matches_returns_frame(self):
+        self.assertIs(table(('Heat', 1995, 'gross', 1)).apply(self.frame), self.frame)
+
+
+class TestOverrideFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'overrides.csv')
+
+    def test_file_overrides_gross_dct(self):
+        frame = DataFrame({'title': ['Chinatown', 'Heat'], 'year': [1974, 1995], 'gross': [0, 0]})
+        self.assertEqual(list(get_override_table(self.path).apply(frame)['gross']), [23169837, 0])
+        with open(self.path, 'w') as f:
+            f.write('title,year,field,value\nChinatown,1974,gross,1\nHeat,1995,gross,67436818\n')
+        self.assertEqual(list(get_override_table(self.path).apply(frame)['gross']), [1, 67436818])
+
+    def test_shipped_file_loads(self):
+        self.assertEqual(list(OverrideTable.read_csv('data/input/film_overrides.csv').columns), ['title', 'year', 'field', 'value'])
+        self.assertGreater(len(get_override_table()), 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
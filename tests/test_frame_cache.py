@@ -0,0 +1,94 @@
+import unittest
+from pandas import DataFrame
+from utils.frame_cache import FrameCache, cache_frame_data, call_fingerprint, size_of
+from utils.frame_store import SharedFrame
+
+
+def frame(n):
+    return DataFrame({'gross': range(n)})
+
+
+class TestFrameCache(unittest.TestCase):
+    def setUp(self):
+        self.size = size_of(frame(1000))
+        self.cache = FrameCache(budget=int(3.5 * self.size))
+        self.calls = []
+
+        @cache_frame_data(cache=self.cache)
+        def top(df, n):
+            self.calls.append(n)
+            return df.nlargest(n, 'gross')
+
+        @cache_frame_data(cache=self.cache)
+        def rows(n):
+            self.calls.append(n)
+            return frame(n)
+        self.top, self.rows = top, rows
+
+    def test_hits_and_misses_per_function(self):
+        df = frame(100)
+        self.top(df, 5), self.top(df, 5), self.top(df, 6), self.rows(10)
+        self.assertEqual(self.calls, [5, 6, 10])
+        stats = {name.rsplit('.', 1)[-1]: s for name, s in self.cache.summary().items()}
+        self.assertEqual((stats['top']['hits'], stats['top']['misses'], stats['top']['entries']), (1, 2, 2))
+        self.assertEqual((stats['rows']['hits'], stats['rows']['misses']), (0, 1))
+
+    def test_changed_frame_misses(self):
+        df = frame(100)
+        self.top(df, 5)
+        self.top(df.assign(gross=df['gross'] * 2), 5)
+        self.assertEqual(self.calls, [5, 5])
+
+    def test_least_recently_used_evicted_over_budget(self):
+        for n in (1000, 1001, 1002):
+            self.rows(n)
+        self.rows(1000)                     ## now the most recently used
+        self.rows(1003)                     ## over budget: 1001 goes
+        self.assertLessEqual(self.cache.bytes, self.cache.budget)
+        self.rows(1000), self.rows(1002), self.rows(1003)
+        self.assertEqual(self.calls, [1000, 1001, 1002, 1003])
+        self.rows(1001)
+        self.assertEqual(self.calls[-1], 1001)
+        stats = next(iter(self.cache.summary().values()))
+        self.assertEqual(stats['evictions'], 2)
+        self.assertEqual(stats['bytes'], self.cache.bytes)
+
+    def test_result_over_budget_not_kept(self):
+        self.rows(10000), self.rows(10000)
+        self.assertEqual(self.calls, [10000, 10000])
+        self.assertEqual(self.cache.bytes, 0)
+
+    def test_callers_get_copies(self):
+        self.rows(10)['gross'] = -1
+        self.assertEqual(self.rows(10)['gross'].min(), 0)
+
+    def test_results_from_shared_frames_are_shared(self):
+        shared = SharedFrame(frame(100), fingerprint='abc')
+        first, again = self.top(shared, 5), self.top(shared, 5)
+        self.assertIsInstance(first, SharedFrame)
+        self.assertEqual(first.fingerprint, again.fingerprint)
+        self.assertIs(type(self.top(frame(100), 5)), DataFrame)
+
+
+class TestCallFingerprint(unittest.TestCase):
+    def test_functions_differing_by_a_constant(self):
+        def top(df):
+            return df.nlargest(5, 'gross')
+        first = top
+
+        def top(df):
+            return df.nlargest(6, 'gross')
+        self.assertEqual(first.__code__.co_code, top.__code__.co_code)
+        self.assertNotEqual(call_fingerprint(first, (), {}), call_fingerprint(top, (), {}))
+
+    def test_functions_without_source(self):
+        funcs = []
+        for col in ('gross', 'year'):
+            namespace = {'__name__': 'page'}
+            exec(f"def top(df):\n    return df.nlargest(5, '{col}')", namespace)
+            funcs.append(namespace['top'])
+        self.assertNotEqual(call_fingerprint(funcs[0], (), {}), call_fingerprint(funcs[1], (), {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
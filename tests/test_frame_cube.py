@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal, assert_series_equal
+from utils.frame_cube import GROUPINGS, aggregate, build_cube, cube_metrics, frame_delta, group_stats, slice_cube, sort_cube, update_cube, with_missing
+from utils.frame_schema import apply_schema, read_film_list
+from utils.frame_store import FrameStore, get_frame_store
+
+DEMO = 'data/input/imdb_demo_list_wff.parquet'
+
+
+class TestFrameCube(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.frame = read_film_list(DEMO)
+        cls.cube = build_cube(cls.frame)
+
+    def test_slices_match_groupby(self):
+        self.assertIn('gross_adj_2023', cube_metrics(self.frame))
+        for by in GROUPINGS:
+            for metric in cube_metrics(self.frame):
+                with self.subTest(by=by, metric=metric):
+                    expected = aggregate(self.frame, by, [metric]).rename(columns=lambda col: col.replace(f'{metric}_', ''))
+                    assert_frame_equal(slice_cube(self.cube, by, metric), expected, check_index_type=False, check_categorical=False)
+
+    def test_mean_over_positive_values(self):
+        stats = group_stats(self.frame, 'director', 'imdb_score', self.cube)
+        rated = self.frame[self.frame['imdb_score'] > 0]
+        assert_series_equal(stats.loc[stats['count'] > 0, 'mean'], rated.groupby('director', observed=True)['imdb_score'].mean(), check_names=False)
+        assert_series_equal(stats['films'], self.frame.groupby('director', observed=True).size(), check_names=False)
+
+    def test_with_missing_matches_agg(self):
+        stats = with_missing(group_stats(self.frame, ['decade', 'genre1'], 'gross', self.cube))[['mean', 'count']]
+        expected = self.frame.groupby(['decade', 'genre1'], observed=True)['gross'].agg(['mean', 'count'])
+        assert_frame_equal(stats, expected, check_dtype=False, check_categorical=False)
+
+    def test_falls_back_to_frame(self):
+        self.assertIsNone(slice_cube(self.cube, ['genre2'], 'gross'))
+        self.assertIsNone(slice_cube(self.cube, ['director'], 'gross_adj_1990'))
+        stats = group_stats(self.frame, 'genre2', 'gross', self.cube)
+        assert_series_equal(stats['films'], self.frame.groupby('genre2', observed=True).size(), check_names=False)
+
+
+def changed_list(frame, seed):
+    '''frame with a few films dropped, a few rescored and a few added, some by directors new to the list or with none.'''
+    rng = np.random.default_rng(seed)
+    new = frame[rng.random(len(frame)) > rng.random() * 0.05].astype({'director': object})
+    rescored = rng.choice(len(new), rng.integers(0, 15), replace=False)
+    for col, high in (('gross', 10**9), ('imdb_score', 100), ('metacritic_score', 100), ('combo_score', 100)):
+        values = rng.integers(0, high, len(rescored)) * (rng.random(len(rescored)) < 0.8)
+        new[col] = new[col].astype('float64' if col == 'combo_score' else 'int64')
+        new.iloc[rescored, new.columns.get_loc(col)] = values
+    added = frame.sample(rng.integers(0, 25), random_state=seed).astype({'director': object})
+    added['title_id'] = added['title_id'].astype(str) + f'-{seed}'
+    added['director'] = added['director'].where(rng.random(len(added)) < 0.5, 'Someone New')
+    return apply_schema(pd.concat([new, added], ignore_index=True), report=False)
+
+
+class TestUpdatedCube(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        frame = read_film_list(DEMO)
+        cls.frame = frame[~frame['title_id'].duplicated()].reset_index(drop=True)
+        cls.cube = build_cube(cls.frame)
+
+    def test_random_changes_match_build(self):
+        for seed in range(30):
+            with self.subTest(seed=seed):
+                frame = changed_list(self.frame, seed)
+                removed, added = frame_delta(self.frame, frame)
+                assert_frame_equal(sort_cube(update_cube(self.cube, frame, removed, added)), sort_cube(build_cube(frame)), check_exact=False)
+
+    def test_delta(self):
+        frame = self.frame.drop(index=[0, 1]).assign(gross=lambda df: df['gross'].where(df.index != 2, 1))
+        removed, added = frame_delta(self.frame, frame)
+        self.assertEqual(sorted(removed['title_id']), sorted(self.frame['title_id'][:3]))
+        self.assertEqual(list(added['title_id']), [self.frame['title_id'][2]])
+        with self.assertRaises(ValueError):
+            frame_delta(self.frame, pd.concat([frame, frame.head(1)]))
+
+
+class TestStoredCube(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_built_at_share_and_reloaded(self):
+        handle = get_frame_store(self.dir).share_file('wff', DEMO)
+        self.assertTrue(os.path.exists(handle.cube_path))
+        with mock.patch('utils.frame_store.build_cube', side_effect=AssertionError('rebuilt')):
+            cube = FrameStore(self.dir).load_cube(handle)      ## another process, or a restart
+        assert_frame_equal(cube, build_cube(read_film_list(DEMO)), check_categorical=False)
+        self.assertEqual(cube.fingerprint, f'{handle.digest}-cube')
+
+    def test_built_for_frame_shared_without_one(self):
+        handle = get_frame_store(self.dir).share('wff', read_film_list(DEMO))
+        os.remove(handle.cube_path)
+        self.assertFalse(FrameStore(self.dir).load_cube(handle).empty)
+        self.assertTrue(os.path.exists(handle.cube_path))
+
+    def test_updated_when_list_shared_again(self):
+        store = FrameStore(self.dir)
+        frame = read_film_list(DEMO)
+        frame = frame[~frame['title_id'].duplicated()].reset_index(drop=True)
+        store.share('wff', frame)
+        changed = changed_list(frame, 0)
+        with mock.patch('utils.frame_store.build_cube', side_effect=AssertionError('rebuilt')):
+            handle = store.share('wff', changed)
+        assert_frame_equal(sort_cube(store.load_cube(handle)), sort_cube(build_cube(changed)), check_exact=False, check_categorical=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import logging
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from bs4 import BeautifulSoup
+from pandas import Series, concat
+from pandas.testing import assert_frame_equal
+from utils.frame_ranks import RankIndex, update_ranks
+from utils.frame_schema import read_film_list, write_film_list
+from utils.imdb_acquisition import IMDB
+from tests.list_pages import film_html
+
+
+def dense(values):
+    return Series(values, dtype='float64').rank(ascending=False, method='dense').to_numpy()
+
+
+class TestRankIndex(unittest.TestCase):
+    def test_rank_is_dense_descending(self):
+        values = np.array([7.1, 8.0, 7.1, 0.0, 9.3])
+        np.testing.assert_array_equal(RankIndex.from_values(values).rank(values), dense(values))
+
+    def test_from_ranks_without_sorting(self):
+        values = np.array([7.1, 8.0, 7.1, 9.3])
+        index = RankIndex.from_ranks(values, dense(values))
+        self.assertFalse(index.changed)
+        np.testing.assert_array_equal(index.values, [7.1, 8.0, 9.3])
+        np.testing.assert_array_equal(index.counts, [2, 1, 1])
+
+    def test_ranks_that_dont_fit_are_recomputed(self):
+        self.assertTrue(RankIndex.from_ranks(np.array([7.0, 8.0]), np.array([1, 2])).changed)       ## ascending, not descending
+        self.assertTrue(RankIndex.from_ranks(np.array([7.0, 8.0]), np.array([3, 1])).changed)       ## a gap
+        self.assertTrue(RankIndex.from_ranks(np.array([7.0, 8.0]), np.array([0, 1])).changed)
+
+    def test_only_new_values_move_ranks(self):
+        index = RankIndex.from_values(np.array([5.0, 6.0]))
+        index.add(np.array([6.0]))
+        self.assertFalse(index.changed)
+        index.add(np.array([5.5]))
+        self.assertTrue(index.changed)
+
+    def test_remove_missing_value(self):
+        with self.assertRaises(ValueError):
+            RankIndex.from_values(np.array([5.0])).remove(np.array([6.0]))
+        with self.assertRaises(ValueError):
+            RankIndex.from_values(np.array([5.0, np.nan]))
+
+    def test_update_ranks_matches_full_rank(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            old = rng.integers(0, 20, rng.integers(1, 40)).astype(float)
+            kept = rng.random(len(old)) < 0.8
+            new = rng.integers(0, 25, rng.integers(0, 10)).astype(float)
+            kept_ranks, new_ranks = update_ranks(old, dense(old), kept, new)
+            np.testing.assert_array_equal(np.concatenate([kept_ranks, new_ranks]), dense(np.concatenate([old[kept], new])))
+
+
+class TestUpdateFrame(unittest.TestCase):
+    '''Frames updated by update_frame() against finish_frame() over every film, on random drops, changed films and appends.'''
+    def setUp(self):
+        self.imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+        self.base = [self.imdb.get_film_data(BeautifulSoup(film_html(rank), 'html.parser').div) for rank in range(1, 101)]
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def film(self, rng, i):
+        film = dict(rng.choice(self.base), title=f'Film {i}', title_id=f'tt{i:07d}')
+        film['metacritic_score'] = str(rng.choice([0, rng.randint(20, 100)]))
+        film['imdb_score'] = f'{rng.randint(1, 9)}.{rng.randint(0, 9)}'
+        film['gross'] = f'{rng.choice([0, rng.randint(1, 5000) * 1000]):,}'
+        film['year'] = str(rng.choice([1950, 1984, 2001, 2019, rng.randint(1930, 2023)]))
+        if rng.random() < 0.05:         ## a duplicate of another film under a new id
+            film['title'] = f'Film {rng.randint(0, i)}'
+        return film
+
+    def test_random_updates_match_full_finish(self):
+        path = os.path.join(self.dir, 'snapshot.parquet')
+        for seed in range(15):
+            rng = random.Random(seed)
+            films = [self.film(rng, i) for i in range(rng.randint(5, 200))]
+            added = len(films)
+            snapshot = self.imdb.process_frame(self.imdb.create_typed_frame(films)).reset_index(drop=True)
+            for step in range(4):
+                write_film_list(snapshot, path)
+                snapshot = read_film_list(path)     ## as refresh_list() finds it
+                ids = list(snapshot['title_id'])
+                dropped = set(rng.sample(ids, rng.randint(0, min(5, len(ids)))))
+                changed = [dict(self.film(rng, 0), title=title, title_id=title_id)
+                           for title, title_id in snapshot[['title', 'title_id']].sample(rng.randint(0, min(5, len(ids))), random_state=seed).values]
+                appended = [self.film(rng, added + i) for i in range(rng.randint(1, 15))]
+                added += len(appended)
+                new_rows = self.imdb.enrich_frame(self.imdb.create_typed_frame(changed + appended))
+                kept = ~snapshot['title_id'].isin(dropped) & ~snapshot['title_id'].isin(new_rows['title_id'])
+                with self.subTest(seed=seed, step=step):
+                    with mock.patch.object(self.imdb, 'finish_frame', side_effect=AssertionError('finished in full')):
+                        updated = self.imdb.update_frame(snapshot, kept, new_rows)
+                    full = self.imdb.finish_frame(concat([self.imdb.unfinish_frame(snapshot)[kept.to_numpy()], new_rows]))
+                    assert_frame_equal(updated.reset_index(drop=True), full.reset_index(drop=True))
+                snapshot = updated.reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from bs4 import BeautifulSoup
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+from utils.frame_schema import apply_schema, csv_to_parquet, read_film_csv, read_film_list, write_film_list
+from utils.imdb_acquisition import IMDB
+from tests.list_pages import film_html
+
+
+class TestApplySchema(unittest.TestCase):
+    def test_downcast_where_values_fit(self):
+        frame = apply_schema(DataFrame({'year': [1994, 2001], 'gross_rk': [1, 70000], 'imdb_votes': [10.0, float('nan')],
+                                        'combo_score': [91.5, 0.0], 'critic_vs_ppl': [5, -10], 'certificate': ['R', 'R'], 'title': ['A', 'B']}), report=False)
+        self.assertEqual(frame['year'].dtype, 'int16')
+        self.assertEqual(frame['gross_rk'].dtype, 'int32')        ## widened rather than wrapped
+        self.assertEqual(frame['imdb_votes'].dtype, 'float64')    ## NaN can't be an int
+        self.assertEqual(frame['combo_score'].dtype, 'float32')
+        self.assertEqual(frame['critic_vs_ppl'].dtype, 'int16')   ## float32 column holding ints
+        self.assertEqual(frame['certificate'].dtype, 'category')
+        self.assertEqual(frame['title'].dtype, object)            ## not in the schema
+        self.assertEqual(frame['gross_rk'].tolist(), [1, 70000])
+
+    def test_high_cardinality_text_stays_object(self):
+        frame = apply_schema(DataFrame({'director': ['A', 'B', 'C', 'A']}), report=False)
+        self.assertEqual(frame['director'].dtype, object)
+
+    def test_demo_list(self):
+        frame = read_film_list('data/input/imdb_demo_list_wff.parquet')
+        self.assertEqual(frame['genre1'].dtype, 'category')
+        self.assertEqual(frame['runtime_mins'].dtype, 'int16')
+        self.assertEqual(frame['gross_adj_2023'].dtype, 'int64')
+
+
+class TestProcessedFrame(unittest.TestCase):
+    def test_process_frame_is_typed(self):
+        imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+        films = [imdb.get_film_data(BeautifulSoup(film_html(rank), 'html.parser').div) for rank in range(1, 121)]
+        frame = imdb.process_frame(imdb.create_typed_frame(films))
+        self.assertEqual(frame['metacritic_score'].dtype, 'int16')
+        self.assertEqual(frame['combo_score'].dtype, 'float32')
+        self.assertEqual(frame['combo_rk'].dtype, 'int16')
+        self.assertEqual(frame['critic_vs_ppl_bin'].dtype, 'category')
+        self.assertEqual(frame['certificate'].dtype, 'category')
+
+
+class TestFilmListStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def export(self, stem: str) -> str:
+        '''A demo list as the Home page's CSV download has it.'''
+        path = os.path.join(self.dir, f'{stem}.csv')
+        read_film_list(f'data/input/{stem}.parquet').to_csv(path, index=False)
+        return path
+
+    def test_parquet_keeps_dtypes(self):
+        frame = read_film_csv(self.export('imdb_demo_list_wff'))
+        path = os.path.join(self.dir, 'list.parquet')
+        write_film_list(frame, path)
+        assert_frame_equal(read_film_list(path), frame)
+        assert_frame_equal(read_film_list(path, ['title', 'critic_vs_ppl_bin']), frame[['title', 'critic_vs_ppl_bin']])
+
+    def test_csv_converts_back_to_demo_parquet(self):
+        for stem in ('imdb_demo_list_big_rando', 'imdb_demo_list_wff', 'imdb_demo_list_SMALL'):
+            assert_frame_equal(read_film_list(csv_to_parquet(self.export(stem))), read_film_list(f'data/input/{stem}.parquet'))
+
+    def test_csv_columns(self):
+        frame = read_film_list(self.export('imdb_demo_list_wff'), ['title', 'year'])
+        self.assertEqual((frame.columns.tolist(), frame['year'].dtype), (['title', 'year'], 'int16'))
+
+
+if __name__ == '__main__':
+    unittest.main()
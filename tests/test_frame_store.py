@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+from streamlit.testing.v1 import AppTest
+from utils.frame_schema import read_film_list
+from utils.frame_store import FrameStore, SharedFrame, frame_digest, get_frame_store
+from utils import frame_cache
+from utils.frame_cache import call_fingerprint
+from utils.inflation import add_gross_adj_cols
+
+DEMO = 'data/input/imdb_demo_list_wff.parquet'
+
+
+class TestFrameStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = get_frame_store(self.dir)
+        self.frame = read_film_list(DEMO)
+
+    def test_sessions_share_one_frame(self):
+        first = self.store.share('wff', self.frame)
+        second = self.store.share('wff', self.frame.copy())
+        self.assertEqual(first, second)
+        self.assertIs(first.frame(), second.frame())
+        assert_frame_equal(first.frame(), self.frame)
+        self.assertEqual(sorted(os.listdir(self.dir)), [os.path.basename(first.path), os.path.basename(first.cube_path)])
+
+    def test_numeric_columns_are_read_only(self):
+        frame = self.store.share('wff', self.frame).frame()
+        self.assertFalse(frame['gross'].values.flags.writeable)
+        self.assertEqual(frame['genre1'].dtype, 'category')
+
+    def test_changed_frame_gets_new_handle(self):
+        changed = self.frame.assign(gross=self.frame['gross'] + 1)
+        self.assertNotEqual(frame_digest(changed), frame_digest(self.frame))
+        self.assertNotEqual(self.store.share('wff', changed), self.store.share('wff', self.frame))
+
+    def test_file_read_once(self):
+        handle = self.store.share_file('wff', DEMO)
+        self.assertIs(self.store.share_file('wff', DEMO), handle)
+        fresh = FrameStore(self.dir).load(handle)      ## another process maps the same file
+        assert_frame_equal(fresh, self.frame)
+
+    def test_adjusted_frame_shares_columns(self):
+        handle = self.store.share('wff', self.frame)
+        shared, adjusted = handle.frame(), handle.adjusted(1990)
+        self.assertIs(handle.adjusted(1990), adjusted)
+        self.assertEqual(adjusted.fingerprint, f'{handle.digest}-adj1990')
+        self.assertNotEqual(handle.adjusted(2000).fingerprint, adjusted.fingerprint)
+        self.assertTrue(np.shares_memory(adjusted['gross'].values, shared['gross'].values))
+        self.assertNotIn('gross_adj_1990', shared.columns)
+        expected = add_gross_adj_cols(self.frame, 1990)
+        assert_frame_equal(DataFrame(adjusted), expected[list(adjusted.columns)])
+
+
+def cached_transforms(handle):
+    import streamlit as st
+    from utils.frame_store import FrameHandle
+    from utils.frame_cache import cache_frame_data
+    calls = []
+
+    @cache_frame_data
+    def sort_frame(df, col):
+        calls.append(col)
+        return df.sort_values(col)
+
+    shared = FrameHandle(*handle).frame()
+    first, again, other = sort_frame(shared, 'year'), sort_frame(shared, 'year'), sort_frame(shared, 'gross')
+    st.write(f'{calls} {type(first).__name__} {first.fingerprint == again.fingerprint != other.fingerprint}')
+
+
+class TestFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.handle = get_frame_store(self.dir).share('wff', read_film_list(DEMO))
+
+    def test_derived_frames_are_plain(self):
+        shared = self.handle.frame()
+        self.assertEqual(shared.fingerprint, self.handle.digest)
+        self.assertIs(type(shared[shared['year'] > 2000]), DataFrame)
+        self.assertIs(type(shared.assign(x=1)), DataFrame)
+
+    def test_call_fingerprint(self):
+        def f(df, n): pass
+        shared = self.handle.frame()
+        self.assertEqual(call_fingerprint(f, (shared, 1), {}), call_fingerprint(f, (SharedFrame(shared.copy(), fingerprint=shared.fingerprint), 1), {}))
+        self.assertNotEqual(call_fingerprint(f, (shared, 1), {}), call_fingerprint(f, (shared, 2), {}))
+
+    def test_cache_keyed_on_fingerprint(self):
+        at = AppTest.from_function(cached_transforms, args=(tuple(self.handle),)).run()
+        self.assertFalse(at.exception)
+        self.assertEqual(at.markdown[0].value, "['year', 'gross'] SharedFrame True")
+
+    def test_gross_pages_key_on_fingerprints(self):
+        for page in ('pages/Box_Office.py', 'pages/Directors.py'):
+            with self.subTest(page=page), mock.patch.object(frame_cache, 'frame_digest', wraps=frame_cache.frame_digest) as digest:
+                at = AppTest.from_file(page, default_timeout=120).run()
+                self.assertFalse(at.exception)
+                self.assertEqual(digest.call_count, 0)      ## no transform hashed a frame to key its cache
+
+
+if __name__ == '__main__':
+    unittest.main()
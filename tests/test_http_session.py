@@ -0,0 +1,38 @@
+import unittest
+from utils.http_session import RequestLog, build_session, timed_get
+from tests.list_pages import ListPageServer
+
+
+class TestHTTPSession(unittest.TestCase):
+    def setUp(self):
+        self.session = build_session(backoff_factor=0)
+        self.log = RequestLog()
+
+    def test_compressed_keep_alive(self):
+        with ListPageServer(total=250) as server:
+            for page in (1, 2, 3):
+                r = timed_get(f'{server.url}?page={page}', self.session, log=self.log)
+                self.assertEqual(r.status_code, 200)
+
+        self.assertIn('gzip', server.headers[0]['Accept-Encoding'])
+        self.assertEqual(len(server.connections), 1)
+        stat = self.log.stats[-1]
+        self.assertEqual(stat.bytes, len(r.content))
+        self.assertLess(stat.wire_bytes, stat.bytes)
+        self.assertEqual(self.log.summary()['requests'], 3)
+
+    def test_retries_transient_errors(self):
+        with ListPageServer(total=250, errors={1: 2}) as server:
+            r = timed_get(f'{server.url}?page=1', self.session, log=self.log)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(server.requests, [1, 1, 1])
+
+    def test_timeout(self):
+        with ListPageServer(total=250, delay=1) as server:
+            with self.assertRaises(Exception):
+                timed_get(f'{server.url}?page=1', build_session(retries=0), timeout=.2, log=self.log)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,11 @@ import unittest
 from utils.imdb_acquisition import IMDB
 import pandas as pd
 
+
+## one film block of a list page in detail mode.  Also used by benchmarks/bench_extract.py
+SHAWSHANK_HTML = '<div class="lister-item-content">\n<h3 class="lister-item-header">\n<span class="lister-item-index unbold text-primary">1.</span>\n<a href="/title/tt0111161/">The Shawshank Redemption</a>\n<span class="lister-item-year text-muted unbold">(1994)</span>\n</h3>\n<p class="text-muted">\n<span class="certificate">R</span>\n<span class="ghost">|</span>\n<span class="runtime">142 min</span>\n<span class="ghost">|</span>\n<span class="genre">\nDrama            </span>\n</p>\n<div class="ratings-bar">\n<div class="inline-block ratings-imdb-rating" name="ir" data-value="9.3">\n<span class="global-sprite rating-star imdb-rating"></span>\n<strong>9.3</strong>\n</div>\n<div class="inline-block ratings-metascore" name="ms" data-value="80">\n<span class="metascore favorable">80        </span>\n        Metascore\n</div>\n</div>\n<p class="">\nTwo imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.\n</p>\n<p class="text-muted">\nDirector:\n<a href="/name/nm0001104/">Frank Darabont</a>\n<span class="ghost">|</span>\nStars:\n<a href="/name/nm0000209/">Tim Robbins</a>,\n<a href="/name/nm0000151/">Morgan Freeman</a>,\n<a href="/name/nm0006669/">Bob Gunton</a>,\n<a href="/name/nm0006667/">William Sadler</a>\n</p>\n</div>'
+
+
 class TestIMDBScraper(unittest.TestCase):
     def setUp(self):
         self.url = "https://www.imdb.com/list/ls040479474/?sort=list_order,asc&st_dt=&mode=detail&page=1"
@@ -33,7 +38,7 @@ class TestIMDBScraper(unittest.TestCase):
         self.assertTrue(len(films) > 0)
 
     def test_get_all_attributes(self):
-        text = '<div class="lister-item-content">\n<h3 class="lister-item-header">\n<span class="lister-item-index unbold text-primary">1.</span>\n<a href="/title/tt0111161/">The Shawshank Redemption</a>\n<span class="lister-item-year text-muted unbold">(1994)</span>\n</h3>\n<p class="text-muted">\n<span class="certificate">R</span>\n<span class="ghost">|</span>\n<span class="runtime">142 min</span>\n<span class="ghost">|</span>\n<span class="genre">\nDrama            </span>\n</p>\n<div class="ratings-bar">\n<div class="inline-block ratings-imdb-rating" name="ir" data-value="9.3">\n<span class="global-sprite rating-star imdb-rating"></span>\n<strong>9.3</strong>\n</div>\n<div class="inline-block ratings-metascore" name="ms" data-value="80">\n<span class="metascore favorable">80        </span>\n        Metascore\n</div>\n</div>\n<p class="">\nTwo imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.\n</p>\n<p class="text-muted">\nDirector:\n<a href="/name/nm0001104/">Frank Darabont</a>\n<span class="ghost">|</span>\nStars:\n<a href="/name/nm0000209/">Tim Robbins</a>,\n<a href="/name/nm0000151/">Morgan Freeman</a>,\n<a href="/name/nm0006669/">Bob Gunton</a>,\n<a href="/name/nm0006667/">William Sadler</a>\n</p>\n</div>'
+        text = SHAWSHANK_HTML
         expected_attributes = {
             'title': 'The Shawshank Redemption',
             'year': '1994',
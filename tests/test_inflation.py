@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from utils.inflation import CPI_PATH, get_cpi_table, add_gross_adj_cols
+from utils.utilities import adjust_for_inflation
+
+
+class TestCPITable(unittest.TestCase):
+    def setUp(self):
+        self.cpi = get_cpi_table()
+
+    def test_loaded_once(self):
+        self.assertIs(get_cpi_table(), self.cpi)
+
+    def test_adjust_matches_scalar(self):
+        gross = pd.Series([1000000, 2000000, 500])
+        years = pd.Series([1994, 1972, 1950])
+        expected = [adjust_for_inflation(g, y, 2023) for g, y in zip(gross, years)]
+        np.testing.assert_array_equal(self.cpi.adjust(gross, years, 2023), expected)
+
+    def test_clamps_years_outside_cpi_data(self):
+        self.assertEqual(adjust_for_inflation(100, 1850, 2023), adjust_for_inflation(100, self.cpi.min_year, 2023))
+        self.assertEqual(adjust_for_inflation(100, 1994, 2099), adjust_for_inflation(100, 1994, self.cpi.max_year))
+
+    def test_scalar_accepts_year_strings(self):
+        self.assertEqual(adjust_for_inflation(100, '1994', '2023'), adjust_for_inflation(100, 1994.0, 2023))
+        with self.assertRaises(ValueError):
+            adjust_for_inflation(100, 'nineteen', 2023)
+
+
+class TestGrossAdjCols(unittest.TestCase):
+    def setUp(self):
+        self.frame = pd.DataFrame({
+            'title': ['The Shawshank Redemption', 'The Godfather', 'TV Movie'],
+            'year': [1994, 1972, 0],
+            'gross': [1000000, 2000000, 5000]
+        })
+
+    def test_any_target_year(self):
+        frame = add_gross_adj_cols(self.frame, 1990)
+        self.assertEqual(frame['gross_adj_1990'].tolist(), [int(adjust_for_inflation(1000000, 1994, 1990)), int(adjust_for_inflation(2000000, 1972, 1990)), 0])
+        self.assertEqual(frame['gross_adj_1990_rk'].tolist(), [2, 1, 3])
+
+    def test_target_year_outside_cpi_data(self):
+        with self.assertRaises(ValueError):
+            add_gross_adj_cols(self.frame, 2099)
+
+    def test_reloads_when_cpi_file_changes(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'cpi.csv')
+        shutil.copy(CPI_PATH, path)
+        table = get_cpi_table(path)
+        with self.assertRaises(ValueError):
+            add_gross_adj_cols(self.frame, table.max_year + 1, path=path)
+
+        with open(path, 'a') as f:
+            f.write(f'\n{table.max_year + 1},{table.cpi[-1] * 2}')
+        self.assertIsNot(get_cpi_table(path), table)
+        frame = add_gross_adj_cols(self.frame, table.max_year + 1, path=path)
+        self.assertEqual(frame[f'gross_adj_{table.max_year + 1}'].tolist()[2], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from utils.imdb_acquisition import IMDB, SCHEMA_VERSION
+from utils.list_registry import ListRegistry, get_list_registry
+from utils.frame_schema import read_film_list, write_film_list
+from utils.rate_limiter import TokenBucket
+from tests.list_pages import ListPageServer
+
+
+class TestListRegistry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'imdb_list_ls1.csv')
+        with open(self.path, 'w') as f:
+            f.write('title\nA Film\n')
+        self.registry = ListRegistry(self.dir)
+
+    def test_fresh_entry(self):
+        self.registry.register('ls1', self.path, rows=1, schema_version=1, title='Test List')
+        entry = self.registry.fresh('ls1', schema_version=1, ttl=60)
+        self.assertEqual((entry.title, entry.rows, entry.path), ('Test List', 1, self.path))
+        self.assertEqual(ListRegistry(self.dir).get('ls1'), entry)      ## persisted
+
+    def test_stale_old_schema_or_missing_file(self):
+        self.registry.register('ls1', self.path, rows=1, schema_version=1)
+        self.assertIsNone(self.registry.fresh('ls1', schema_version=1, ttl=-1))
+        self.assertIsNone(self.registry.fresh('ls1', schema_version=2, ttl=60))
+        os.remove(self.path)
+        self.assertIsNone(self.registry.fresh('ls1', schema_version=1, ttl=60))
+        self.assertIsNone(self.registry.fresh('ls2', schema_version=1, ttl=60))
+
+
+class TestRegisteredScrape(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def imdb(self, url):
+        imdb = IMDB(url, limiter=TokenBucket(requests=1000, window=1.0), use_cache=False, scrape=False, parse_workers=0)
+        imdb.OUTPUT_DIR = imdb.JOB_DIR = self.dir
+        return imdb
+
+    def test_saved_list_served_without_requests(self):
+        with ListPageServer(total=150) as server:
+            imdb = self.imdb(server.url)
+            scraped = imdb.scrape_list(server.url)
+            server.requests.clear()
+            loaded = imdb.load_registered('ls000000001', ttl=60)
+            self.assertEqual(server.requests, [])
+        self.assertEqual(loaded.shape, scraped.shape)
+        self.assertEqual(loaded['title_id'].tolist(), scraped['title_id'].tolist())
+        entry = get_list_registry(self.dir).get('ls000000001')
+        self.assertEqual((entry.rows, entry.schema_version, entry.title), (150, SCHEMA_VERSION, 'Test List'))
+        self.assertIsNone(imdb.load_registered('ls000000001', ttl=-1))
+        self.assertTrue(entry.path.endswith('.parquet'))
+        self.assertEqual(imdb.load_registered('ls000000001', ttl=60, columns=['title', 'year']).columns.tolist(), ['title', 'year'])
+
+    def test_list_saved_before_title_norm(self):
+        with ListPageServer(total=150) as server:
+            imdb = self.imdb(server.url)
+            scraped = imdb.scrape_list(server.url)
+            path = get_list_registry(self.dir).get('ls000000001').path
+            write_film_list(read_film_list(path).drop(columns='title_norm'), path)      ## as saved in schema 1
+            get_list_registry(self.dir).register('ls000000001', path, rows=150, schema_version=1)
+            self.assertIsNone(imdb.load_registered('ls000000001', ttl=60))
+            refreshed = self.imdb(server.url).refresh_list(server.url)     ## the snapshot gets title_norm as it's read
+        self.assertEqual(refreshed.columns.tolist(), scraped.columns.tolist())
+        self.assertEqual(refreshed['title_norm'].tolist(), scraped['title_norm'].tolist())
+        self.assertEqual(get_list_registry(self.dir).get('ls000000001').schema_version, SCHEMA_VERSION)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+from utils.imdb_acquisition import IMDB
+from concurrent.futures.process import BrokenProcessPool
+from utils.page_pipeline import START_METHOD, PipelineStats, get_parse_pool, iter_pipeline
+from utils.rate_limiter import TokenBucket
+from tests.list_pages import ListPageServer
+
+
+def slow_fetch(url: str) -> bytes:
+    time.sleep(0.05 if url.endswith('0') else 0.0)    ## some pages finish downloading after later ones
+    return url.encode('utf-8')
+
+
+class TestIterPipeline(unittest.TestCase):
+    def test_results_in_url_order(self):
+        urls = [f'page{i}' for i in range(12)]
+        stats = PipelineStats(queue_size=3)
+        self.assertEqual(list(iter_pipeline(urls, slow_fetch, len, fetchers=4, parse_workers=1, queue_size=3, stats=stats)), [len(u) for u in urls])
+        summary = stats.summary()
+        self.assertEqual(summary['pages'], 12)
+        self.assertLessEqual(summary['queue_high_water'], 3)
+        self.assertEqual(summary['fetch_bytes'], sum(len(u) for u in urls))
+
+    def test_fetch_error_raised(self):
+        def fetch(url):
+            if url == 'bad':
+                raise ValueError(url)
+            return b'ok'
+        with self.assertRaises(ValueError):
+            list(iter_pipeline(['a', 'bad', 'c'], fetch, len, parse_workers=1))
+
+    def test_broken_pool_replaced(self):
+        pool = get_parse_pool(3)
+        self.assertEqual(pool._mp_context.get_start_method(), START_METHOD)     ## not forked from this (threaded) process
+        for pid in list(pool._processes):
+            os.kill(pid, signal.SIGKILL)        ## as the OOM killer would
+        urls = [f'page{i}' for i in range(6)]
+        with self.assertRaises(BrokenProcessPool):
+            list(iter_pipeline(urls, slow_fetch, len, parse_workers=3))
+        self.assertIsNot(get_parse_pool(3), pool)
+        self.assertEqual(list(iter_pipeline(urls, slow_fetch, len, parse_workers=3)), [len(u) for u in urls])
+
+
+class TestIMDBPipeline(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def films(self, url, parse_workers):
+        imdb = IMDB(url, limiter=TokenBucket(requests=1000, window=1.0), use_cache=False, scrape=False, parse_workers=parse_workers)
+        imdb.JOB_DIR = tempfile.mkdtemp(dir=self.dir)    ## a fresh job each time, rather than resuming the last one
+        return list(imdb.iter_films(url)), imdb.pipeline_stats
+
+    def test_same_films_as_in_thread_parsing(self):
+        with ListPageServer(total=450) as server:
+            piped, stats = self.films(server.url, 1)
+            threaded, _ = self.films(server.url, 0)
+        self.assertEqual(piped, threaded)
+        self.assertEqual(stats.summary()['pages'], 4)      ## page 1 is parsed up front to count the pages
+
+
+if __name__ == '__main__':
+    unittest.main()
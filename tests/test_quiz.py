@@ -0,0 +1,72 @@
+import unittest
+from pandas import DataFrame
+from utils.quiz import DEFAULT_FILTERS, Decade, Genre, MinVotes, QuizDeck, get_quiz_deck, judge_guess
+from utils.title_index import TitleIndex
+
+
+class TestQuizDeck(unittest.TestCase):
+    def setUp(self):
+        self.frame = DataFrame({'title': [f'Film {i}' for i in range(8)],
+                                'genre1': ['Drama', 'Documentary', 'Comedy', 'Drama', 'Documentary', 'Horror', 'Drama', None],
+                                'genre2': [None, 'Music', 'Documentary', 'Crime', None, 'Comedy', None, None],
+                                'decade': [1970, 1980, 1990, 1970, 2000, 1980, 2010, 1970],
+                                'imdb_votes': [10, 500, 2000, 30, 900, 100000, 50, 700]})
+
+    def draw_all(self, deck):
+        rows = []
+        while (row := deck.draw()) is not None:
+            rows.append(row)
+        return rows
+
+    def test_each_eligible_film_drawn_once(self):
+        deck = QuizDeck.deal(self.frame)
+        self.assertEqual(len(deck), 6)
+        self.assertEqual(sorted(self.draw_all(deck)), [0, 2, 3, 5, 6, 7])       ## documentaries (by genre1) left out
+        self.assertIsNone(deck.draw())
+        self.assertEqual(len(deck), 0)
+
+    def test_filters(self):
+        self.assertEqual(sorted(self.draw_all(QuizDeck.deal(self.frame, [Genre(('Comedy',))]))), [2, 5])
+        self.assertEqual(sorted(self.draw_all(QuizDeck.deal(self.frame, [Decade((1970, 1980)), MinVotes(100)]))), [1, 5, 7])
+        self.assertEqual(sorted(self.draw_all(QuizDeck.deal(self.frame, [Genre(('Documentary',), exclude=True)]))), [0, 3, 5, 6, 7])
+
+    def test_shuffled_once(self):
+        self.assertEqual(self.draw_all(QuizDeck.deal(self.frame, seed=1)), self.draw_all(QuizDeck.deal(self.frame, seed=1)))
+        orders = {tuple(self.draw_all(QuizDeck.deal(self.frame, seed=seed))) for seed in range(20)}
+        self.assertGreater(len(orders), 1)
+
+    def test_kept_for_same_list_and_filters(self):
+        deck = get_quiz_deck(None, self.frame)
+        deck.draw()
+        self.assertIs(get_quiz_deck(deck, self.frame, DEFAULT_FILTERS), deck)
+        self.assertIsNot(get_quiz_deck(deck, self.frame, [MinVotes(100)]), deck)
+        self.assertIsNot(get_quiz_deck(deck, self.frame.head(5)), deck)
+
+
+class TestJudgeGuess(unittest.TestCase):
+    def setUp(self):
+        self.titles = TitleIndex.from_frame(DataFrame({'title': ['Aliens', 'The Godfather', 'The Godfather Part II', 'Rocky II', 'Heat']}))
+
+    def test_exact(self):
+        self.assertEqual(judge_guess(self.titles, 'the GODFATHER!', 'godfather'), (True, True, []))
+
+    def test_close_enough(self):
+        self.assertEqual(judge_guess(self.titles, 'The Godfathr', 'godfather'), (True, False, []))
+        self.assertEqual(judge_guess(self.titles, 'rocky 2', 'rockyii'), (True, False, []))
+        self.assertTrue(judge_guess(self.titles, 'Alien', 'aliens').correct)
+
+    def test_another_film_of_the_list_is_wrong(self):
+        verdict = judge_guess(self.titles, 'The Godfather', 'godfatherii')
+        self.assertFalse(verdict.correct)
+        self.assertEqual(verdict.suggestions, [2])          ## not the guess itself
+        self.assertFalse(judge_guess(self.titles, 'Heat', 'aliens').correct)
+
+    def test_suggestions(self):
+        verdict = judge_guess(self.titles, 'Godfather 3', 'heat')
+        self.assertFalse(verdict.correct)
+        self.assertEqual(sorted(verdict.suggestions), [1, 2])
+        self.assertEqual(judge_guess(self.titles, 'Zorba the Greek', 'heat').suggestions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from utils.imdb_acquisition import IMDB
+from utils.rate_limiter import TokenBucket, parse_retry_after
+from tests.list_pages import ListPageServer, film_titles
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.slept.append(secs)
+        self.now += secs
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(requests=6, window=60.0, burst=2, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_then_paced(self):
+        self.assertEqual(self.bucket.acquire(), 0)
+        self.assertEqual(self.bucket.acquire(), 0)
+        self.assertAlmostEqual(self.bucket.acquire(), 10.0)    ## 6 per minute == one every 10 seconds
+
+    def test_backoff_pauses_and_slows(self):
+        self.bucket.backoff(30)
+        self.assertAlmostEqual(self.bucket.rate, 0.05)
+        self.assertAlmostEqual(self.bucket.acquire(), 30.0)
+        self.bucket.reward()
+        self.assertAlmostEqual(self.bucket.rate, 0.0625)
+        for _ in range(10):
+            self.bucket.reward()
+        self.assertAlmostEqual(self.bucket.rate, 0.1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('5'), 5.0)
+        self.assertIsNone(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class TestConcurrentPages(unittest.TestCase):
+    def imdb(self, url, max_workers=4):
+        return IMDB(url, max_workers=max_workers, limiter=TokenBucket(requests=100, window=1.0, burst=10), use_cache=False, scrape=False)
+
+    def test_pages_in_list_order(self):
+        with ListPageServer(total=450, delay=.05) as server:
+            imdb = self.imdb(server.url)
+            urls = [f'{server.url}?sort=list_order,asc&st_dt=&mode=detail&page={p}' for p in range(5, 0, -1)]
+            soups = imdb.get_soups(urls)
+
+        self.assertEqual([film_titles(soup)[0] for soup in soups], [f'Film Number {(p-1)*100+1}' for p in range(5, 0, -1)])
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertLessEqual(server.max_in_flight, 4)
+
+    def test_backs_off_on_429(self):
+        with ListPageServer(total=250, throttle={2: 2}) as server:
+            imdb = self.imdb(server.url)
+            soup = imdb.get_soup(f'{server.url}?page=2')
+
+        self.assertEqual(server.requests, [2, 2, 2])
+        self.assertEqual(len(imdb.get_films(soup)), 100)
+        self.assertEqual(imdb.limiter.strikes, 0)
+        self.assertLess(imdb.limiter.rate, imdb.limiter.base_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import unittest
+from pandas.testing import assert_frame_equal
+from utils.imdb_acquisition import IMDB
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache
+from tests.list_pages import ListPageServer
+
+
+class TestRefreshList(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def imdb(self, url, cache=None, parse_workers=0):
+        imdb = IMDB(url, limiter=TokenBucket(requests=1000, window=1.0), cache=cache, use_cache=cache is not None, scrape=False, parse_workers=parse_workers)
+        imdb.OUTPUT_DIR = imdb.JOB_DIR = self.dir
+        return imdb
+
+    def test_appended_films_fetch_only_the_last_pages(self):
+        with ListPageServer(total=1000) as server:
+            self.imdb(server.url).scrape_list(server.url)
+            server.total = 1003
+            server.requests.clear()
+            refreshed = self.imdb(server.url).refresh_list(server.url)
+            self.assertEqual(sorted(server.requests), [1, 10, 11])      ## the old last film's page, and the new one
+            assert_frame_equal(refreshed, self.imdb(server.url).scrape_list(server.url))
+
+    def test_unchanged_list_fetches_first_and_last_page(self):
+        with ListPageServer(total=250) as server:
+            scraped = self.imdb(server.url).scrape_list(server.url)
+            server.requests.clear()
+            refreshed = self.imdb(server.url).refresh_list(server.url)
+            self.assertEqual(server.requests, [1, 3])
+        assert_frame_equal(refreshed, scraped)
+
+    def test_film_removed_and_another_appended(self):
+        with ListPageServer(total=250) as server:
+            self.imdb(server.url).scrape_list(server.url)
+            server.ranks = [rank for rank in range(1, 252) if rank != 150]     ## same total
+            refreshed = self.imdb(server.url).refresh_list(server.url)
+        ids = set(refreshed['title_id'])
+        self.assertEqual(len(ids), 250)
+        self.assertNotIn('tt0000150', ids)
+        self.assertIn('tt0000251', ids)
+
+    def test_shrunk_list_is_rescraped(self):
+        with ListPageServer(total=250) as server:
+            self.imdb(server.url).scrape_list(server.url)
+            server.total = 240
+            server.requests.clear()
+            refreshed = self.imdb(server.url).refresh_list(server.url)
+            self.assertEqual(sorted(server.requests), [1, 1, 2, 3])
+        self.assertEqual(len(refreshed), 240)
+
+    def test_cached_pages_are_revalidated(self):
+        cache = ResponseCache(tempfile.mkdtemp(dir=self.dir))       ## pages stay fresh for its default TTL of hours
+        for parse_workers in (0, 2):
+            with self.subTest(parse_workers=parse_workers), ListPageServer(total=150) as server:
+                self.imdb(server.url, cache, parse_workers).scrape_list(server.url)
+                server.total = 160
+                server.requests.clear()
+                refreshed = self.imdb(server.url, cache, parse_workers).refresh_list(server.url)
+                self.assertEqual(server.requests, [1, 2])
+                assert_frame_equal(refreshed, self.imdb(server.url).scrape_list(server.url))
+                server.requests.clear()
+                self.assertEqual(len(self.imdb(server.url, cache, parse_workers).refresh_list(server.url)), 160)
+                self.assertEqual(server.requests, [1, 2])      ## page 1 and the last page, revalidated
+            cache.clear()
+
+    def test_no_snapshot_scrapes(self):
+        with ListPageServer(total=150) as server:
+            self.assertEqual(len(self.imdb(server.url).refresh_list(server.url)), 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
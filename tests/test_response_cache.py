@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from utils.imdb_acquisition import IMDB
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache, normalize_url
+from tests.list_pages import ListPageServer
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def imdb(self, url, cache):
+        return IMDB(url, limiter=TokenBucket(requests=100, window=1.0), cache=cache, scrape=False)
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url('HTTPS://www.IMDb.com/list/ls524226422/?ref_=tt_c_osc&page=2&sort=list_order,asc'),
+                         normalize_url('https://www.imdb.com/list/ls524226422?sort=list_order%2Casc&page=2#films'))
+
+    def test_fresh_pages_skip_network(self):
+        cache = ResponseCache(self.dir)
+        with ListPageServer(total=450) as server:
+            urls = [f'{server.url}?sort=list_order,asc&st_dt=&mode=detail&page={p}' for p in range(1, 6)]
+            first = self.imdb(server.url, cache).get_soups(urls)
+            start = time.perf_counter()
+            again = self.imdb(server.url, ResponseCache(self.dir)).get_soups(urls)   ## new instance reads the same files
+            secs = time.perf_counter() - start
+
+        self.assertEqual(sorted(server.requests), [1, 2, 3, 4, 5])
+        self.assertEqual([str(s) for s in first], [str(s) for s in again])
+        self.assertLess(secs, 1)
+
+    def test_stale_pages_revalidate(self):
+        cache = ResponseCache(self.dir, ttl=0)
+        with ListPageServer(total=250) as server:
+            url = f'{server.url}?page=2'
+            first = self.imdb(server.url, cache).fetch(url)
+            again = self.imdb(server.url, cache).fetch(url)
+
+        self.assertEqual(first, again)
+        self.assertEqual(server.requests, [2, 2])
+        self.assertIn('If-None-Match', server.headers[1])
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(self.dir, max_bytes=2500)
+        bodies = {f'https://www.imdb.com/list/ls1/?page={p}': os.urandom(800) for p in (1, 2, 3)}    ## incompressible
+        for url, body in bodies.items():
+            cache.put(url, body)
+            time.sleep(.01)
+        cache.get('https://www.imdb.com/list/ls1/?page=1')   ## used most recently now
+        cache.put('https://www.imdb.com/list/ls1/?page=4', os.urandom(800))
+
+        self.assertLessEqual(cache.size(), 2500)
+        self.assertIsNotNone(cache.get('https://www.imdb.com/list/ls1/?page=1'))
+        self.assertIsNone(cache.get('https://www.imdb.com/list/ls1/?page=2'))
+
+    def test_concurrent_writers_of_one_page(self):
+        cache = ResponseCache(self.dir)
+        url = 'https://www.imdb.com/list/ls1/?page=1'
+        bodies = [bytes([i]) * 200_000 for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda body: cache.put(url, body), bodies))
+        self.assertIn(cache.get(url).body, bodies)      ## one writer's page whole, not a mix of several
+        self.assertFalse([name for name in os.listdir(self.dir) if name.endswith('.tmp')])
+
+
+if __name__ == '__main__':
+    unittest.main()
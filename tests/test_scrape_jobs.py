@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pandas.testing import assert_frame_equal
+from utils.imdb_acquisition import IMDB
+from utils.http_session import build_session
+from utils.rate_limiter import TokenBucket
+from utils.scrape_jobs import ScrapeJob
+from tests.list_pages import ListPageServer
+
+
+class TestScrapeJob(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_pages_done_stops_at_first_gap(self):
+        job = ScrapeJob('ls1', self.dir)
+        job.start(url_stem='x', title='t', total=300, pages=4)
+        for page in (1, 2, 4):
+            job.save_page(page, [{'title': f'film {page}'}])
+        self.assertEqual(job.pages_done(), 2)
+        self.assertEqual(job.load_page(2), [{'title': 'film 2'}])
+
+    def test_expired_job_is_discarded(self):
+        job = ScrapeJob('ls1', self.dir, ttl=-1)
+        job.start(url_stem='x', title='t', total=100, pages=1)
+        self.assertIsNone(job.load())
+        self.assertFalse(os.path.exists(job.directory))
+
+    def test_concurrent_writers_of_one_page(self):
+        job = ScrapeJob('ls1', self.dir)
+        job.start(url_stem='x', title='t', total=100, pages=1)
+        pages = [[{'title': f'film {i}'}] * 20_000 for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda films: job.save_page(1, films), pages))
+        self.assertIn(job.load_page(1), pages)      ## one writer's page whole, not a mix of several
+        self.assertFalse([name for name in os.listdir(job.directory) if name.endswith('.tmp')])
+
+
+class TestResumeScrape(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def imdb(self, url):
+        imdb = IMDB(url, limiter=TokenBucket(requests=1000, window=1.0), session=build_session(retries=0), use_cache=False, scrape=False, parse_workers=0)
+        imdb.OUTPUT_DIR = imdb.JOB_DIR = self.dir
+        return imdb
+
+    def test_resumes_from_first_missing_page(self):
+        with ListPageServer(total=450) as server:
+            films = self.imdb(server.url).iter_films(server.url)
+            next(films), next(films), next(films)
+            films.close()       ## session died after page 3
+
+            server.requests.clear()
+            resumed = self.imdb(server.url).scrape_list(server.url)
+            self.assertEqual(sorted(server.requests), [4, 5])
+            self.assertFalse(os.path.exists(os.path.join(self.dir, 'ls000000001')))   ## checkpoints cleared once saved
+            assert_frame_equal(resumed, self.imdb(server.url).scrape_list(server.url))
+
+    def test_failed_page_keeps_earlier_checkpoints(self):
+        with ListPageServer(total=450, errors={4: 1}) as server:
+            with self.assertRaises(Exception):
+                self.imdb(server.url).scrape_list(server.url)
+            self.assertEqual(ScrapeJob('ls000000001', self.dir).pages_done(), 3)
+
+            server.requests.clear()
+            self.assertEqual(len(self.imdb(server.url).scrape_list(server.url)), 450)
+            self.assertEqual(sorted(server.requests), [4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
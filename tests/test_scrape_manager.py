@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from utils.imdb_acquisition import IMDB
+from utils.frame_store import get_frame_store
+from utils.http_session import build_session
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache
+from utils.scrape_manager import ScrapeManager
+from tests.list_pages import ListPageServer
+
+
+class TestScrapeManager(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        for attr in ('OUTPUT_DIR', 'JOB_DIR'):
+            patcher = mock.patch.object(IMDB, attr, self.dir)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = get_frame_store(self.dir)
+        self.manager = ScrapeManager(workers=2, store=self.store, limiter=TokenBucket(requests=1000, window=1.0), session=build_session(retries=0),
+                                     use_cache=False, parse_workers=0)
+        self.addCleanup(self.manager.pool.shutdown)
+
+    def test_concurrent_requests_share_one_scrape(self):
+        with ListPageServer(total=350, delay=0.05) as server:
+            first = self.manager.submit(server.url)
+            second = self.manager.submit(f'{server.url}?page=2')   ## same list_id
+            self.assertIs(first, second)
+            self.assertTrue(first.done.wait(timeout=30))
+            self.assertEqual(sorted(server.requests), [1, 2, 3, 4])
+        self.assertEqual(first.state, 'done')
+        self.assertEqual(first.frame().shape[0], 350)
+        self.assertEqual(first.progress()['pages_done'], 4)
+
+    def test_finished_list_can_be_scraped_again(self):
+        with ListPageServer(total=50) as server:
+            first = self.manager.submit(server.url)
+            first.done.wait(timeout=30)
+            self.assertIsNot(self.manager.submit(server.url), first)
+            self.assertIs(self.manager.get('ls000000001'), self.manager.tasks['ls000000001'])
+
+    def test_progress_while_running(self):
+        with ListPageServer(total=450, delay=0.2) as server:
+            task = self.manager.submit(server.url)
+            while task.pages_done < 2 and not task.done.is_set():
+                task.done.wait(timeout=0.05)
+            progress = task.progress()
+            self.assertEqual(progress['state'], 'running')
+            self.assertEqual(progress['pages'], 5)
+            self.assertGreaterEqual(progress['films'], 200)
+            self.assertGreater(progress['eta'], 0)
+            self.assertGreaterEqual(task.frame().shape[0], 200)
+            task.done.wait(timeout=30)
+
+    def test_failure_is_reported(self):
+        with ListPageServer(total=250, errors={2: 1}) as server:
+            task = self.manager.submit(server.url)
+            task.done.wait(timeout=30)
+        self.assertEqual(task.state, 'failed')
+        self.assertIn('500', task.error)
+
+    def test_revalidate_skips_fresh_cached_pages(self):
+        manager = ScrapeManager(workers=1, store=self.store, limiter=TokenBucket(requests=1000, window=1.0), session=build_session(retries=0),
+                                cache=ResponseCache(tempfile.mkdtemp(dir=self.dir)), parse_workers=0)
+        self.addCleanup(manager.pool.shutdown)
+        with ListPageServer(total=250) as server:
+            manager.submit(server.url).done.wait(timeout=30)
+            server.requests.clear()
+            manager.submit(server.url).done.wait(timeout=30)
+            self.assertEqual(server.requests, [])           ## every page fresh in the cache
+            task = manager.submit(server.url, revalidate=True)
+            task.done.wait(timeout=30)
+            self.assertEqual(sorted(server.requests), [1, 2, 3])
+        self.assertEqual(task.frame().shape[0], 250)
+
+    def test_finished_task_keeps_only_its_handle(self):
+        manager = ScrapeManager(workers=1, store=self.store, finished_ttl=0, limiter=TokenBucket(requests=1000, window=1.0),
+                                session=build_session(retries=0), use_cache=False, parse_workers=0)
+        self.addCleanup(manager.pool.shutdown)
+        with ListPageServer(total=250) as server:
+            task = manager.submit(server.url)
+            self.assertTrue(task.done.wait(timeout=30))
+        self.assertIsNone(task._builder)
+        self.assertIs(task.frame(), self.store.load(task.handle))      ## the store's frame, not a copy held by the task
+        self.assertEqual(task.frame().shape[0], 250)
+        self.assertIsNone(manager.get(task.list_id))                    ## evicted once finished_ttl has passed
+        self.assertEqual(manager.tasks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import unittest
+from bs4 import BeautifulSoup
+from pandas.testing import assert_frame_equal
+from utils.imdb_acquisition import IMDB, FrameBuilder
+from utils.rate_limiter import TokenBucket
+from tests.list_pages import ListPageServer, film_html
+
+
+class TestIterFilms(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def imdb(self, url):
+        imdb = IMDB(url, limiter=TokenBucket(requests=1000, window=1.0), use_cache=False, scrape=False)
+        imdb.JOB_DIR = self.dir
+        return imdb
+
+    def test_yields_each_page_in_order(self):
+        with ListPageServer(total=250) as server:
+            imdb = self.imdb(server.url)
+            batches = list(imdb.iter_films(server.url))
+        self.assertEqual(imdb.pages, 3)
+        self.assertEqual([len(films) for films in batches], [100, 100, 50])
+        self.assertEqual([films[0]['title'] for films in batches], ['Film Number 1', 'Film Number 101', 'Film Number 201'])
+
+    def test_first_page_before_the_rest(self):
+        with ListPageServer(total=250, delay=0.2) as server:
+            films = next(self.imdb(server.url).iter_films(server.url))
+            self.assertEqual(len(films), 100)
+            self.assertEqual(server.requests, [1])    ## the other pages haven't been asked for yet
+
+
+class TestFrameBuilder(unittest.TestCase):
+    def setUp(self):
+        self.imdb = IMDB('https://www.imdb.com/list/ls000000001/', scrape=False)
+        self.films = [self.imdb.get_film_data(BeautifulSoup(film_html(rank), 'html.parser').div) for rank in range(1, 251)]
+
+    def test_matches_process_frame(self):
+        builder = FrameBuilder(self.imdb)
+        self.assertIsNone(builder.frame())
+        for start in range(0, 250, 100):
+            builder.add(self.films[start:start+100])
+            self.assertEqual(builder.frame().shape[0], min(start + 100, 250))
+        expected = self.imdb.process_frame(self.imdb.create_typed_frame(self.films)).reset_index(drop=True)
+        assert_frame_equal(builder.frame(), expected)
+
+    def test_repeated_title_replaces_earlier(self):
+        builder = FrameBuilder(self.imdb)
+        builder.add(self.films[:2])
+        builder.add([dict(self.films[0], director='Someone Else')])
+        frame = builder.frame()
+        self.assertEqual(builder.films, 2)
+        self.assertEqual(frame.loc[frame['title'] == 'Film Number 1', 'director'].tolist(), ['Someone Else'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+import unittest
+from pandas import DataFrame, Series
+from utils.frame_schema import read_film_list
+from utils.frame_store import get_frame_store
+from utils.title_index import TitleIndex
+from utils.utilities import clean_film_name, clean_film_names
+
+DEMO = 'data/input/imdb_demo_list_wff.parquet'
+
+
+class TestCleanFilmNames(unittest.TestCase):
+    def test_column_matches_scalar(self):
+        titles = list(read_film_list(DEMO, columns=['title'])['title']) + ['The Godfather Pt. 2', " Rock 'n Roll &amp; More ", 'Tár']
+        self.assertEqual(list(clean_film_names(Series(titles))), [clean_film_name(title) for title in titles])
+
+    def test_saved_lists_get_title_norm(self):
+        frame = read_film_list(DEMO)
+        self.assertEqual(frame.columns.get_loc('title_norm'), frame.columns.get_loc('title_id') + 1)
+        self.assertEqual(list(frame['title_norm']), [clean_film_name(title) for title in frame['title']])
+        self.assertNotIn('title_norm', read_film_list(DEMO, columns=['title']).columns)
+
+
+class TestTitleIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TitleIndex.from_frame(DataFrame({'title': ['The Thing', 'Alien', 'Thing', 'Aliens', None]}))
+
+    def test_find(self):
+        self.assertEqual(list(self.index.find('the thing!')), [0, 2])
+        self.assertEqual(list(self.index.find('ALIENS')), [3])
+        self.assertEqual(len(self.index.find('Predator')), 0)
+        self.assertIn('alien', self.index)
+
+    def test_duplicates(self):
+        self.assertEqual(list(self.index.duplicates()), ['thing'])
+
+    def test_closest(self):
+        index = TitleIndex.from_frame(DataFrame({'title': ['The Godfather', 'The Godfather Part II', 'Rocky II', 'Grapes of Wrath', 'Up']}))
+        self.assertEqual([match.title_norm for match in index.closest('the godfathr', k=2)], ['godfather', 'godfatherii'])
+        self.assertEqual(index.closest('Rocky 2', k=1)[0].score, 1.0)      ## numerals spelled either way
+        self.assertEqual(list(index.closest('Up', k=1)[0].rows), [4])
+        self.assertEqual(index.closest('', k=3), [])
+        self.assertEqual(index.closest('qqqq', k=3), [])
+
+    def test_closest_scales(self):
+        titles = [f'{adjective} {noun} {i}' for i, (adjective, noun) in enumerate((a, n) for a in ('Dark', 'Last', 'Lost', 'Red') for n in ('City', 'Road', 'Night')) for i in range(1000)]
+        index = TitleIndex.from_frame(DataFrame({'title': titles}))
+        self.assertEqual(index.closest('lost raod 517', k=1)[0].title_norm, 'lostroad517')
+
+    def test_built_once_per_shared_list(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        handle = get_frame_store(directory).share_file('wff', DEMO)
+        titles = handle.titles()
+        self.assertIs(handle.titles(), titles)
+        frame = handle.frame()
+        self.assertEqual(frame['title'].iloc[titles.find(frame['title'].iloc[10])[0]], frame['title'].iloc[10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, MultiIndex, Series
+from pandas.api.types import is_numeric_dtype
+from utils.reference_info import gross_dct
+from utils.title_index import title_norms
+from utils.utilities import clean_film_names
+
+
+OVERRIDES_PATH = 'data/input/film_overrides.csv'       ## title,year,field,value: one corrected field of one film per row
+
+
+def year_keys(years: Series) -> np.ndarray:
+    '''Years as ints, 0 where a film has none, so an override can name a film by its missing year.'''
+    return pd.to_numeric(Series(years), errors='coerce').fillna(0).astype('int64').to_numpy()
+
+
+def is_missing(values: Series) -> np.ndarray:
+    '''Values an override fills in: null, or 0 as scraped (IMDb lists leave out gross and years they don't have).'''
+    return (values.isna() | values.astype(str).isin(['0', ''])).to_numpy()
+
+
+class OverrideTable():
+    '''Corrections for specific films, keyed on (normalized title (clean_film_name()), year), one column per field corrected (gross, year, ...).
+    Applied to a frame with one hash lookup of its films' keys, however many films or fixes there are; more fields only add columns.
+    Fields are only filled in where a film is missing them, so a fix stops mattering once IMDb has the figure.
+    '''
+    def __init__(self, overrides: DataFrame) -> None:
+        overrides = overrides.assign(title=clean_film_names(overrides['title'].astype(str)).to_numpy(), year=year_keys(overrides['year']))
+        overrides = overrides.drop_duplicates(['title', 'year', 'field'], keep='last')     ## later sources win
+        self.table = overrides.pivot(index=['title', 'year'], columns='field', values='value')
+
+    @staticmethod
+    def from_gross_dct(dct: dict) -> DataFrame:
+        '''gross_dct entries ({film: [gross, year]}) as override rows.'''
+        return DataFrame([(film, year, 'gross', gross) for film, (gross, year) in dct.items()], columns=['title', 'year', 'field', 'value'])
+
+    @staticmethod
+    def read_csv(path: str) -> DataFrame:
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    def __len__(self) -> int:
+        return int(self.table.notna().to_numpy().sum())
+
+    def apply(self, frame: DataFrame) -> DataFrame:
+        '''frame with the overridden fields of its films filled in.'''
+        if self.table.empty or frame.empty:
+            return frame
+        at = self.table.index.get_indexer(MultiIndex.from_arrays([title_norms(frame), year_keys(frame['year'])]))
+        films = np.flatnonzero(at >= 0)
+        if not len(films):
+            return frame
+        frame = frame.copy()
+        for field in self.table.columns:
+            if field not in frame.columns:
+                continue
+            fixes = self.table[field].to_numpy()[at[films]]
+            rows = films[pd.notna(fixes)]
+            fixes = fixes[pd.notna(fixes)]
+            missing = is_missing(frame[field].iloc[rows])
+            rows, fixes = rows[missing], fixes[missing]
+            if not len(rows):
+                continue
+            col = frame.columns.get_loc(field)
+            if is_numeric_dtype(frame[field]):      ## typed frames (FilmColumns) hold ints
+                frame.iloc[rows, col] = pd.to_numeric(Series(fixes)).astype(frame[field].dtype).to_numpy()
+            else:
+                frame.iloc[rows, col] = [str(fix) for fix in fixes]
+        return frame
+
+
+@lru_cache(maxsize=2)
+def _load_override_table(path: str, signature: tuple) -> OverrideTable:
+    sources = [OverrideTable.from_gross_dct(gross_dct)]
+    if signature:
+        sources.append(OverrideTable.read_csv(path))
+    return OverrideTable(pd.concat(sources, ignore_index=True))
+
+
+def get_override_table(path: str=OVERRIDES_PATH) -> OverrideTable:
+    '''gross_dct and the overrides in path (if there is such a file) as one table, built once per process.  Rebuilt if the file changes.'''
+    if not os.path.exists(path):
+        return _load_override_table(path, ())
+    stat = os.stat(path)
+    return _load_override_table(path, (stat.st_mtime_ns, stat.st_size))
@@ -0,0 +1,207 @@
+import sys
+import copy
+import pickle
+import inspect
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from types import CodeType
+from typing import Any, Optional
+from pandas import DataFrame, Series
+from utils.utilities import get_now
+from utils.frame_store import SharedFrame, frame_digest
+
+
+CACHE_BUDGET = 256 * 1024**2    ## bytes of cached results kept across all sessions and functions before the least recently used go
+LOG_EVERY = 500                 ## lookups between log lines of the counters
+
+
+def size_of(value: Any) -> int:
+    '''Bytes a cached result holds, as near as is cheap to tell.'''
+    if isinstance(value, DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class FunctionStats():
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = 0
+        self.bytes = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions, entries=self.entries, bytes=self.bytes,
+                    hit_rate=self.hits / lookups if lookups else 0.0)
+
+
+class FrameCache():
+    '''Results of page transforms, shared by every session, within a memory budget.
+    Entries are evicted least recently used first once their total size passes budget; a single result bigger than the budget isn't kept.
+    Hits, misses, evictions and bytes held are counted per function, to show which transforms earn their memory.
+    '''
+    def __init__(self, budget: int=CACHE_BUDGET) -> None:
+        self.budget = budget
+        self.bytes = 0
+        self.lookups = 0
+        self._entries = OrderedDict()     ## key: (function name, value, size), least recently used first
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def function_stats(self, name: str) -> FunctionStats:
+        if name not in self._stats:
+            self._stats[name] = FunctionStats()
+        return self._stats[name]
+
+    def get(self, name: str, key: str) -> tuple:
+        '''(True, value) on a hit, else (False, None).'''
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            stats = self.function_stats(name)
+            if entry is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+                self._entries.move_to_end(key)
+            log = self.lookups % LOG_EVERY == 0
+        if log:
+            self.log_summary()
+        return (False, None) if entry is None else (True, entry[1])
+
+    def put(self, name: str, key: str, value: Any) -> None:
+        size = size_of(value)
+        if size > self.budget:
+            return
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (name, value, size)
+            self.bytes += size
+            stats = self.function_stats(name)
+            stats.entries += 1
+            stats.bytes += size
+            while self.bytes > self.budget:
+                _, (old_name, _, old_size) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                old = self.function_stats(old_name)
+                old.entries -= 1
+                old.bytes -= old_size
+                old.evictions += 1
+                evicted.append(old_name)
+        if evicted:
+            logging.info(f'{get_now()} Cache over {self.budget / 1024**2:.0f} MB budget, evicted {len(evicted)} results ({", ".join(sorted(set(evicted)))})')
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            for stats in self._stats.values():
+                stats.entries = stats.bytes = 0
+
+    def summary(self) -> dict:
+        '''Counters per function, by bytes held.'''
+        with self._lock:
+            stats = {name: stats.as_dict() for name, stats in self._stats.items()}
+        return dict(sorted(stats.items(), key=lambda item: -item[1]['bytes']))
+
+    def log_summary(self) -> None:
+        lines = [f"{name}: {s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.0%}), {s['evictions']} evicted, {s['entries']} held, {s['bytes'] / 1024**2:.1f} MB"
+                 for name, s in self.summary().items()]
+        logging.info(f'{get_now()} Cache {self.bytes / 1024**2:.1f} of {self.budget / 1024**2:.0f} MB.  ' + '; '.join(lines))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> FrameCache:
+    '''Cache shared by every session in the process.'''
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FrameCache()
+        return _cache
+
+
+def function_name(func: Callable) -> str:
+    return f'{func.__module__}.{func.__qualname__}'.replace('.<locals>', '')
+
+
+def arg_fingerprint(arg: Any) -> str:
+    '''A SharedFrame by its fingerprint, other frames by a hash of their contents, anything else by its repr.'''
+    if isinstance(arg, SharedFrame):
+        return arg.fingerprint
+    if isinstance(arg, DataFrame):
+        return frame_digest(arg)
+    if isinstance(arg, Series):
+        return frame_digest(arg.to_frame())
+    return repr(arg)
+
+
+def code_bytes(code: CodeType) -> bytes:
+    '''Bytecode with the constants and names it refers to (co_code alone leaves out literals), nested functions included.'''
+    consts = [code_bytes(const) if isinstance(const, CodeType) else repr(const).encode('utf-8') for const in code.co_consts]
+    return code.co_code + repr(code.co_names).encode('utf-8') + b'\0'.join(consts)
+
+
+@functools.lru_cache(maxsize=1024)
+def code_fingerprint(code: CodeType) -> bytes:
+    '''A function's source, as st.cache_data keys on, so editing anything in it (a threshold, a column name) keys new results.
+    Cached per code object, which stays the same across reruns of a page.  Code without readable source is keyed on code_bytes().'''
+    try:
+        return inspect.getsource(code).encode('utf-8')
+    except (OSError, TypeError):
+        return code_bytes(code)
+
+
+def call_fingerprint(func: Callable, args: tuple, kwargs: dict) -> str:
+    '''Fingerprint of what func(*args, **kwargs) returns: the function's name and source, and the fingerprints of its arguments.'''
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(function_name(func).encode('utf-8') + code_fingerprint(func.__code__))
+    for arg in list(args) + sorted(kwargs.items(), key=lambda item: item[0]):
+        if isinstance(arg, tuple):      ## keyword argument
+            digest.update(arg[0].encode('utf-8'))
+            arg = arg[1]
+        digest.update(arg_fingerprint(arg).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cache_frame_data(func: Optional[Callable]=None, *, cache: Optional[FrameCache]=None) -> Callable:
+    '''Cache a page transform in the shared FrameCache, keyed on call_fingerprint().
+    A SharedFrame argument is keyed on its fingerprint, so it isn't re-hashed on every rerun.  A DataFrame returned from shared frames comes back
+    as a SharedFrame fingerprinted from the call, so the functions it's passed on to key cheaply too.
+    Callers get a copy of a cached frame, as with st.cache_data, so changing it doesn't change the cache.
+    '''
+    if func is None:
+        return functools.partial(cache_frame_data, cache=cache)
+    name = function_name(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache or get_frame_cache()
+        key = call_fingerprint(func, args, kwargs)
+        found, result = store.get(name, key)
+        if not found:
+            result = func(*args, **kwargs)
+            frames = [arg for arg in list(args) + list(kwargs.values()) if isinstance(arg, DataFrame)]
+            if isinstance(result, DataFrame) and frames and all(isinstance(frame, SharedFrame) for frame in frames):
+                result = SharedFrame(result, fingerprint=key)
+            store.put(name, key, result)
+        if isinstance(result, SharedFrame):
+            return SharedFrame(result.copy(), fingerprint=result.fingerprint)
+        return result.copy() if isinstance(result, (DataFrame, Series)) else copy.deepcopy(result)
+    return wrapper
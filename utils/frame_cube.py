@@ -0,0 +1,202 @@
+import re
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+DIMENSIONS = ('director', 'genre1', 'decade', 'certificate')
+GROUPINGS = [('director',), ('genre1',), ('decade',), ('certificate',), ('decade', 'genre1'), ('decade', 'director')]
+METRICS = ['metacritic_score', 'imdb_score', 'combo_score', 'gross']
+METRIC_PATTERN = re.compile(r'gross_adj_\d+')       ## inflation adjusted gross for whichever target years the list has
+STATS = ['count', 'sum', 'mean', 'min', 'max']
+
+
+def cube_metrics(frame: DataFrame) -> list:
+    return [col for col in frame.columns if col in METRICS or METRIC_PATTERN.fullmatch(col)]
+
+
+def grouping_name(by: Sequence[str]) -> str:
+    return ','.join(by)
+
+
+def aggregate(frame: DataFrame, by: Sequence[str], metrics: Sequence[str]) -> DataFrame:
+    '''films per group of by, and count/sum/mean/min/max of each metric over the films that have it.
+    A score or gross of 0 means it's missing, so those films are left out of the metric's stats but still counted in films.
+    '''
+    values = frame[list(metrics)].astype('float64')     ## float64 so sums of int16 scores don't overflow
+    grouped = values.where(values > 0).groupby([frame[col] for col in by], observed=True)
+    films = grouped.size().rename('films')
+    if not metrics:
+        return films.to_frame()
+    stats = grouped.agg(STATS)
+    stats.columns = [f'{metric}_{stat}' for metric, stat in stats.columns]
+    return pd.concat([films, stats], axis=1)
+
+
+def build_cube(frame: DataFrame) -> DataFrame:
+    '''Every grouping in GROUPINGS aggregated over every score and gross column, stacked in one frame.
+    The grouping column names which rows belong to which grouping; dimensions outside a row's grouping are null.
+    '''
+    metrics = cube_metrics(frame)
+    return stack_cube({by: aggregate(frame, by, metrics) for by in GROUPINGS if all(col in frame.columns for col in by)}, frame)
+
+
+def stack_cube(groupings: dict, frame: DataFrame) -> DataFrame:
+    '''The cube of frame from the stats of each of its groupings ({by: stats indexed by by}), with dimensions in frame's dtypes.'''
+    if not groupings:
+        return DataFrame({'grouping': pd.Series(dtype='category')})
+    parts = []
+    for by, stats in groupings.items():
+        part = stats.reset_index()
+        part.insert(0, 'grouping', grouping_name(by))
+        parts.append(part)
+    return cube_dtypes(pd.concat(parts, ignore_index=True), frame)
+
+
+def cube_dtypes(cube: DataFrame, frame: DataFrame) -> DataFrame:
+    for col in DIMENSIONS:
+        if col not in cube.columns:
+            continue
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            cube[col] = pd.Categorical(cube[col], dtype=frame[col].dtype)
+        elif pd.api.types.is_integer_dtype(frame[col]):
+            cube[col] = cube[col].astype(f'Int{frame[col].dtype.itemsize * 8}')
+    cube['grouping'] = cube['grouping'].astype(str).astype('category')
+    return cube
+
+
+def group_keys(keys: DataFrame) -> pd.Index:
+    '''Index of the groups in keys (one column per dimension) as plain values, so groups of frames with different categories line up.'''
+    keys = keys.astype({col: object if isinstance(keys[col].dtype, pd.CategoricalDtype) else 'int64'
+                        for col in keys.columns if isinstance(keys[col].dtype, pd.CategoricalDtype) or pd.api.types.is_integer_dtype(keys[col])})
+    return pd.MultiIndex.from_frame(keys) if keys.shape[1] > 1 else pd.Index(keys.iloc[:, 0])
+
+
+def frame_delta(old: DataFrame, new: DataFrame) -> tuple:
+    '''(removed, added): films of old not in new as they were, and films of new not in old as they are, on title_id and every column the
+    cube aggregates, so a film whose scores or gross changed is in both.
+    Films are first compared where they stand, as a refresh appends films behind the ones a list had; only the rest are matched on a hash of
+    their columns.  ValueError when those can't be told apart, i.e. two of them have the same title_id and values.
+    '''
+    if 'title_id' not in old.columns or 'title_id' not in new.columns:
+        raise ValueError('Films without a title_id.')
+    cols = ['title_id'] + [col for col in list(DIMENSIONS) + cube_metrics(new) if col in old.columns]
+    old_rows, new_rows = [pd.util.hash_pandas_object(frame[cols[1:]], index=False).to_numpy() for frame in (old, new)]
+    old_ids, new_ids = old['title_id'].to_numpy(), new['title_id'].to_numpy()
+    both = min(len(old), len(new))
+    same = (old_ids[:both] == new_ids[:both]) & (old_rows[:both] == new_rows[:both])
+    old_left, new_left = [np.flatnonzero(~np.concatenate([same, np.zeros(len(frame) - both, dtype=bool)])) for frame in (old, new)]
+    old_keys = old_rows[old_left] ^ pd.util.hash_array(old_ids[old_left].astype(str))      ## hashed strings, as ids may be categorical
+    new_keys = new_rows[new_left] ^ pd.util.hash_array(new_ids[new_left].astype(str))
+    if len(np.unique(old_keys)) < len(old_keys) or len(np.unique(new_keys)) < len(new_keys):
+        raise ValueError('Films with the same title_id and values.')
+    return old[cols].iloc[old_left[~np.isin(old_keys, new_keys)]], new[cols].iloc[new_left[~np.isin(new_keys, old_keys)]]
+
+
+def update_cube(cube: DataFrame, frame: DataFrame, removed: DataFrame, added: DataFrame) -> DataFrame:
+    '''The cube of frame, from the cube of the list it was before the removed films were taken out and the added films put in.
+    films, count and sum of the groups the removed and added films are in are adjusted by their values, and mean follows from them.  min
+    and max take in the added films' too; groups that lost a film holding their min or max are aggregated again from frame.  Groups new to
+    the cube come after the others (slice_cube sorts), groups left without films are dropped.  ValueError if cube lacks a grouping or metric.
+    '''
+    metrics = cube_metrics(frame)
+    groupings = [list(by) for by in GROUPINGS if all(col in frame.columns for col in by)]
+    if not {f'{metric}_{stat}' for metric in metrics for stat in STATS}.issubset(cube.columns) or \
+       set(cube['grouping'].astype(str).unique()) != {grouping_name(by) for by in groupings}:
+        raise ValueError('Cube lacks groupings or columns of the frame.')
+    delta = pd.concat([films for films in (removed, added) if len(films)] or [added], ignore_index=True)
+    sign = np.repeat([-1, 1], [len(removed), len(added)])
+    stats = {'films': cube['films'].to_numpy(dtype=np.float64)}
+    stats.update({f'{metric}_{stat}': cube[f'{metric}_{stat}'].to_numpy(dtype=np.float64) for metric in metrics for stat in STATS if stat != 'mean'})
+    grouping = cube['grouping'].to_numpy()
+    positions, new_groups, size = {}, [], len(cube)
+    for by in groupings:
+        rows = np.flatnonzero(grouping == grouping_name(by))
+        films = np.flatnonzero(delta[by].notna().all(axis=1).to_numpy())       ## films missing a dimension are in none of its groups
+        keys = group_keys(delta[by].iloc[films])
+        at = group_keys(cube[by].iloc[rows]).get_indexer(keys)
+        found = at >= 0
+        at[found] = rows[at[found]]
+        if not found.all():
+            unseen = keys[~found].unique()
+            at[~found] = size + unseen.get_indexer(keys[~found])
+            new_groups.append(unseen.to_frame(index=False).assign(grouping=grouping_name(by)))
+            size += len(unseen)
+        positions[tuple(by)] = films, at
+    for col, values in stats.items():
+        fill = np.nan if col.endswith(('_min', '_max')) else 0.0
+        stats[col] = np.concatenate([values, np.full(size - len(cube), fill)])
+    stale = np.zeros(size, dtype=bool)
+    for films, at in positions.values():
+        np.add.at(stats['films'], at, sign[films])
+        for metric in metrics:
+            values, signs = delta[metric].to_numpy(dtype=np.float64)[films], sign[films]
+            present = values > 0
+            low, high = stats[f'{metric}_min'], stats[f'{metric}_max']
+            gone = present & (signs < 0)
+            np.logical_or.at(stale, at[gone], (values[gone] <= low[at[gone]]) | (values[gone] >= high[at[gone]]))
+            np.add.at(stats[f'{metric}_count'], at[present], signs[present])
+            np.add.at(stats[f'{metric}_sum'], at[present], (signs * values)[present])
+            came = present & (signs > 0)
+            np.fmin.at(low, at[came], values[came])
+            np.fmax.at(high, at[came], values[came])
+    updated = pd.concat([cube[['grouping'] + [col for col in DIMENSIONS if col in cube.columns]].astype(object)] + new_groups, ignore_index=True)
+    for col, values in stats.items():
+        updated[col] = values
+    for by in groupings:
+        rows = np.flatnonzero(stale & (updated['grouping'] == grouping_name(by)).to_numpy())
+        if not len(rows):
+            continue
+        keys = group_keys(updated[by].iloc[rows])
+        redone = aggregate(frame[group_keys(frame[by]).isin(keys)], by, metrics)
+        at = rows[keys.get_indexer(group_keys(redone.index.to_frame(index=False)))]
+        updated.loc[at, redone.columns] = redone.to_numpy()
+    for metric in metrics:
+        count, total = updated[f'{metric}_count'], f'{metric}_sum'
+        updated[total] = updated[total].where(count > 0, 0.0)      ## not what's left of adding and taking away floats
+        updated[[f'{metric}_min', f'{metric}_max']] = updated[[f'{metric}_min', f'{metric}_max']].where(count > 0)
+        updated[f'{metric}_mean'] = updated[total] / count.where(count > 0)
+    updated = updated[updated['films'] > 0].reset_index(drop=True)
+    updated = updated[cube.columns].astype({col: 'int64' for col in ['films'] + [f'{metric}_count' for metric in metrics]})
+    return cube_dtypes(updated, frame)
+
+
+def sort_cube(cube: DataFrame) -> DataFrame:
+    '''cube with its rows in one order however it was made, e.g. to compare an updated cube with one built in full.'''
+    by = ['grouping'] + [col for col in DIMENSIONS if col in cube.columns]
+    return cube.sort_values(by, key=lambda col: col.astype(str)).reset_index(drop=True)
+
+
+def slice_cube(cube: DataFrame, by: Sequence[str], metric: str) -> Optional[DataFrame]:
+    '''The stats of metric per group of by, as aggregate() returns them, or None if the cube doesn't hold them.'''
+    cols = [f'{metric}_{stat}' for stat in STATS]
+    if cube is None or not set(cols).issubset(cube.columns):
+        return None
+    rows = (cube['grouping'] == grouping_name(by)).to_numpy()
+    if not rows.any():
+        return None
+    stats = cube[list(by) + ['films'] + cols][rows]     ## columns first, so only those are taken
+    stats.columns = list(by) + ['films'] + STATS
+    for col in by:
+        if isinstance(stats[col].dtype, pd.api.extensions.ExtensionDtype) and hasattr(stats[col].dtype, 'numpy_dtype'):
+            stats[col] = stats[col].astype(stats[col].dtype.numpy_dtype)      ## nullable int only for the cube's other groupings
+    return stats.set_index(list(by)).sort_index()
+
+
+def group_stats(frame: DataFrame, by: Union[str, Sequence[str]], metric: str, cube: Optional[DataFrame]=None) -> DataFrame:
+    '''films, and count/sum/mean/min/max of metric, per group of by.  Films missing metric (0) are only in films, so the mean over every
+    film, missing counted as 0, is sum / films.
+    Sliced from the list's cube when it holds the grouping and metric, otherwise aggregated from frame, e.g. for genre2 or a target year
+    the list's inflation adjusted gross wasn't built for.
+    '''
+    by = [by] if isinstance(by, str) else list(by)
+    stats = slice_cube(cube, by, metric)
+    if stats is None:
+        stats = aggregate(frame, by, [metric]).rename(columns=lambda col: col.replace(f'{metric}_', ''))
+    return stats
+
+
+def with_missing(stats: DataFrame) -> DataFrame:
+    '''group_stats() with mean and count over every film, missing counted as 0, as groupby(by)[metric].agg(['mean', 'count']) gives them.'''
+    return stats.assign(mean=stats['sum'] / stats['films'], count=stats['films'])
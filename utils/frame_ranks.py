@@ -0,0 +1,90 @@
+from typing import Tuple
+import numpy as np
+
+
+class RankIndex():
+    '''The distinct values of a ranked column, sorted, and how many films hold each, so dense ranks can be kept up to date as films are
+    added and dropped instead of re-sorting the whole column.
+    rank() is Series.rank(ascending=False, method='dense'): 1 + the number of distinct values greater than the film's.
+    changed is set once a distinct value is added or dropped, i.e. once ranks of films already in the index may have moved.
+    '''
+    def __init__(self, values: np.ndarray, counts: np.ndarray) -> None:
+        self.values = values        ## ascending
+        self.counts = counts
+        self.changed = False
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'RankIndex':
+        values, counts = np.unique(check_values(values), return_counts=True)
+        return cls(values, counts)
+
+    @classmethod
+    def from_ranks(cls, values: np.ndarray, ranks: np.ndarray) -> 'RankIndex':
+        '''Index of values already dense ranked, e.g. a saved list's scores and their *_rk column, without sorting them again.
+        Ranks that skip a number (a value whose film was dropped after ranking) leave the index changed, so the rest are re-ranked.
+        So do ranks that don't fit the values, e.g. of combo scores ranked before they were rounded; the values are sorted after all then.
+        '''
+        values, ranks = check_values(values), np.asarray(ranks, dtype=np.int64)
+        if not len(ranks):
+            return cls(values, np.zeros(0, dtype=np.int64))
+        if ranks.min() >= 1:
+            distinct = np.zeros(ranks.max(), dtype=np.float64)
+            distinct[ranks - 1] = values
+            counts = np.bincount(ranks - 1)
+            present = counts > 0
+            if (distinct[ranks - 1] == values).all() and (np.diff(distinct[present]) < 0).all():
+                index = cls(distinct[present][::-1].copy(), counts[present][::-1].copy())
+                index.changed = not present.all()
+                return index
+        index = cls.from_values(values)
+        index.changed = True
+        return index
+
+    def find(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.searchsorted(self.values, values)
+        found = positions < len(self.values)
+        found[found] = self.values[positions[found]] == values[found]
+        return positions, found
+
+    def add(self, values: np.ndarray) -> None:
+        values, counts = np.unique(check_values(values), return_counts=True)
+        positions, found = self.find(values)
+        self.counts[positions[found]] += counts[found]
+        if not found.all():
+            self.values = np.insert(self.values, positions[~found], values[~found])
+            self.counts = np.insert(self.counts, positions[~found], counts[~found])
+            self.changed = True
+
+    def remove(self, values: np.ndarray) -> None:
+        values, counts = np.unique(check_values(values), return_counts=True)
+        positions, found = self.find(values)
+        if not found.all() or (self.counts[positions] < counts).any():
+            raise ValueError('Removing values that are not in the index.')
+        self.counts[positions] -= counts
+        empty = self.counts == 0
+        if empty.any():
+            self.values, self.counts = self.values[~empty], self.counts[~empty]
+            self.changed = True
+
+    def rank(self, values: np.ndarray) -> np.ndarray:
+        return (len(self.values) - np.searchsorted(self.values, check_values(values), side='right') + 1).astype(np.float64)
+
+
+def check_values(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if np.isnan(values).any():
+        raise ValueError('Missing values (NaN) cannot be ranked incrementally.')
+    return values
+
+
+def update_ranks(old_values, old_ranks, kept, new_values) -> Tuple[np.ndarray, np.ndarray]:
+    '''Dense ranks of old_values[kept] and new_values taken together, given old_ranks, the ranks of all of old_values.
+    Only new_values are ranked when the films dropped and added leave the distinct values as they were; otherwise the kept films are
+    re-ranked too, by binary search in the updated index rather than a sort.
+    '''
+    old_values, old_ranks, kept = check_values(old_values), np.asarray(old_ranks, dtype=np.float64), np.asarray(kept, dtype=bool)
+    index = RankIndex.from_ranks(old_values, old_ranks)
+    index.remove(old_values[~kept])
+    index.add(new_values)
+    kept_ranks = index.rank(old_values[kept]) if index.changed else old_ranks[kept]
+    return kept_ranks, index.rank(new_values)
@@ -0,0 +1,138 @@
+import re
+import logging
+import numpy as np
+from typing import Optional, List
+from pandas import DataFrame, Series, read_csv, read_parquet
+from pandas.api.types import is_integer_dtype, is_float_dtype, is_numeric_dtype
+from utils.utilities import get_now, clean_film_names
+
+
+## Declared dtype of each column of a processed film list (IMDB.process_frame(), the saved and demo lists, CSV exports).
+## Ints are the smallest that hold the values we expect; a column whose values don't fit is widened (int16 -> int32 -> int64) rather than wrapped.
+## float32 columns that hold ints (as in some saved lists) are downcast as ints instead, so they are written back out the same.
+FILM_SCHEMA = {
+    'year': 'int16',
+    'decade': 'int16',
+    'runtime_mins': 'int16',
+    'metacritic_rk': 'int16',
+    'imdb_rk': 'int16',
+    'combo_rk': 'int16',
+    'gross_rk': 'int16',
+    'imdb_votes': 'int32',
+    'gross': 'int64',
+    'metacritic_score': 'int16',   ## whole numbers out of 100 once clean_frame() has run
+    'imdb_score': 'int16',
+    'combo_score': 'float32',
+    'critic_vs_ppl': 'float32',
+    'certificate': 'category',
+    'critic_vs_ppl_bin': 'category',
+    'director': 'category',
+}
+## columns named by pattern: genre1, genre2...; gross_adj_2023 and its rank, for any target year
+PATTERN_SCHEMA = [
+    (re.compile(r'genre\d+$'), 'category'),
+    (re.compile(r'gross_adj_\d+_rk$'), 'int16'),
+    (re.compile(r'gross_adj_\d+$'), 'int64'),
+]
+INT_WIDENING = ['int16', 'int32', 'int64']
+CATEGORY_MAX_RATIO = 0.5    ## a text column becomes a category only if it has at most this many distinct values per row
+
+
+def schema_dtype(col: str) -> Optional[str]:
+    if col in FILM_SCHEMA:
+        return FILM_SCHEMA[col]
+    for pat, dtype in PATTERN_SCHEMA:
+        if pat.match(col):
+            return dtype
+    return None
+
+
+def fit_int(series: Series, dtype: str) -> Optional[str]:
+    '''The narrowest int at least as wide as dtype that holds the series, or None if it can't be an int (NaN, fractions).'''
+    if not is_numeric_dtype(series) or series.isna().any():
+        return None
+    if is_float_dtype(series) and not (series % 1 == 0).all():
+        return None
+    lo, hi = (series.min(), series.max()) if len(series) else (0, 0)
+    for candidate in INT_WIDENING[INT_WIDENING.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return candidate
+    return None
+
+
+def apply_schema(frame: DataFrame, report: bool=True) -> DataFrame:
+    '''frame with its columns cast to FILM_SCHEMA where the data allows; other columns are left as they are.
+    report logs memory_usage(deep=True) before and after.
+    '''
+    before = frame.memory_usage(deep=True).sum() if report else 0
+    dtypes = {}
+    for col in frame.columns:
+        dtype, series = schema_dtype(col), frame[col]
+        if dtype is None or series.dtype == dtype:
+            continue
+        if dtype in INT_WIDENING:
+            dtype = fit_int(series, dtype)
+        elif dtype == 'float32' and is_integer_dtype(series):
+            dtype = fit_int(series, INT_WIDENING[0])
+        elif dtype == 'float32':
+            dtype = dtype if is_numeric_dtype(series) else None
+        elif dtype == 'category':
+            dtype = dtype if series.nunique() <= CATEGORY_MAX_RATIO * len(series) else None
+        if dtype is not None and series.dtype != dtype:
+            dtypes[col] = dtype
+    frame = frame.astype(dtypes)
+    if report:
+        after = frame.memory_usage(deep=True).sum()
+        logging.info(f'{get_now()} Frame of {frame.shape[0]} films: {before / 1024**2:.2f} MB -> {after / 1024**2:.2f} MB with schema dtypes')
+    return frame
+
+
+def read_film_csv(path: str, **kwargs) -> DataFrame:
+    '''A saved or demo list, read from CSV and cast to FILM_SCHEMA.'''
+    frame = apply_schema(read_csv(path, **kwargs))
+    return with_title_norm(frame) if kwargs.get('usecols') is None else frame
+
+
+def with_title_norm(frame: DataFrame) -> DataFrame:
+    '''frame with the title_norm column IMDB.enrich_frame() adds, after title_id, if it was saved without one.'''
+    if 'title' in frame.columns and 'title_norm' not in frame.columns:
+        frame.insert(frame.columns.get_loc('title_id') + 1 if 'title_id' in frame.columns else frame.shape[1], 'title_norm', clean_film_names(frame['title']))
+    return frame
+
+
+def write_film_list(frame: DataFrame, path: str) -> None:
+    '''Save a processed list as Parquet, dtypes and all (categoricals included), so loading it needs no parsing or type inference.'''
+    frame.to_parquet(path, index=False)
+
+
+def read_film_list(path: str, columns: Optional[List[str]]=None) -> DataFrame:
+    '''A saved or demo list, or just the columns asked for.
+    Parquet is read as written, columns not asked for are never read.  A CSV (lists saved before Parquet, or an export) is parsed and cast to FILM_SCHEMA.
+    Lists saved before title_norm was added get it when read whole (see with_title_norm()).
+    '''
+    if path.endswith('.csv'):
+        return read_film_csv(path, usecols=columns)
+    frame = nan_for_missing_text(read_parquet(path, columns=columns))
+    return with_title_norm(frame) if columns is None else frame
+
+
+def csv_to_parquet(path: str) -> str:
+    '''Convert a list saved or exported as CSV to the Parquet file next to it that the app loads, e.g. a new demo list.  Returns its path.'''
+    parquet = re.sub(r'\.csv$', '', path) + '.parquet'
+    write_film_list(read_film_csv(path), parquet)
+    return parquet
+
+
+def nan_for_missing_text(frame: DataFrame) -> DataFrame:
+    '''Missing text comes back from Arrow as None.  NaN, as read_csv gives, is what the pages expect.'''
+    text = frame.select_dtypes(object).columns
+    frame[text] = frame[text].where(frame[text].notna(), np.nan)
+    return frame
+
+
+if __name__ == '__main__':
+    ## python -m utils.frame_schema data/input/<list>.csv ...
+    import sys
+    for path in sys.argv[1:]:
+        print(f'{path} -> {csv_to_parquet(path)}')
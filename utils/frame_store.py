@@ -0,0 +1,212 @@
+import os
+import hashlib
+import logging
+import threading
+from typing import NamedTuple
+import pyarrow as pa
+from pandas import DataFrame, read_parquet
+from pandas.util import hash_pandas_object
+from utils.utilities import get_now
+from utils.frame_schema import read_film_list, nan_for_missing_text
+from pandas.testing import assert_frame_equal
+from utils.frame_cube import build_cube, frame_delta, sort_cube, update_cube
+from utils.inflation import add_gross_adj_cols, gross_adj_col
+from utils.title_index import TitleIndex
+
+
+STORE_DIR = 'data/cache/frames'
+
+
+def frame_digest(frame: DataFrame) -> str:
+    '''Hash of a frame's contents (values, index, column names and dtypes), so the same list scraped twice is stored once.'''
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(repr(list(zip(frame.columns, map(str, frame.dtypes)))).encode('utf-8'))
+    digest.update(hash_pandas_object(frame, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class SharedFrame(DataFrame):
+    '''A frame from the store, carrying the fingerprint of its contents so caches can key on that instead of hashing every value.
+    Frames derived from it (filtered, sorted, assigned to...) are plain DataFrames, since the fingerprint no longer describes them.
+    '''
+    _metadata = ['fingerprint']
+
+    def __init__(self, data=None, *args, fingerprint: str='', **kwargs) -> None:
+        super().__init__(data, *args, **kwargs)
+        self.fingerprint = fingerprint
+
+    @property
+    def _constructor(self):
+        return DataFrame
+
+
+class FrameHandle(NamedTuple):
+    '''What a session keeps instead of its own copy of a list: which shared frame it's looking at.'''
+    list_id: str
+    digest: str
+    path: str       ## Arrow IPC file the frame is mapped from
+
+    @property
+    def cube_path(self) -> str:
+        '''Parquet file of the frame's aggregate cube, next to the frame's own file.'''
+        return self.path.replace('.arrow', '.cube.parquet')
+
+    def frame(self) -> 'SharedFrame':
+        return get_frame_store(os.path.dirname(self.path)).load(self)
+
+    def cube(self) -> 'SharedFrame':
+        return get_frame_store(os.path.dirname(self.path)).load_cube(self)
+
+    def titles(self) -> TitleIndex:
+        return get_frame_store(os.path.dirname(self.path)).load_titles(self)
+
+    def adjusted(self, target_year: int) -> 'SharedFrame':
+        return get_frame_store(os.path.dirname(self.path)).load_adjusted(self, target_year)
+
+
+class FrameStore():
+    '''Read-only film frames shared by every session in the process, keyed by list_id and content hash.
+    Each frame is written once as an uncompressed Arrow IPC file and memory-mapped back, so its numeric and categorical columns point into
+    the OS page cache rather than the heap.  Other server processes mapping the same file share those pages too.
+    Frames handed out are shared: numeric columns are read-only, and callers should treat the rest as read-only as well.
+    Each frame's aggregate cube (see frame_cube) is built when the frame is first shared and saved beside it, so reloading the list skips the build.
+    A frame shared for a list_id the store already holds a frame of, e.g. a refresh that added a few films, gets the earlier frame's cube
+    updated by the films that changed instead, unless more than MAX_DELTA of them did.  VERIFY_CUBES checks updates against a full build.
+    '''
+    MAX_DELTA = 0.2
+    VERIFY_CUBES = False
+
+    def __init__(self, directory: str=STORE_DIR) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._frames = {}   ## (list_id, digest): frame
+        self._cubes = {}    ## (list_id, digest): cube
+        self._titles = {}   ## (list_id, digest): TitleIndex
+        self._adjusted = {} ## (list_id, digest, target_year): frame with gross adjusted to target_year
+        self._files = {}    ## (path, mtime): handle of a list loaded from a saved file
+        self._latest = {}   ## list_id: handle of the frame last shared for it
+        self._lock = threading.Lock()
+
+    def share(self, list_id: str, frame: DataFrame) -> FrameHandle:
+        digest = frame_digest(frame)
+        handle = FrameHandle(list_id, digest, os.path.join(self.directory, f'{list_id}-{digest}.arrow'))
+        if not os.path.exists(handle.path):
+            table = pa.Table.from_pandas(frame)
+            tmp = f'{handle.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, handle.path)
+            logging.info(f'{get_now()} Shared {list_id} ({frame.shape[0]} films) as {handle.path}')
+        with self._lock:
+            base = self._latest.get(list_id)
+            self._latest[list_id] = handle
+        if not os.path.exists(handle.cube_path):
+            self.save_cube(handle, self.cube_for(frame, base))
+        return handle
+
+    def cube_for(self, frame: DataFrame, base: FrameHandle=None) -> DataFrame:
+        '''frame's cube, updated from the cube of base (an earlier frame of the same list) when there is one and few films changed.'''
+        if base is None or not os.path.exists(base.path) or not os.path.exists(base.cube_path):
+            return build_cube(frame)
+        try:
+            removed, added = frame_delta(self.load(base), frame)
+            if len(removed) + len(added) > self.MAX_DELTA * len(frame):
+                raise ValueError(f'{len(removed)} films removed and {len(added)} added.')
+            cube = update_cube(self.load_cube(base), frame, removed, added)
+        except ValueError as e:
+            logging.info(f'{get_now()} Building cube of {base.list_id} in full: {e}')
+            return build_cube(frame)
+        logging.info(f'{get_now()} Updated cube of {base.list_id} by {len(removed)} films removed and {len(added)} added')
+        if self.VERIFY_CUBES:
+            full = build_cube(frame)
+            try:
+                assert_frame_equal(sort_cube(cube), sort_cube(full), check_exact=False, check_categorical=False)
+            except AssertionError as e:
+                logging.warning(f'{get_now()} Updated cube of {base.list_id} differs from a full build, using the build: {e}')
+                return full
+        return cube
+
+    def save_cube(self, handle: FrameHandle, cube: DataFrame) -> None:
+        tmp = f'{handle.cube_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        cube.to_parquet(tmp, index=False)
+        os.replace(tmp, handle.cube_path)
+        logging.info(f'{get_now()} Built cube of {handle.list_id} ({cube.shape[0]} groups) as {handle.cube_path}')
+
+    def share_file(self, list_id: str, path: str) -> FrameHandle:
+        '''Handle for a saved or demo list.  The file is only read the first time it's asked for (or after it changes).'''
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            handle = self._files.get(key)
+        if handle is None:
+            handle = self.share(list_id, read_film_list(path))
+            with self._lock:
+                self._files[key] = handle
+        return handle
+
+    def load(self, handle: FrameHandle) -> SharedFrame:
+        key = (handle.list_id, handle.digest)
+        with self._lock:
+            frame = self._frames.get(key)
+        if frame is None:
+            table = pa.ipc.open_file(pa.memory_map(handle.path)).read_all()
+            frame = nan_for_missing_text(table.to_pandas(split_blocks=True))     ## one block per column, so numeric columns stay views of the map
+            frame = SharedFrame(frame, fingerprint=handle.digest)
+            with self._lock:
+                frame = self._frames.setdefault(key, frame)
+        return frame
+
+    def load_cube(self, handle: FrameHandle) -> SharedFrame:
+        '''The frame's aggregate cube, read from its file, or built from the frame if there's none yet (a frame shared before cubes were).'''
+        key = (handle.list_id, handle.digest)
+        with self._lock:
+            cube = self._cubes.get(key)
+        if cube is None:
+            if not os.path.exists(handle.cube_path):
+                self.save_cube(handle, build_cube(self.load(handle)))
+            cube = SharedFrame(nan_for_missing_text(read_parquet(handle.cube_path)), fingerprint=f'{handle.digest}-cube')
+            with self._lock:
+                cube = self._cubes.setdefault(key, cube)
+        return cube
+
+
+    def load_titles(self, handle: FrameHandle) -> TitleIndex:
+        '''Index of the frame's films by normalized title, built the first time it's asked for.'''
+        key = (handle.list_id, handle.digest)
+        with self._lock:
+            titles = self._titles.get(key)
+        if titles is None:
+            titles = TitleIndex.from_frame(self.load(handle))
+            with self._lock:
+                titles = self._titles.setdefault(key, titles)
+        return titles
+
+    def load_adjusted(self, handle: FrameHandle, target_year: int) -> SharedFrame:
+        '''The frame with inflation adjusted gross for target_year (see inflation.add_gross_adj_cols()), built once per list and year.
+        Only the two adjusted columns are new; the rest are the shared frame's own, not copies, so a session choosing a year costs no more memory.
+        '''
+        key = (handle.list_id, handle.digest, int(target_year))
+        with self._lock:
+            frame = self._adjusted.get(key)
+        if frame is None:
+            shared = self.load(handle)
+            col = gross_adj_col(target_year)
+            adjusted = add_gross_adj_cols(shared[['year', 'gross']], target_year)
+            frame = shared.copy(deep=False)     ## new columns go in their own blocks, leaving the shared ones mapped
+            for name in (col, f'{col}_rk'):
+                frame[name] = adjusted[name].to_numpy()
+            frame = SharedFrame(frame, fingerprint=f'{handle.digest}-adj{int(target_year)}')
+            with self._lock:
+                frame = self._adjusted.setdefault(key, frame)
+        return frame
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_frame_store(directory: str=STORE_DIR) -> FrameStore:
+    '''Store shared across the process, one per directory.'''
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = FrameStore(directory)
+        return _stores[directory]
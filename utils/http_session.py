@@ -0,0 +1,89 @@
+import time
+import threading
+import requests
+from collections import deque
+from requests.adapters import HTTPAdapter
+from typing import NamedTuple, Optional, Tuple, Union
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401   only advertise br if urllib3 can decode it
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+DEFAULT_TIMEOUT = (5.0, 30.0)   ## (connect, read) seconds.  Without one a stalled response hangs the Streamlit script thread forever.
+
+
+class RequestStat(NamedTuple):
+    url: str
+    status: int
+    seconds: float      ## until the whole body was downloaded
+    bytes: int          ## decoded body
+    wire_bytes: int     ## as sent by the server, i.e. compressed
+
+
+class RequestLog():
+    '''Thread-safe record of the most recent requests, for later inspection.'''
+    def __init__(self, maxlen: int=1000) -> None:
+        self.stats = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, stat: RequestStat) -> None:
+        with self._lock:
+            self.stats.append(stat)
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = list(self.stats)
+        if not stats:
+            return dict(requests=0)
+        secs = sorted(s.seconds for s in stats)
+        return dict(requests=len(stats),
+                    mean_secs=round(sum(secs) / len(secs), 3),
+                    max_secs=round(secs[-1], 3),
+                    bytes=sum(s.bytes for s in stats),
+                    wire_bytes=sum(s.wire_bytes for s in stats))
+
+
+REQUEST_LOG = RequestLog()
+
+
+def build_session(retries: int=3, backoff_factor: float=0.5, pool_size: int=10) -> requests.Session:
+    '''Connection-pooled, keep-alive session that retries transient failures with exponential backoff (0.5s, 1s, 2s...).
+    429/503 are left to the rate limiter, which slows every caller rather than just retrying.
+    '''
+    retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff_factor,
+                  status_forcelist=(500, 502, 504), allowed_methods=frozenset(['GET', 'HEAD']),
+                  raise_on_status=False, respect_retry_after_header=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': ACCEPT_ENCODING, 'Connection': 'keep-alive', 'Accept-Language': 'en-US,en;q=0.9'})
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    '''Session shared across the process, so pages of a list (and lists scraped back to back) reuse open connections.'''
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def timed_get(url: str, session: Optional[requests.Session]=None, timeout: Union[float, Tuple[float, float]]=DEFAULT_TIMEOUT, log: RequestLog=REQUEST_LOG, headers: Optional[dict]=None) -> requests.Response:
+    '''GET url with a timeout and record its latency and byte counts in log.'''
+    session = session if session is not None else get_session()
+    start = time.perf_counter()
+    r = session.get(url, timeout=timeout, headers=headers)
+    content = r.content     ## read the body so the timing covers the download
+    wire_bytes = r.raw.tell() if hasattr(r.raw, 'tell') else len(content)
+    log.record(RequestStat(url, r.status_code, time.perf_counter() - start, len(content), wire_bytes))
+    return r
@@ -3,22 +3,130 @@
 ## IMDB allows you to export an entire list of films (incl. user-made ones, like this one) to CSV, but does not
 ## include the Metacritic Rating or other good info in it (dunno why).  This fixes that.
 
-import time
 import requests
+import os
 import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Iterator
+import functools
+import json
+from itertools import chain
 logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
 # logging.basicConfig(level=logging.INFO, filename='logs/imdb_acquisition.log', filemode='w', format='%(name)s - %(levelname)s - %(message)s')
-from bs4 import BeautifulSoup
-from pandas import DataFrame, read_csv, concat, cut, qcut
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+from pandas import DataFrame, Series, MultiIndex, CategoricalDtype, concat, cut, qcut
+import numpy as np
 from numpy import where
+from pandas.api.types import is_numeric_dtype
 from streamlit import write, error
-from utils.utilities import get_now, adjust_for_inflation
-from utils.reference_info import gross_dct
+from utils.utilities import get_now, clean_film_names
+from utils.inflation import add_gross_adj_cols
+from utils.film_overrides import get_override_table
+from utils.rate_limiter import TokenBucket, parse_retry_after
+from utils.http_session import get_session, timed_get, REQUEST_LOG
+from utils.response_cache import ResponseCache, get_response_cache
+from utils.page_pipeline import PipelineStats, PARSE_WORKERS, QUEUE_SIZE, iter_pipeline
+from utils.scrape_jobs import ScrapeJob, JOB_DIR
+from utils.list_registry import get_list_registry
+from utils.frame_schema import apply_schema, read_film_list, write_film_list
+from utils.frame_ranks import update_ranks
+
+
+YEAR_PAT = re.compile(r'\((\d+)\)')
+LEADING_INT_PAT = re.compile(r'\d+')
+IMDB_SCORE_PAT = re.compile(r'\d\.?\d?')
+CERTIFICATE_PAT = re.compile(r'[a-zA-Z0-9\-]+')
+
+try:
+    import lxml  # noqa: F401   several times faster than html.parser, when installed
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def _is_list_content(name: str, attrs: dict) -> bool:
+    '''The only parts of a list page that get read: film blocks, the total-results div and the list title.'''
+    cls = attrs.get('class') or ''
+    cls = set(cls.split() if isinstance(cls, str) else cls)
+    return ((name == 'div' and ('lister-item-content' in cls or {'desc', 'lister-total-num-results'} <= cls))
+            or (name == 'h1' and {'header', 'list-name'} <= cls))
+
+## parse_only for list pages.  Everything else (nav, ads, scripts, footer) is skipped rather than built into the tree.
+LIST_PAGE_STRAINER = SoupStrainer(_is_list_content)
+NOT_PUBLIC = b'this list is not public'
+SCHEMA_VERSION = 2      ## of the saved frame (order_cols).  Bump when columns change, so lists saved in the old layout are scraped again.  2: title_norm
+
+## shared by every IMDB instance in the process, so concurrent scrapes together stay within the politeness budget
+IMDB_LIMITER = TokenBucket(requests=20, window=60.0, burst=4)
+
+
+def as_number(series: Series, dtype: type) -> Series:
+    '''Numeric column as dtype.  Columns scraped as text (e.g. '1,234') are stripped of thousands separators first; typed ones are just cast.'''
+    if is_numeric_dtype(series):
+        return series.astype(dtype)
+    return series.astype(str).str.replace(',', '').astype(dtype)
+
+
+class FilmColumns():
+    '''Accumulates scraped films (dicts from IMDB.get_film_data()) column by column, converting each value to its type on the way in.
+    to_frame() then builds a typed frame directly, rather than create_frame()'s transpose of a dict of dicts into an all-object frame of strings.
+    Like all_films in scrape_list(), a title seen again replaces the earlier film's values but keeps its position.
+    '''
+    INTS = ('year', 'metacritic_rk', 'runtime_mins', 'gross', 'imdb_votes')
+    FLOATS = ('metacritic_score', 'imdb_score')
+
+    def __init__(self, attrs: List[str]) -> None:
+        self.columns = {attr: [] for attr in list(attrs) + ['star']}
+        self.rows = {}      ## title: row
+
+    def convert(self, attr: str, value):
+        if attr in self.INTS or attr in self.FLOATS:
+            try:
+                return (int if attr in self.INTS else float)(str(value).replace(',', ''))
+            except ValueError:
+                return 0
+        return value
+
+    def append(self, data: dict) -> None:
+        row = self.rows.setdefault(data['title'], len(self.rows))
+        for attr, values in self.columns.items():
+            value = self.convert(attr, data.get(attr))
+            if row == len(values):
+                values.append(value)
+            else:
+                values[row] = value
+
+    def extend(self, films: List[dict]) -> None:
+        for data in films:
+            self.append(data)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_frame(self) -> DataFrame:
+        '''Typed frame indexed by title, like create_frame(): int64 for INTS, float64 for FLOATS, object for text and the star lists.'''
+        data = {}
+        for attr, values in self.columns.items():
+            if attr in self.INTS:
+                data[attr] = np.fromiter(values, dtype=np.int64, count=len(values))
+            elif attr in self.FLOATS:
+                data[attr] = np.fromiter(values, dtype=np.float64, count=len(values))
+            else:
+                data[attr] = Series(values, dtype=object)
+        return DataFrame({attr: (col.values if isinstance(col, Series) else col) for attr, col in data.items()}, index=list(self.rows))
 
 
 class IMDB():
-    def __init__(self, url: str) -> None:
+    THROTTLE_STATUS = (429, 503)
+    MAX_THROTTLE_RETRIES = 4
+    OUTPUT_DIR = 'data/output'     ## processed lists (Parquet) and their page manifests
+    JOB_DIR = JOB_DIR               ## checkpoints of scrapes in progress
+    CRITIC_VS_PPL_BINS = ['vlow', 'low', 'avg', 'high', 'vhigh']
+    RANKED = ['imdb_score', 'metacritic_score', 'combo_score', 'gross', 'critic_vs_ppl']    ## dense ranked by add_rank_cols()
+    VERIFY_UPDATES = False          ## also finish refreshed lists from scratch, and keep that if update_frame() doesn't match it
+
+    def __init__(self, url: str, max_workers: int=4, limiter: Optional[TokenBucket]=None, session: Optional[requests.Session]=None, cache: Optional[ResponseCache]=None, use_cache: bool=True, scrape: bool=True, parser: str=HTML_PARSER, partial: bool=True, parse_workers: int=PARSE_WORKERS, queue_size: int=QUEUE_SIZE) -> None:
         self.ATTRS = dict(title=r'href="/title/.*">(.+)</',
                         title_id=r'href="/title/(tt[\w\d]+)/',
                         year=r'class="lister-item-year text-muted unbold">.*\s?\((\d+)\)',
@@ -35,7 +143,21 @@ class IMDB():
                         )
         
         self.url = url
-        self.df = self.scrape_list(url)
+        self.max_workers = max_workers  ## pages fetched at once.  1 == one page at a time.
+        self.limiter = limiter if limiter is not None else IMDB_LIMITER
+        self.session = session if session is not None else get_session()   ## pooled keep-alive connections w/ timeouts & retries
+        self.cache = (cache if cache is not None else get_response_cache()) if use_cache else None  ## on-disk page cache under data/cache/
+        self.parser = parser
+        self.partial = partial          ## only build the film-list subtree of each page.  False == whole page, as a browser would
+        self.parse_workers = parse_workers  ## processes parsing pages while the next ones download.  0 == parse in the fetch threads
+        self.queue_size = queue_size
+        self.pipeline_stats = None
+        self.title = None
+        self.total = None
+        self.pages = 0
+        self.page_ids = []
+        self.job = None
+        self.df = self.scrape_list(url) if scrape else None
 
     def get_url_stem(self, url):
         '''Get url stem for list.  This is the URL without the page number.  This is used to scrape the entire list.
@@ -63,12 +185,17 @@ class IMDB():
             logging.error(f'No list_id found in {url}')
             raise ValueError(f'No list_id found in {url}')
 
-    def get_pages_in_list(self, soup):
+    def get_total_films(self, soup) -> Optional[int]:
         try:
             tot_films = re.search(r'([\d,]+) titles', str(soup.find('div', attrs={'class': 'desc lister-total-num-results'}))).group(1)
-            tot_films = int(tot_films.replace(',', ''))  ## remove commas for list of 1,000+
-        except (AttributeError, IndexError, TypeError) as e:
-            error(f"🚨 {e}: Number of pages in IMDb list not found.  Will not be able to acquire full list at this time.")
+            return int(tot_films.replace(',', ''))  ## remove commas for list of 1,000+
+        except (AttributeError, IndexError, TypeError):
+            return None
+
+    def get_pages_in_list(self, soup):
+        tot_films = self.get_total_films(soup)
+        if tot_films is None:
+            error(f"🚨 Number of pages in IMDb list not found.  Will not be able to acquire full list at this time.")
             tot_films = 0
 
         ## if less than 100 films, set to 100 so we can iterate through pages downstream
@@ -76,13 +203,58 @@ class IMDB():
 
         return int(tot_films/100)
          
-    def get_soup(self, url):
-        r = requests.get(url)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        if 'This list is not public'.lower() in soup.text.lower():
+    def fetch(self, url: str, revalidate: bool=False) -> bytes:
+        '''Page body for url.  Served from the on-disk cache while fresh (unless revalidate); once stale it is revalidated w/ ETag/Last-Modified.
+        Otherwise GET url once the rate limiter allows it, backing off and retrying when IMDb pushes back with HTTP 429/503.
+        '''
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.fresh and not revalidate:
+            return cached.body
+
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            self.limiter.acquire()
+            r = timed_get(url, self.session, headers=cached.validators() if cached else None)    ## latency & bytes land in utils.http_session.REQUEST_LOG
+            if r.status_code not in self.THROTTLE_STATUS:
+                self.limiter.reward()
+                break
+            delay = self.limiter.backoff(parse_retry_after(r.headers.get('Retry-After')))
+            logging.info(f"{get_now()} HTTP {r.status_code} from {url}.  Backing off {delay:.1f} seconds (attempt {attempt+1}).")
+        else:
+            r.raise_for_status()
+        if r.status_code >= 500:    ## still failing after the session's retries.  Raise rather than parse (and checkpoint) an error page as an empty one
+            r.raise_for_status()
+
+        if r.status_code == 304 and cached:
+            self.cache.refresh(url)
+            return cached.body
+        if r.status_code == 200 and self.cache:
+            self.cache.put(url, r.content, r.headers)
+        return r.content
+
+    def parse(self, body: bytes) -> BeautifulSoup:
+        return BeautifulSoup(body, self.parser, parse_only=LIST_PAGE_STRAINER if self.partial else None)
+
+    def fetch_page(self, url: str, revalidate: bool=False) -> bytes:
+        body = self.fetch(url, revalidate)
+        if NOT_PUBLIC in body.lower():    ## checked on the raw page, as a partial parse drops the message
             error("🚨 This list is not public.  Please make it public in 'EDIT' (top right of list) then 'SETTINGS' on IMDb and try again.")
             raise Exception("List acquisition failed.  List is not public.")
-        return soup
+        return body
+
+    def get_soup(self, url, revalidate: bool=False):
+        return self.parse(self.fetch_page(url, revalidate))
+
+    def iter_soups(self, urls: List[str], revalidate: bool=False) -> Iterator[BeautifulSoup]:
+        '''Soup several pages at once, up to max_workers in flight.  Pages come back in the order of urls, each as soon as it and those before it are parsed.'''
+        if self.max_workers <= 1 or len(urls) <= 1:
+            yield from (self.get_soup(url, revalidate) for url in urls)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from pool.map(functools.partial(self.get_soup, revalidate=revalidate), urls)
+
+    def get_soups(self, urls: List[str]) -> list:
+        '''Soup several pages at once, up to max_workers in flight.  Pages come back in the order of urls so all_films stays deterministic.'''
+        return list(self.iter_soups(urls))
 
     def get_list_title(self, soup):
         '''Get title of list for later CSV output.'''
@@ -118,22 +290,117 @@ class IMDB():
             actors = ['N/A'] * 4
         return actors
 
+    def get_film_data(self, film) -> dict:
+        '''Attributes of one film (a 'lister-item-content' div) plus its stars, from a single walk over the block's tags.
+        Same dict as get_all_attributes() + get_stars(), without serializing the block back to a string and running 13 regexes over it.
+        Text comes out unescaped ('&' rather than '&amp;').
+        '''
+        dct = dict.fromkeys(self.ATTRS, '0')
+        dct.update(director='N/A', description='N/A')
+        found = set()
+        stars = []
+        section = None  ## 'Director' or 'Stars', from the label text preceding the /name/ links
+        value_of = None ## 'imdb_votes' or 'gross', from a 'Votes:'/'Gross:' label span preceding the span w/ data-value
+
+        def first(attr, val):
+            if attr not in found and val is not None:
+                dct[attr] = val
+                found.add(attr)
+
+        for el in film.descendants:
+            if isinstance(el, NavigableString):
+                text = el.strip()
+                if text.startswith('Director'):
+                    section = 'Director'
+                elif text.startswith('Stars:'):
+                    section = 'Stars'
+                continue
+
+            name, cls = el.name, el.get('class')
+            if name == 'a':
+                href = el.get('href', '')
+                if href.startswith('/title/'):
+                    first('title', el.get_text())
+                    first('title_id', href.split('/')[2])
+                elif href.startswith('/name/'):
+                    if section == 'Director':
+                        first('director', el.get_text())
+                        section = None
+                    elif section == 'Stars':
+                        stars.append(el.get_text())
+            elif name == 'span' and cls:
+                if 'lister-item-year' in cls:
+                    years = YEAR_PAT.findall(el.get_text())
+                    first('year', years[-1] if years else None)
+                elif 'lister-item-index' in cls:
+                    rank = LEADING_INT_PAT.match(el.get_text())
+                    first('metacritic_rk', rank.group() if rank else None)
+                elif 'metascore' in cls and len(cls) > 1:
+                    score = LEADING_INT_PAT.match(el.get_text())
+                    first('metacritic_score', score.group() if score else None)
+                elif 'ipl-rating-star__rating' in cls:
+                    score = IMDB_SCORE_PAT.match(el.get_text())
+                    first('imdb_score', score.group() if score else None)
+                elif 'certificate' in cls:
+                    cert = CERTIFICATE_PAT.match(el.get_text())
+                    first('certificate', cert.group() if cert else None)
+                elif 'runtime' in cls:
+                    mins = LEADING_INT_PAT.match(el.get_text())
+                    first('runtime_mins', mins.group() if mins else None)
+                elif 'genre' in cls:
+                    first('genre', el.get_text().lstrip('\n').split('\n')[0] or None)
+                elif 'text-muted' in cls:
+                    label = el.get_text()
+                    value_of = 'imdb_votes' if label == 'Votes:' else 'gross' if label == 'Gross:' else None
+            elif name == 'div' and cls and 'ratings-imdb-rating' in cls:    ## older layout, without the ipl rating widget
+                first('imdb_score', el.get('data-value'))
+            elif name == 'p' and cls == []:
+                first('description', el.get_text().strip() or None)
+
+            if value_of and name == 'span' and el.has_attr('data-value'):
+                first(value_of, el['data-value'])
+                value_of = None
+
+        dct.update(star=stars if stars else ['N/A'] * 4)
+        return dct
+
     def create_frame(self, all_films):
         return DataFrame(all_films).T
 
+    def create_typed_frame(self, films: List[dict]):
+        '''Frame of films, typed as FilmColumns does.  Preferred to create_frame() for scraped films.'''
+        columns = FilmColumns(self.ATTRS)
+        columns.extend(films)
+        return columns.to_frame()
+
     def process_frame(self, frame):
         """Process the frame to clean it up and add new columns."""
+        return self.finish_frame(self.enrich_frame(frame), report=True)
+
+    def enrich_frame(self, frame):
+        '''Steps of process_frame() that only look at one film at a time, so they can be run on each page as it arrives.'''
+        frame = self.add_title_norm_col(frame)
         frame = self.specific_fixes(frame)
         frame = self.split_genres(frame)
         frame = self.split_stars(frame)
         frame = self.scale_imdb_rating_and_add_combo_col(frame)
+        return frame
+
+    def finish_frame(self, frame, report: bool=False):
+        '''Steps of process_frame() that need the whole list: bins, ranks, de-duplication, column order and FILM_SCHEMA dtypes.
+        report logs the memory saved by the schema.
+        '''
         frame = self.add_critic_vs_ppl_col(frame)
         frame = self.add_rank_cols(frame)
         frame = self.create_col_decade(frame)
         frame = self.clean_frame(frame)
         frame = self.create_col_gross_adj(frame)
         frame = self.order_cols(frame)
-        return frame
+        return apply_schema(frame, report)
+
+    def add_title_norm_col(self, frame):
+        '''clean_film_name() of each title, computed once here and saved with the list, so quiz answers and fixes are matched without regex.'''
+        return frame.assign(title_norm=clean_film_names(frame['title']))
 
     def split_stars(self, frame):
         _ = DataFrame(frame['star'].to_list(), index=frame.index)
@@ -162,17 +429,20 @@ class IMDB():
     def add_critic_vs_ppl_col(self, frame):
         '''Add column for difference between Metacritic and IMDb scores'''
         return frame.assign(critic_vs_ppl=lambda f: where(f['metacritic_score'].astype(int) > 0, f['metacritic_score'].sub(f['imdb_score']), 0))\
-                    .assign(critic_vs_ppl_bin=lambda f: cut(f['critic_vs_ppl'].astype(float), 5, 
-                                                             labels=['vlow', 'low', 'avg', 'high', 'vhigh']))
+                    .assign(critic_vs_ppl_bin=lambda f: cut(f['critic_vs_ppl'].astype(float), 5, labels=self.CRITIC_VS_PPL_BINS))
+
+    def rank_col(self, col: str) -> str:
+        '''Column add_rank_cols() puts col's ranks in.  critic_vs_ppl has no 'score' to replace, so its ranks replace it.'''
+        return col.replace('score', 'rk') if col != 'gross' else col+'_rk'
 
     def add_rank_cols(self, frame):
         '''Add rank columns for each rating type, and for combo rating'''
-        for col in ['imdb_score', 'metacritic_score', 'combo_score', 'gross', 'critic_vs_ppl']:
-            frame = frame.assign(**{f"{col.replace('score', 'rk') if col != 'gross' else col+'_rk'}": frame[col].astype(str).str.replace(',', '').astype(float).rank(ascending=False, method='dense')})
+        for col in self.RANKED:
+            frame = frame.assign(**{self.rank_col(col): as_number(frame[col], float).rank(ascending=False, method='dense')})
         return frame
 
     def create_col_decade(self, frame: DataFrame) -> DataFrame: 
-        frame = frame.assign(decade=frame['year'].astype(str).str.replace(',', '').astype(int) // 10 * 10)#\
+        frame = frame.assign(decade=as_number(frame['year'], int) // 10 * 10)#\
                     # .assign(decade_clr= lambda f: f['decade'].astype(str))
         return frame    
     
@@ -186,99 +456,292 @@ class IMDB():
                 .assign(metacritic_rk=lambda f: f['metacritic_rk'].astype(int))\
                 .assign(imdb_score=lambda f: f['imdb_score'].astype(int))\
                 .assign(imdb_rk=lambda f: f['imdb_rk'].astype(int))\
-                .assign(year=lambda f: f['year'].astype(str).str.replace(',', '').astype(int))\
-                .assign(decade=lambda f: f['decade'].astype(str).str.replace(',', '').astype(int))\
-                .assign(gross=lambda f: f['gross'].astype(str).str.replace(',', '').astype(int))\
-                .assign(gross_rk=lambda f: f['gross_rk'].astype(int).astype(str).str.replace(',', '').astype(int))\
-                .assign(imdb_votes=lambda f: f['imdb_votes'].astype(str).str.replace(',', '').astype(int))\
+                .assign(year=lambda f: as_number(f['year'], int))\
+                .assign(decade=lambda f: as_number(f['decade'], int))\
+                .assign(gross=lambda f: as_number(f['gross'], int))\
+                .assign(gross_rk=lambda f: f['gross_rk'].astype(int))\
+                .assign(imdb_votes=lambda f: as_number(f['imdb_votes'], int))\
                 .assign(title=lambda f: f['title'].str.replace(r'&amp;', r'&'))
 
     def create_col_gross_adj(self, frame: DataFrame):
         '''adjust gross for inflation in 2023 dollars.  Add as new column *after* clean_frame() enforces 'gross' col to be int.  Extra logic handles films with missing years by setting their adj_gross to 0.  These are commonly TV Movies.  It is possible their years are available on IMDb, but I'll have to adjust the scraper and add extra logic.  Passing for now.'''
-        frame = frame.assign(gross=lambda f: f['gross'].astype(str).str.replace(',', '').astype(int))
-        mask = (frame['year'].isnull()) | (frame['year'] == 0)
-        frame.loc[mask, 'gross_adj_2023'] = 0
-        frame[~mask] = frame[~mask].assign(gross_adj_2023=lambda f: f.apply(lambda row: adjust_for_inflation(row['gross'], row['year'], 2023), axis=1))
-        ## assign full col to int after mask, so we don't get NaNs/floats in non-masking rows
-        return frame.assign(gross_adj_2023=lambda f: f['gross_adj_2023'].astype(int)).assign(gross_adj_2023_rk=lambda f: f['gross_adj_2023'].rank(ascending=False, method='dense').astype(int))
+        frame = frame.assign(gross=lambda f: as_number(f['gross'], int))
+        ## one vectorized CPI lookup for the whole column instead of a per-row adjust_for_inflation().  Other target years can be added on demand w/ add_gross_adj_cols().
+        return add_gross_adj_cols(frame, 2023)
          
     def specific_fixes(self, frame):
-        """Fixes for specific films.  Will be added to over time.
+        """Fixes for specific films.  Will be added to over time, in utils.reference_info.gross_dct or data/input/film_overrides.csv.
             Gross is for USA, not worldwide, when possible.
         """
-        ### gross_dct structure: {film: [gross, year]}
-        for film, data in gross_dct.items():
-            title_mask = (frame['title'].str.lower() == film.lower())
-            year_mask = (frame['year'].astype(str) == str(data[1]))
-            if not frame[title_mask & year_mask].empty:
-                frame.loc[title_mask & year_mask, 'gross'] = where(frame.loc[title_mask & year_mask, 'gross'].astype(str) == '0', str(gross_dct[film][0]), frame.loc[title_mask & year_mask, 'gross'])
-        return frame
+        return get_override_table().apply(frame)
 
     def order_cols(self, frame):
         cols = ['title', 'year', 'decade', 'combo_score', 'combo_rk', 'metacritic_score', 'metacritic_rk', 'imdb_score', 'imdb_rk', 'critic_vs_ppl', 'critic_vs_ppl_bin', 'certificate', 'runtime_mins']\
             + [c for c in frame.columns if 'genre' in c]\
             + ['director']\
             + [c for c in frame.columns if 'star' in c]\
-            + ['gross', 'gross_rk', 'gross_adj_2023', 'gross_adj_2023_rk', 'imdb_votes', 'title_id', 'description']
+            + ['gross', 'gross_rk', 'gross_adj_2023', 'gross_adj_2023_rk', 'imdb_votes', 'title_id', 'title_norm', 'description']
         assert len(cols) == len(frame.columns), 'Missing columns in order_cols()'
         return frame[cols].sort_values(['combo_rk', 'year', 'title'])
 
-    def scrape_list(self, url: str):
-        all_films = {}
+    def page_urls(self, url_stem: str, pages: List[int]) -> List[str]:
+        return [f'{url_stem}?sort=list_order,asc&st_dt=&mode=detail&page={p}' for p in pages]
+
+    def iter_pages(self, urls: List[str], revalidate: bool=False) -> Iterator[List[dict]]:
+        '''Films on each of urls (list pages), in order, as each page is parsed.  With revalidate, cached pages are checked with IMDb even while fresh.'''
+        if self.parse_workers <= 0:
+            for soup in self.iter_soups(urls, revalidate):
+                yield [self.get_film_data(film) for film in self.get_films(soup)]
+            return
+
+        ## downloads feed a process pool through a bounded queue, so parsing one page overlaps fetching the next
+        self.pipeline_stats = PipelineStats(self.queue_size)
+        parse = functools.partial(parse_list_page, parser=self.parser, partial=self.partial)
+        fetch = functools.partial(self.fetch_page, revalidate=revalidate)
+        yield from iter_pipeline(urls, fetch, parse, fetchers=self.max_workers, parse_workers=self.parse_workers,
+                                 queue_size=self.queue_size, stats=self.pipeline_stats)
+        logging.info(f"{get_now()} Pipeline: {self.pipeline_stats.summary()}")
+
+    def iter_films(self, url: str, revalidate: bool=False) -> Iterator[List[dict]]:
+        '''Films of the list at url, a page at a time.  Yields each page's films (dicts from get_film_data()) as soon as the page is parsed,
+        so callers can show what has arrived while the rest of the list downloads.  Sets self.title, self.total and self.pages from the first page,
+        and records each page's title_ids in self.page_ids for save_frame().
+        Every page is checkpointed under JOB_DIR/<list_id>/ as it is yielded.  If an earlier scrape of the list was cut short, its checkpointed
+        pages are yielded from disk and downloading resumes from the first missing page.
+        With revalidate, pages in the response cache are checked with IMDb rather than served while fresh, as when a list is known to have changed.
+        '''
         url_stem = self.get_url_stem(url)
-
-        ## always want to get entire list, even if URL is for a specific page, so get the stem
-        logging.info(f'{get_now()} Acquiring {url_stem}')
-        soup = self.get_soup(url_stem)
-        self.title = self.get_list_title(soup)
-
-        def churn_non_watchlist(soup):
-            """Scrape all pages of list.  New page every 100 films. If list has more than 100 films, scrape all pages.  If less than 100, scrape just the first page.  This is because the URL for the first page of a list is the same as the URL for the entire list.  If the list has more than 100 films, the URL for the first page will have a query string with a page number.  This is the only way to scrape the entire list."""
-            pages = self.get_pages_in_list(soup)
-            dur = f"{(pages+1)*18} seconds" if pages < 5 else f"{((pages+1)*18/60):.1f} minutes"
-            write(f"ETA: ~{dur}")
-            for page, url in enumerate([f'{url_stem}?sort=list_order,asc&st_dt=&mode=detail&page={p}' for p in range(1, pages+2)], 1):
-                ## skip re-souping first page, already souped
-                if page > 1:
-                    logging.info("Sleeping 15 seconds.\n")
-                    time.sleep(15)  ## don't want to get blocked
-                    logging.info(f'{get_now()} Acquiring {url}')
-                    soup = self.get_soup(url)
-
-                logging.info(f'{get_now()} Acquiring {page}')
-
-                for film in self.get_films(soup):
-                    data = self.get_all_attributes(str(film))
-                    data.update({'star': self.get_stars(str(film))})
-                    all_films.update({data['title']: data})
-            return all_films
-
-        def churn_watchlist(soup):
-            """So far as I can tell, user 'Watchlist's do not have pages, even if they eclipse 100 films. This might be a problem if a user has more than 100 films on their watchlist.  I'll have to test this. ...unsure if page loads all 100+ films without a user scrolling..."""
-            for film in self.get_films(soup):
-                write(film)
-                data = self.get_all_attributes(str(film))
-                data.update({'star': self.get_stars(str(film))})
-                all_films.update({data['title']: data})
-            return all_films  
+        self.page_ids = []
 
         if 'watchlist' in url_stem:
-            all_films = churn_watchlist(soup)
-        elif 'list' in url_stem:
-            all_films = churn_non_watchlist(soup)
-        
-        frame = self.create_frame(all_films)
+            ## So far as I can tell, user 'Watchlist's do not have pages, even if they eclipse 100 films. This might be a problem if a user has more than 100 films on their watchlist.  I'll have to test this. ...unsure if page loads all 100+ films without a user scrolling...
+            soup = self.get_soup(url_stem, revalidate)
+            self.title = self.get_list_title(soup)
+            self.pages = 1
+            films = self.get_films(soup)
+            for film in films:
+                write(film)
+            yield [self.get_film_data(film) for film in films]
+            return
+        if 'list' not in url_stem:
+            self.pages = 0
+            return
+
+        self.job = ScrapeJob(self.get_list_id(url), self.JOB_DIR)
+        meta = self.job.load()
+        done = self.job.pages_done() if meta and meta['url_stem'] == url_stem else 0
+        if done:
+            self.title, self.total, self.pages = meta['title'], meta['total'], meta['pages']
+            logging.info(f'{get_now()} Resuming {url_stem} from page {done+1} of {self.pages}')
+            first_page = []
+        else:
+            ## always want to get entire list, even if URL is for a specific page, so get the stem
+            logging.info(f'{get_now()} Acquiring {url_stem}')
+            soup = self.get_soup(url_stem, revalidate)
+            self.title = self.get_list_title(soup)
+            self.total = self.get_total_films(soup)
+            ## Scrape all pages of list.  New page every 100 films. If list has more than 100 films, scrape all pages.  If less than 100, scrape just the first page.  This is because the URL for the first page of a list is the same as the URL for the entire list.  If the list has more than 100 films, the URL for the first page will have a query string with a page number.  This is the only way to scrape the entire list.
+            self.pages = self.get_pages_in_list(soup) + 1
+            self.job.start(url_stem=url_stem, title=self.title, total=self.total, pages=self.pages)
+            first_page = [[self.get_film_data(film) for film in self.get_films(soup)]]
+
+        remaining = self.pages - max(done, 1)
+        eta = self.limiter.eta(remaining) + (remaining+1)*3     ## + ~3 seconds per page to download and parse
+        dur = f"{eta:.0f} seconds" if eta < 90 else f"{eta/60:.1f} minutes"
+        write(f"ETA: ~{dur}")
+        urls = self.page_urls(url_stem, range(1, self.pages+1))
+        ## skip re-souping first page, already souped.  The rest are fetched concurrently, paced by the rate limiter rather than fixed sleeps.
+        logging.info(f'{get_now()} Acquiring {remaining} more pages, {self.max_workers} at a time')
+        checkpointed = (self.job.load_page(page) for page in range(1, done+1))
+        for page, films in enumerate(chain(checkpointed, first_page, self.iter_pages(urls[max(done, 1):], revalidate)), 1):
+            logging.info(f'{get_now()} Acquiring {page}')
+            if page > done:
+                self.job.save_page(page, films)
+            self.page_ids.append([data['title_id'] for data in films])
+            yield films
+
+    def snapshot_paths(self, list_id: str) -> tuple:
+        '''Parquet of the processed list, and the JSON manifest of which title_ids were on which page when it was scraped.'''
+        return f'{self.OUTPUT_DIR}/imdb_list_{list_id}.parquet', f'{self.OUTPUT_DIR}/imdb_list_{list_id}_pages.json'
+
+    def save_frame(self, frame: DataFrame, url: str) -> None:
+        list_id = self.get_list_id(url)
+        path, manifest_path = self.snapshot_paths(list_id)
+        write_film_list(frame, path)
+        if self.page_ids and self.total is not None:
+            with open(manifest_path, 'w') as f:
+                json.dump(dict(list_id=list_id, total=self.total, pages=self.page_ids), f)
+        if self.job:
+            self.job.finish()   ## the saved list is the record now
+        get_list_registry(self.OUTPUT_DIR).register(list_id, path, rows=frame.shape[0], schema_version=SCHEMA_VERSION,
+                                                    title=self.title, url=self.get_url_stem(url))
+        logging.info(f'{get_now()} {path} saved')
+        logging.info(f"{get_now()} Acquisition complete: {self.get_url_stem(url)}")
+        logging.info(f"{get_now()} Requests: {REQUEST_LOG.summary()}")
+
+    def scrape_list(self, url: str, revalidate: bool=False):
+        columns = FilmColumns(self.ATTRS)
+        for films in self.iter_films(url, revalidate):
+            columns.extend(films)
+
+        frame = columns.to_frame()
         frame = self.process_frame(frame)
+        self.save_frame(frame, url)
+        return frame.reset_index(drop=True)
 
+    def load_registered(self, list_id: str, ttl: float, columns: Optional[List[str]]=None) -> Optional[DataFrame]:
+        '''The saved frame of a list (or the columns asked for) if it was scraped within ttl seconds (in the current schema), else None.'''
+        entry = get_list_registry(self.OUTPUT_DIR).fresh(list_id, SCHEMA_VERSION, ttl)
+        if entry is None:
+            return None
+        logging.info(f'{get_now()} Serving {list_id} scraped {entry.age()/60:.0f} minutes ago from {entry.path}')
+        return read_film_list(entry.path, columns)
+
+    def load_snapshot(self, list_id: str) -> tuple:
+        '''The last saved frame of a list and its page manifest, or (None, None) if either is missing.'''
+        path, manifest_path = self.snapshot_paths(list_id)
+        if not os.path.exists(path):
+            path = path.replace('.parquet', '.csv')    ## saved before lists were kept as Parquet
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            return read_film_list(path), manifest
+        except (OSError, ValueError):
+            return None, None
+
+    def unfinish_frame(self, frame: DataFrame) -> DataFrame:
+        '''A saved (processed) frame back in the shape enrich_frame() returns, so finish_frame() can re-rank it along with new films.'''
+        derived = ['critic_vs_ppl', 'critic_vs_ppl_bin', 'combo_rk', 'metacritic_rk', 'imdb_rk', 'gross_rk', 'decade'] + [c for c in frame.columns if c.startswith('gross_adj_')]
+        frame = frame.drop(columns=derived)
+        numeric = list(FilmColumns.INTS + FilmColumns.FLOATS) + ['combo_score']
+        text = [c for c in frame.columns if c not in numeric]
+        frame[text] = frame[text].astype(object).where(frame[text].notna(), None)
+        frame = frame.assign(metacritic_rk=0)\
+                .astype({col: int for col in FilmColumns.INTS})\
+                .astype({col: float for col in FilmColumns.FLOATS + ('combo_score',)})
+        return frame.set_index(frame['title'].values)
+
+    def update_frame(self, snapshot: DataFrame, kept: Series, new_rows: DataFrame, report: bool=False) -> DataFrame:
+        '''What finish_frame() makes of snapshot's kept films and new_rows together, without finishing the kept films again.
+        snapshot is a saved (finished) list and kept a mask of its films that stay as they are; new_rows are films fetched since, from
+        enrich_frame().  Only new_rows are finished.  Each rank is updated from snapshot's for the films dropped and added (see frame_ranks)
+        rather than re-ranked over the whole list; the critic_vs_ppl bins, which span the whole list, are re-cut.
+        With VERIFY_UPDATES the list is also finished from scratch, and that is kept if the two differ.
+        '''
+        snapshot, kept = snapshot.reset_index(drop=True), np.asarray(kept, dtype=bool)
+        try:
+            frame = self.update_rows(snapshot, kept, new_rows)
+        except ValueError as e:
+            logging.info(f'{get_now()} {e}  Finishing the whole list.')
+            return self.finish_frame(concat([self.unfinish_frame(snapshot)[kept], new_rows]), report)
+        frame = apply_schema(self.order_cols(frame), report)
+        if self.VERIFY_UPDATES:
+            full = self.finish_frame(concat([self.unfinish_frame(snapshot)[kept], new_rows]))
+            if not frame.reset_index(drop=True).equals(full.reset_index(drop=True)):
+                logging.warning(f'{get_now()} Updated ranks of {frame.shape[0]} films differ from finishing them from scratch.  Keeping the latter.')
+                return full
+        return frame
+
+    def update_rows(self, snapshot: DataFrame, kept: np.ndarray, new_rows: DataFrame) -> DataFrame:
+        '''update_frame()'s films before ordering and schema dtypes.  Follows finish_frame() step for step, so the result is the same:
+        ranks and bins count films clean_frame() then drops, and inflation adjusted gross is ranked after it.'''
+        new = self.add_critic_vs_ppl_col(new_rows)
+        keep = snapshot[kept].set_index(snapshot['title'].values[kept])
+        diffs = where(snapshot['metacritic_score'] > 0, snapshot['metacritic_score'].astype(int) - snapshot['imdb_score'].astype(int), 0)  ## what critic_vs_ppl ranked
+        bins = cut(np.concatenate([diffs[kept], new['critic_vs_ppl']]).astype(float), 5, labels=self.CRITIC_VS_PPL_BINS)
+        keep['critic_vs_ppl_bin'], new['critic_vs_ppl_bin'] = bins[:len(keep)], bins[len(keep):]
+        for col in self.RANKED:
+            values = diffs if col == 'critic_vs_ppl' else as_number(snapshot[col], float)
+            kept_ranks, new_ranks = update_ranks(values, snapshot[self.rank_col(col)], kept, as_number(new[col], float))
+            keep[self.rank_col(col)] = kept_ranks if col == 'critic_vs_ppl' else kept_ranks.astype(int)
+            new[self.rank_col(col)] = new_ranks
+
+        key = ['title', 'year', 'director']
+        new = new[~MultiIndex.from_frame(new[key].astype(object)).isin(MultiIndex.from_frame(keep[key].astype(object)))]   ## kept film wins, as in drop_duplicates()
+        new = self.create_col_gross_adj(self.clean_frame(self.create_col_decade(new)))
+        for col in [c for c in new.columns if c.startswith('gross_adj_') and not c.endswith('_rk')]:
+            kept_ranks, new_ranks = update_ranks(snapshot[col], snapshot[f'{col}_rk'], kept, new[col])
+            keep[f'{col}_rk'], new[f'{col}_rk'] = kept_ranks.astype(int), new_ranks.astype(int)
+        text = [c for c in keep.columns if isinstance(keep[c].dtype, CategoricalDtype) and c != 'critic_vs_ppl_bin']
+        return concat([keep.astype({c: object for c in text}), new])
+
+    def refresh_list(self, url: str) -> DataFrame:
+        '''Bring the saved copy of a list up to date without re-scraping all of it.
+        Page 1 is always re-fetched, and so is the page holding the last film the manifest records; every page fetched is revalidated with IMDb,
+        however fresh its cached copy.  If both start with the films they had and the list has only grown, films were appended, so only the pages
+        from the old end of the list on are fetched.  Their films are merged into the snapshot on title_id and only they run through enrich_frame();
+        ranks are updated for the films dropped and added (update_frame()).  Anything else (reordering, removals, no snapshot) falls back to scrape_list().
+        '''
         list_id = self.get_list_id(url)
-        frame.to_csv(f'data/output/imdb_list_{list_id}.csv', index=None)
-        logging.info(f'{get_now()} imdb_list_{list_id}.csv saved to data/output')
-        logging.info(f"{get_now()} Acquisition complete: {url_stem}")
-        print(f"imdb_{list_id}.csv saved to data/output")
-        print(f"Acquisition complete: {url_stem}")
+        snapshot, manifest = self.load_snapshot(list_id)
+        url_stem = self.get_url_stem(url)
+        if snapshot is None or 'watchlist' in url_stem:
+            return self.scrape_list(url)
+
+        logging.info(f'{get_now()} Refreshing {url_stem}')
+        soup = self.get_soup(url_stem, revalidate=True)
+        self.title = self.get_list_title(soup)
+        self.total = self.get_total_films(soup)
+        first_page = [self.get_film_data(film) for film in self.get_films(soup)]
+        old_pages = manifest['pages']
+        if self.total is None or self.total < manifest['total'] or [data['title_id'] for data in first_page] != old_pages[0]:
+            logging.info(f'{get_now()} {list_id} changed beyond appended films.  Re-scraping all of it.')
+            return self.scrape_list(url, revalidate=True)
+
+        self.pages = self.get_pages_in_list(soup) + 1
+        ## from the page holding the old last film, so a film removed before it (with another appended) shows as that page's films shifting
+        first_changed = max(2, (manifest['total'] - 1) // 100 + 1)
+        if self.total > manifest['total']:
+            new_pages = list(range(first_changed, self.pages + 1))
+        else:
+            new_pages = [first_changed] if first_changed <= len(old_pages) and old_pages[first_changed-1] else []
+        logging.info(f'{get_now()} {self.total - manifest["total"]} new films.  Fetching pages {new_pages} of {self.pages}')
+        fetched = list(self.iter_pages(self.page_urls(url_stem, new_pages), revalidate=True))
+        for page, films in zip(new_pages, fetched):
+            old_ids = old_pages[page-1] if page <= len(old_pages) else []
+            if [data['title_id'] for data in films][:len(old_ids)] != old_ids:
+                logging.info(f'{get_now()} Page {page} of {list_id} no longer starts with the films it had.  Re-scraping all of it.')
+                return self.scrape_list(url, revalidate=True)
+
+        self.page_ids = old_pages[:first_changed-1] + [[data['title_id'] for data in films] for films in fetched] + old_pages[first_changed:] if new_pages else list(old_pages)
+        self.page_ids[0] = [data['title_id'] for data in first_page]
+        new_rows = self.enrich_frame(self.create_typed_frame([data for films in [first_page] + fetched for data in films]))
+        kept = snapshot['title_id'].isin({i for ids in self.page_ids for i in ids}) & ~snapshot['title_id'].isin(new_rows['title_id'])
+        frame = self.update_frame(snapshot, kept, new_rows, report=True)
+        self.save_frame(frame, url)
         return frame.reset_index(drop=True)
 
 
+def parse_list_page(body: bytes, parser: str=HTML_PARSER, partial: bool=True) -> List[dict]:
+    '''Films on one list page, as IMDB.get_film_data() dicts.  Module-level so the parse pool's worker processes can run it.'''
+    imdb = IMDB('', scrape=False, use_cache=False, parser=parser, partial=partial)
+    return [imdb.get_film_data(film) for film in imdb.get_films(imdb.parse(body))]
+
+
+class FrameBuilder():
+    '''Builds the processed frame of a list incrementally, as pages arrive from IMDB.iter_films().
+    Each page is run through enrich_frame() once.  finish_frame() (ranks, bins, ordering) is redone over every film so far when frame() is asked for.
+    '''
+    def __init__(self, imdb: IMDB) -> None:
+        self.imdb = imdb
+        self.batches = []       ## enriched frames, indexed by title like create_frame()
+        self.films = 0
+
+    def add(self, films: List[dict]) -> None:
+        if not films:
+            return
+        batch = self.imdb.enrich_frame(self.imdb.create_typed_frame(films))
+        ## a title seen on an earlier page is replaced, as all_films.update() does in scrape_list()
+        self.batches = [b[~b.index.isin(batch.index)] for b in self.batches] + [batch]
+        self.films = sum(len(b) for b in self.batches)
+
+    def frame(self, report: bool=False) -> Optional[DataFrame]:
+        '''The list so far, processed as IMDB.process_frame() would.  None until a film has arrived.'''
+        if not self.films:
+            return None
+        return self.imdb.finish_frame(concat(self.batches), report).reset_index(drop=True)
+
+
 
 
 
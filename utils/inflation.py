@@ -0,0 +1,83 @@
+import os
+import pandas as pd
+import numpy as np
+from functools import lru_cache
+from typing import Union, List
+
+
+CPI_PATH = 'data/input/inflation_cpi_history.csv'
+RATIO_CACHE_SIZE = 8    ## number of target years whose CPI ratio vectors are kept around
+
+
+class CPITable():
+    '''CPI history loaded once and held as arrays so whole columns can be adjusted in one lookup.
+    present_value = (dollars * cpi_target_year) / cpi_start_year
+    '''
+    def __init__(self, path: str=CPI_PATH) -> None:
+        cpi = pd.read_csv(path, dtype={'Year': int, 'CPI': float}).sort_values('Year')
+        self.path = path
+        self.min_year = int(cpi['Year'].min())
+        self.max_year = int(cpi['Year'].max())
+        ## reindex over the full range so a year maps straight to a position; any gap takes the prior year's CPI
+        self.cpi = cpi.set_index('Year')['CPI'].reindex(range(self.min_year, self.max_year + 1)).ffill().to_numpy()
+
+    @property
+    def years(self) -> List[int]:
+        return list(range(self.min_year, self.max_year + 1))
+
+    def clamp_years(self, years: Union[pd.Series, np.ndarray, int]) -> np.ndarray:
+        '''Cap years to the range of the CPI data (currently 1920 - 2023).'''
+        return np.clip(np.asarray(years, dtype=np.int64), self.min_year, self.max_year)
+
+    def lookup(self, years: Union[pd.Series, np.ndarray, int]) -> np.ndarray:
+        '''CPI for each year, after clamping to the range of the CPI data.'''
+        return self.cpi[self.clamp_years(years) - self.min_year]
+
+    def ratio_vector(self, target_year: int) -> np.ndarray:
+        '''cpi_target_year / cpi_start_year for every start year in the table.  Cached per target year.'''
+        return _ratio_vector(self, int(self.clamp_years(target_year)))
+
+    def adjust(self, dollars: Union[pd.Series, np.ndarray, float, int], start_years: Union[pd.Series, np.ndarray, int], target_year: int) -> np.ndarray:
+        '''Adjust dollars earned in start_years to target_year dollars, rounded to cents.  Vectorized over dollars and start_years.'''
+        ratio = self.ratio_vector(target_year)[self.clamp_years(start_years) - self.min_year]
+        return np.round(np.asarray(dollars, dtype=float) * ratio, 2)
+
+
+@lru_cache(maxsize=RATIO_CACHE_SIZE)
+def _ratio_vector(table: CPITable, target_year: int) -> np.ndarray:
+    ## keyed on the table instance, so a reloaded CPI file never reuses a stale vector
+    return table.lookup(target_year) / table.cpi
+
+
+@lru_cache(maxsize=2)
+def _load_cpi_table(path: str, signature: tuple) -> CPITable:
+    return CPITable(path)
+
+
+def get_cpi_table(path: str=CPI_PATH) -> CPITable:
+    '''Load the CPI table once per process.  Reloads it if the CSV has changed since, e.g. a new year's CPI was appended.'''
+    stat = os.stat(path)
+    return _load_cpi_table(path, (stat.st_mtime_ns, stat.st_size))
+
+
+def gross_adj_col(target_year: Union[int, str]) -> str:
+    '''Name of the inflation adjusted gross column for target_year, e.g. gross_adj_2023.'''
+    return f'gross_adj_{int(target_year)}'
+
+
+def add_gross_adj_cols(frame: pd.DataFrame, target_year: Union[int, str], path: str=CPI_PATH) -> pd.DataFrame:
+    '''Add gross_adj_<target_year> and its dense rank gross_adj_<target_year>_rk.
+    Films with missing years (year is null or 0) get an adjusted gross of 0.  These are commonly TV Movies.
+    Cheap enough to call on every rerun: the CPI ratio vector for target_year is cached, so switching target years doesn't re-run the pipeline.
+    '''
+    table = get_cpi_table(path)
+    target_year = int(target_year)
+    if not table.min_year <= target_year <= table.max_year:
+        raise ValueError(f'target_year {target_year} not in CPI data ({table.min_year} - {table.max_year}).')
+
+    col = gross_adj_col(target_year)
+    years = pd.to_numeric(frame['year'], errors='coerce')
+    mask = (years.isnull()) | (years == 0)
+    gross_adj = np.where(mask, 0, table.adjust(frame['gross'], years.fillna(0), target_year)).astype(int)
+    return frame.assign(**{col: gross_adj})\
+                .assign(**{f'{col}_rk': lambda f: f[col].rank(ascending=False, method='dense').astype(int)})
@@ -0,0 +1,72 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import NamedTuple, Optional, List
+
+
+REGISTRY_DIR = 'data/output'
+LIST_TTL = 24 * 3600    ## seconds a scraped list is served as is before it's worth scraping again
+
+
+class ListEntry(NamedTuple):
+    list_id: str
+    title: str
+    url: str
+    path: str               ## saved frame
+    rows: int
+    scraped_at: float       ## epoch seconds
+    schema_version: int     ## of the saved frame's columns.  See imdb_acquisition.SCHEMA_VERSION
+
+    def age(self) -> float:
+        return time.time() - self.scraped_at
+
+
+class ListRegistry():
+    '''Index of every list scraped and saved, by list_id, in SQLite next to the saved frames.
+    Lets a new session (or a browser refresh) reuse a list that was scraped recently instead of scraping it again.
+    '''
+    def __init__(self, directory: str=REGISTRY_DIR) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'registry.sqlite'), check_same_thread=False)
+        self._db.execute('''CREATE TABLE IF NOT EXISTS lists (list_id TEXT PRIMARY KEY, title TEXT, url TEXT, path TEXT,
+                            rows INTEGER, scraped_at REAL, schema_version INTEGER)''')
+        self._db.commit()
+
+    def register(self, list_id: str, path: str, rows: int, schema_version: int, title: Optional[str]=None, url: Optional[str]=None) -> ListEntry:
+        entry = ListEntry(list_id, title or '', url or '', path, rows, time.time(), schema_version)
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO lists VALUES (?, ?, ?, ?, ?, ?, ?)', entry)
+            self._db.commit()
+        return entry
+
+    def get(self, list_id: str) -> Optional[ListEntry]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM lists WHERE list_id = ?', (list_id,)).fetchone()
+        return ListEntry(*row) if row else None
+
+    def fresh(self, list_id: str, schema_version: int, ttl: float=LIST_TTL) -> Optional[ListEntry]:
+        '''The entry for list_id if it was scraped within ttl seconds, in the current schema, and its file is still there.'''
+        entry = self.get(list_id)
+        if entry is None or entry.age() > ttl or entry.schema_version != schema_version or not os.path.exists(entry.path):
+            return None
+        return entry
+
+    def entries(self) -> List[ListEntry]:
+        '''Every registered list, most recently scraped first.'''
+        with self._lock:
+            rows = self._db.execute('SELECT * FROM lists ORDER BY scraped_at DESC').fetchall()
+        return [ListEntry(*row) for row in rows]
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_list_registry(directory: str=REGISTRY_DIR) -> ListRegistry:
+    '''Registry shared across the process, one per output directory.'''
+    with _registries_lock:
+        if directory not in _registries:
+            _registries[directory] = ListRegistry(directory)
+        return _registries[directory]
@@ -0,0 +1,160 @@
+import os
+import time
+import threading
+import multiprocessing
+from queue import Queue, Full, Empty
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional
+
+
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))   ## leave a core for the Streamlit server and the fetch threads
+QUEUE_SIZE = 8      ## fetched pages waiting for a parse worker.  A full queue pauses the fetchers.
+## workers start from a clean server process rather than a fork of the Streamlit server, whose threads may hold locks at the time
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PipelineStats():
+    '''Throughput of each stage of a fetch/parse pipeline, and how full the queue between them got.
+    A high-water mark at the queue size means parsing is the bottleneck (add parse workers); near 0 means the downloads are.
+    '''
+    def __init__(self, queue_size: int=QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self.high_water = 0
+        self.fetched = 0
+        self.parsed = 0
+        self.bytes = 0
+        self.fetch_secs = 0.0   ## busy time, summed over workers
+        self.parse_secs = 0.0
+        self.started = time.perf_counter()
+        self.fetch_done = self.started
+        self.parse_done = self.started
+        self._lock = threading.Lock()
+
+    def record_fetch(self, secs: float, nbytes: int, qsize: int) -> None:
+        with self._lock:
+            self.fetched += 1
+            self.bytes += nbytes
+            self.fetch_secs += secs
+            self.high_water = max(self.high_water, qsize)
+            self.fetch_done = time.perf_counter()
+
+    def record_parse(self, secs: float) -> None:
+        with self._lock:
+            self.parsed += 1
+            self.parse_secs += secs
+            self.parse_done = time.perf_counter()
+
+    def summary(self) -> dict:
+        with self._lock:
+            fetch_wall = max(self.fetch_done - self.started, 1e-9)
+            parse_wall = max(self.parse_done - self.started, 1e-9)
+            return dict(pages=self.parsed,
+                        fetch_pages_per_sec=round(self.fetched / fetch_wall, 2),
+                        parse_pages_per_sec=round(self.parsed / parse_wall, 2),
+                        fetch_busy_secs=round(self.fetch_secs, 3),
+                        parse_busy_secs=round(self.parse_secs, 3),
+                        fetch_bytes=self.bytes,
+                        queue_high_water=self.high_water,
+                        queue_size=self.queue_size)
+
+
+def _timed(parse: Callable, body: bytes):
+    '''Runs in a parse worker.  Returns the parsed result and the seconds it took.'''
+    start = time.perf_counter()
+    result = parse(body)
+    return result, time.perf_counter() - start
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_parse_pool(workers: int=PARSE_WORKERS) -> ProcessPoolExecutor:
+    '''Process pool shared across the process, so workers (and their imports) are started once rather than per list.
+    Workers are started with START_METHOD, not forked from the (multi-threaded) server, and warmed up front so the first list doesn't wait on them.
+    A pool that broke (a worker was killed) is dropped by drop_parse_pool(), and the next call starts a new one.
+    '''
+    with _pools_lock:
+        if workers not in _pools:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD))
+            for _ in range(workers):
+                pool.submit(time.sleep, 0).result()
+            _pools[workers] = pool
+        return _pools[workers]
+
+
+def drop_parse_pool(pool: ProcessPoolExecutor) -> None:
+    '''Forget a broken pool, so later lists get a new one instead of failing until the server restarts.'''
+    with _pools_lock:
+        for workers, shared in list(_pools.items()):
+            if shared is pool:
+                del _pools[workers]
+    processes = list((pool._processes or {}).values())     ## shutdown() forgets them
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:       ## a worker left waiting on a queue lock a killed one held would hang the exit
+        process.terminate()
+
+
+def iter_pipeline(urls: List[str], fetch: Callable[[str], bytes], parse: Callable[[bytes], object], fetchers: int=4,
+                  parse_workers: int=PARSE_WORKERS, queue_size: int=QUEUE_SIZE, stats: Optional[PipelineStats]=None) -> Iterator:
+    '''parse(fetch(url)) for each of urls, yielded in the order of urls.
+    `fetchers` threads download pages into a queue of at most `queue_size` bodies.  A process pool of `parse_workers` drains it,
+    so parsing runs on other cores while the next pages download.  `parse` must be picklable, e.g. a module-level function.
+    '''
+    stats = stats if stats is not None else PipelineStats(queue_size)
+    pool = get_parse_pool(parse_workers)
+    fetched = Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def fetch_one(i: int, url: str) -> None:
+        start = time.perf_counter()
+        try:
+            item = (i, fetch(url), None)
+        except Exception as e:
+            item = (i, b'', e)
+        while not stop.is_set():
+            try:
+                fetched.put(item, timeout=0.1)
+                break
+            except Full:
+                continue
+        stats.record_fetch(time.perf_counter() - start, len(item[1]), fetched.qsize())
+
+    fetch_pool = ThreadPoolExecutor(max_workers=fetchers)
+    for i, url in enumerate(urls):
+        fetch_pool.submit(fetch_one, i, url)
+
+    pending = {}        ## page index: parse future, until it's yielded
+    received = 0
+    nxt = 0
+    try:
+        while nxt < len(urls):
+            while nxt in pending and pending[nxt].done():
+                result, secs = pending.pop(nxt).result()
+                stats.record_parse(secs)
+                yield result
+                nxt += 1
+            if nxt == len(urls):
+                break
+            in_flight = [f for f in pending.values() if not f.done()]
+            if received < len(urls) and len(in_flight) < parse_workers * 2:
+                try:
+                    i, body, exc = fetched.get(timeout=0.05 if in_flight else None)
+                except Empty:
+                    continue
+                if exc is not None:
+                    raise exc
+                received += 1
+                pending[i] = pool.submit(_timed, parse, body)
+            else:
+                wait(in_flight, return_when=FIRST_COMPLETED)
+    except BrokenProcessPool:
+        drop_parse_pool(pool)
+        raise
+    finally:
+        stop.set()
+        for future in pending.values():
+            future.cancel()
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,106 @@
+import re
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from pandas import DataFrame
+from utils.frame_cache import arg_fingerprint
+from utils.title_index import TitleIndex
+from utils.utilities import clean_film_name
+
+
+MATCH_RATIO = 0.85      ## how close (difflib ratio of normalized titles) a guess must be to the film's title to count as right
+SUGGEST_RATIO = 0.6     ## and to another title of the list to be suggested for a wrong one
+SUGGESTIONS = 3
+
+
+class Genre(NamedTuple):
+    '''Films with any of genres (or, with exclude, without them), in genre1 only if primary, otherwise in any genre column.'''
+    genres: Tuple[str, ...]
+    exclude: bool = False
+    primary: bool = False
+
+    def __call__(self, frame: DataFrame) -> np.ndarray:
+        cols = ['genre1'] if self.primary else [col for col in frame.columns if re.match(r'genre\d+$', col)]
+        has = frame[cols].isin(self.genres).any(axis=1).to_numpy()
+        return ~has if self.exclude else has
+
+
+class Decade(NamedTuple):
+    '''Films from any of decades.'''
+    decades: Tuple[int, ...]
+
+    def __call__(self, frame: DataFrame) -> np.ndarray:
+        return frame['decade'].isin(self.decades).to_numpy()
+
+
+class MinVotes(NamedTuple):
+    '''Films with at least votes IMDb votes, i.e. ones players are likely to have heard of.'''
+    votes: int
+
+    def __call__(self, frame: DataFrame) -> np.ndarray:
+        return (frame['imdb_votes'] >= self.votes).to_numpy()
+
+
+## a filter is any callable taking the list's frame to a boolean mask of the films it lets into the deck.  Its repr says which films those
+## are, so a deck knows when it was dealt under other filters; the NamedTuples above have one.
+QuizFilter = Callable[[DataFrame], np.ndarray]
+DEFAULT_FILTERS = (Genre(('Documentary',), exclude=True, primary=True),)       ## a documentary's description tends to give its title away
+
+
+def deck_key(frame: DataFrame, filters: Sequence[QuizFilter]) -> str:
+    return f'{arg_fingerprint(frame)}:{list(filters)!r}'
+
+
+class QuizDeck():
+    '''The films of a list that can come up in the quiz, as row positions shuffled once when the deck is dealt, then drawn in order.
+    A draw is one step of a cursor and never repeats a film, however few are left; the deck is the shuffled rows and the cursor, not the
+    titles used so far.  key is what it was dealt from (the list and filters), so a deck of another list or other filters is dealt again.
+    '''
+    def __init__(self, rows: np.ndarray, key: str='', seed: Optional[int]=None) -> None:
+        self.order = np.random.default_rng(seed).permutation(np.asarray(rows, dtype=np.int32))
+        self.cursor = 0
+        self.key = key
+
+    @classmethod
+    def deal(cls, frame: DataFrame, filters: Sequence[QuizFilter]=DEFAULT_FILTERS, seed: Optional[int]=None) -> 'QuizDeck':
+        eligible = np.ones(len(frame), dtype=bool)
+        for test in filters:
+            eligible &= test(frame)
+        return cls(np.flatnonzero(eligible), key=deck_key(frame, filters), seed=seed)
+
+    def __len__(self) -> int:
+        '''Films left to draw.'''
+        return len(self.order) - self.cursor
+
+    def draw(self) -> Optional[int]:
+        '''Row position of the next film, or None once every film has been drawn.'''
+        if not len(self):
+            return None
+        self.cursor += 1
+        return int(self.order[self.cursor - 1])
+
+
+def get_quiz_deck(deck: Optional[QuizDeck], frame: DataFrame, filters: Sequence[QuizFilter]=DEFAULT_FILTERS) -> QuizDeck:
+    '''deck, if it was dealt from frame under filters, otherwise a fresh deck of them.'''
+    if deck is not None and deck.key == deck_key(frame, filters):
+        return deck
+    return QuizDeck.deal(frame, filters)
+
+
+class Verdict(NamedTuple):
+    correct: bool
+    exact: bool             ## the guess was the title, punctuation and capitalization aside, not just close to it
+    suggestions: List[int]  ## row positions of films whose titles the guess was close to, for a wrong guess
+
+
+def judge_guess(titles: TitleIndex, guess: str, answer_norm: str) -> Verdict:
+    '''Whether guess names the film whose normalized title is answer_norm, allowing typos and 'II' for '2'.
+    A guess that isn't the title exactly is right if the title is the nearest of the list's to it, at least MATCH_RATIO close, and nearer than
+    any other; otherwise a guess that's closer to another film of the list is that film, not a typo of the answer.
+    '''
+    norm = clean_film_name(guess)
+    if norm == answer_norm:
+        return Verdict(True, True, [])
+    matches = titles.closest(guess, k=SUGGESTIONS + 1)
+    if matches and matches[0].title_norm == answer_norm and matches[0].score >= MATCH_RATIO and (len(matches) == 1 or matches[1].score < matches[0].score):
+        return Verdict(True, False, [])
+    return Verdict(False, False, [int(match.rows[0]) for match in matches if match.score >= SUGGEST_RATIO and match.title_norm != norm][:SUGGESTIONS])
@@ -0,0 +1,77 @@
+import time
+import threading
+from collections.abc import Callable
+from typing import Optional
+
+
+class TokenBucket():
+    '''Thread-safe token bucket shared by every request to a host.
+    Allows `requests` per `window` seconds on average, in bursts of up to `burst` requests.
+    Backs off adaptively when the server pushes back (HTTP 429/503): every caller is paused and the rate is halved,
+    then the rate creeps back up to the configured budget as requests succeed again.
+    '''
+    def __init__(self, requests: int=20, window: float=60.0, burst: Optional[int]=None, max_backoff: float=120.0,
+                 clock: Callable[[], float]=time.monotonic, sleep: Callable[[float], None]=time.sleep) -> None:
+        self.base_rate = requests / window      ## tokens per second
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate / 16
+        self.capacity = burst if burst is not None else requests
+        self.tokens = float(self.capacity)
+        self.max_backoff = max_backoff
+        self.strikes = 0
+        self.blocked_until = 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        '''Block until a request may be sent.  Returns the seconds spent waiting.'''
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            self.sleep(wait)
+            waited += wait
+
+    def backoff(self, delay: Optional[float]=None) -> float:
+        '''Server said slow down.  Pause all callers for `delay` seconds (e.g. from Retry-After) or an exponentially growing pause, and halve the rate.  Returns the pause.'''
+        with self._lock:
+            self.strikes += 1
+            if delay is None:
+                delay = min(self.max_backoff, (1 / self.rate) * 2 ** self.strikes)
+            now = self.clock()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.tokens = 0.0
+            self.rate = max(self.min_rate, self.rate / 2)
+            return delay
+
+    def reward(self) -> None:
+        '''A request went through.  Recover the rate toward the configured budget.'''
+        with self._lock:
+            self.strikes = 0
+            self.rate = min(self.base_rate, self.rate * 1.25)
+
+    def eta(self, n: int) -> float:
+        '''Rough seconds needed to send n more requests at the current rate.'''
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            return max(0.0, self.blocked_until - now) + max(0.0, n - self.tokens) / self.rate
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    '''Seconds from a Retry-After header.  Only the delay-seconds form is used; HTTP dates fall back to the limiter's own backoff.'''
+    if value and value.strip().isdigit():
+        return float(value.strip())
+    return None
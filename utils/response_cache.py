@@ -0,0 +1,141 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+CACHE_DIR = 'data/cache/http'
+DEFAULT_TTL = 12 * 3600             ## seconds a page is served without asking IMDb again
+DEFAULT_MAX_BYTES = 256 * 1024**2   ## compressed bytes on disk before least-recently-used pages are evicted
+IGNORED_PARAMS = {'ref_'}           ## tracking params that don't change the page
+
+
+def normalize_url(url: str) -> str:
+    '''Cache key for a page.  Lowercases scheme/host, drops the fragment and tracking params, sorts the query and strips trailing slashes.'''
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool             ## within TTL, so it can be used without revalidating
+
+    def validators(self) -> dict:
+        '''Headers for a conditional GET.  IMDb answers 304 Not Modified if the page hasn't changed.'''
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache():
+    '''On-disk cache of page bodies, zlib-compressed, one file per page, indexed in SQLite.
+    Pages are fresh for `ttl` seconds, then revalidated with ETag/Last-Modified.
+    Once the bodies exceed `max_bytes`, the least recently used are evicted.
+    '''
+    def __init__(self, directory: str=CACHE_DIR, ttl: float=DEFAULT_TTL, max_bytes: int=DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.execute('''CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, fname TEXT, etag TEXT, last_modified TEXT,
+                            stored_at REAL, accessed_at REAL, size INTEGER)''')
+        self._db.commit()
+
+    def _path(self, fname: str) -> str:
+        return os.path.join(self.directory, fname)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute('SELECT fname, etag, last_modified, stored_at FROM pages WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            fname, etag, last_modified, stored_at = row
+            try:
+                with open(self._path(fname), 'rb') as f:
+                    body = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                self._db.execute('DELETE FROM pages WHERE key = ?', (key,))
+                self._db.commit()
+                return None
+            now = time.time()
+            self._db.execute('UPDATE pages SET accessed_at = ? WHERE key = ?', (now, key))
+            self._db.commit()
+        return CachedPage(body, etag, last_modified, now - stored_at < self.ttl)
+
+    def put(self, url: str, body: bytes, headers: Optional[dict]=None) -> None:
+        headers = headers or {}
+        key = normalize_url(url)
+        fname = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.zz'
+        data = zlib.compress(body, 6)
+        tmp = self._path(f'{fname}.{os.getpid()}.{threading.get_ident()}.tmp')     ## per writer, so two storing the same page can't tear it
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            os.replace(tmp, self._path(fname))
+            now = time.time()
+            self._db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (key, fname, headers.get('ETag'), headers.get('Last-Modified'), now, now, len(data)))
+            self._db.commit()
+            self._evict()
+
+    def refresh(self, url: str) -> None:
+        '''Server said the page is unchanged (304), so it is fresh for another TTL.'''
+        with self._lock:
+            now = time.time()
+            self._db.execute('UPDATE pages SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, normalize_url(url)))
+            self._db.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, fname, size in self._db.execute('SELECT key, fname, size FROM pages ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(fname))
+            except OSError:
+                pass
+            self._db.execute('DELETE FROM pages WHERE key = ?', (key,))
+            total -= size
+        self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            for (fname,) in self._db.execute('SELECT fname FROM pages').fetchall():
+                try:
+                    os.remove(self._path(fname))
+                except OSError:
+                    pass
+            self._db.execute('DELETE FROM pages')
+            self._db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    '''Cache shared across the process, under data/cache/http.'''
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import shutil
+import threading
+from typing import List, Optional
+
+
+JOB_DIR = 'data/jobs'
+JOB_TTL = 24 * 3600     ## seconds an interrupted scrape can be resumed.  Older checkpoints are thrown away, as the list may have changed.
+
+
+class ScrapeJob():
+    '''Checkpoints of one list's scrape in progress, under data/jobs/<list_id>/.
+    job.json holds what page 1 said about the list (title, total, pages); page_NNNN.json holds the films parsed from each page.
+    Files are written whole and renamed into place, so a crash never leaves a half-written checkpoint.
+    '''
+    def __init__(self, list_id: str, directory: str=JOB_DIR, ttl: float=JOB_TTL) -> None:
+        self.list_id = list_id
+        self.directory = os.path.join(directory, list_id)
+        self.ttl = ttl
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, name: str, obj) -> None:
+        tmp = self._path(f'{name}.{os.getpid()}.{threading.get_ident()}.tmp')     ## per writer, so two sessions checkpointing one list can't tear a file
+        with open(tmp, 'w') as f:
+            json.dump(obj, f)
+        os.replace(tmp, self._path(name))
+
+    def _read(self, name: str):
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self) -> Optional[dict]:
+        '''The job's metadata if there's an unfinished scrape of this list that can be resumed.'''
+        meta = self._read('job.json')
+        if meta is None:
+            return None
+        if time.time() - meta.get('started', 0) > self.ttl:
+            self.finish()
+            return None
+        return meta
+
+    def start(self, **meta) -> None:
+        self.finish()
+        os.makedirs(self.directory, exist_ok=True)
+        self._write('job.json', dict(meta, started=time.time()))
+
+    def save_page(self, page: int, films: List[dict]) -> None:
+        self._write(f'page_{page:04d}.json', films)
+
+    def load_page(self, page: int) -> Optional[List[dict]]:
+        return self._read(f'page_{page:04d}.json')
+
+    def pages_done(self) -> int:
+        '''Pages checkpointed, counting up from page 1 until the first missing one.'''
+        page = 0
+        while os.path.exists(self._path(f'page_{page+1:04d}.json')):
+            page += 1
+        return page
+
+    def finish(self) -> None:
+        '''Scrape is saved (or abandoned), so the checkpoints are no longer needed.'''
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from pandas import DataFrame
+from utils.utilities import get_now
+from utils.imdb_acquisition import IMDB, FrameBuilder
+from utils.frame_store import FrameStore, get_frame_store
+
+
+FINISHED_TTL = 600      ## seconds a finished task is kept, for sessions following it to pick up its list on their next rerun
+
+
+class ScrapeTask():
+    '''One scrape of a list, running on a ScrapeManager worker.  Every session that asked for the list polls the same task.
+    The finished list is handed to the FrameStore, and the task keeps just its handle, so a finished task holds no frame of its own.
+    '''
+    def __init__(self, list_id: str, url: str, imdb: IMDB, refresh: bool=False, revalidate: bool=False, store: Optional[FrameStore]=None) -> None:
+        self.list_id = list_id
+        self.url = url
+        self.imdb = imdb
+        self.store = store
+        self.refresh = refresh
+        self.revalidate = revalidate    ## check every page with IMDb, even ones fresh in the response cache
+        self.state = 'queued'       ## queued -> running -> done | failed
+        self.error = None
+        self.pages_done = 0
+        self.films = 0
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+        self.handle = None      ## of the finished list in the FrameStore
+        self._builder = FrameBuilder(imdb)
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        self.started = time.time()
+        self.state = 'running'
+        try:
+            if self.refresh and self.imdb.load_snapshot(self.list_id)[0] is not None:
+                frame = self.imdb.refresh_list(self.url)
+            else:
+                for films in self.imdb.iter_films(self.url, self.revalidate):
+                    with self._lock:
+                        self._builder.add(films)
+                        self.pages_done += 1
+                        self.films = self._builder.films
+                with self._lock:
+                    frame = self._builder.frame(report=True)
+                if frame is None:
+                    raise ValueError(f'No films found in {self.url}')
+                self.imdb.save_frame(frame, self.url)
+            handle = (self.store or get_frame_store()).share(self.list_id, frame.reset_index(drop=True))
+            with self._lock:
+                self.handle = handle
+                self.films = frame.shape[0]
+            self.state = 'done'
+        except Exception as e:
+            logging.error(f'{get_now()} Scrape of {self.list_id} failed: {e}')
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            with self._lock:
+                self._builder = None        ## its batches are in the store's frame now, or no longer wanted
+            self.finished = time.time()
+            self.done.set()
+
+    def frame(self) -> Optional[DataFrame]:
+        '''The finished list, or the films processed so far while it's running.'''
+        with self._lock:
+            if self.handle is not None:
+                return self.handle.frame()
+            return self._builder.frame() if self._builder is not None else None
+
+    def eta(self) -> Optional[float]:
+        '''Seconds left, from the measured time per page so far.'''
+        if self.state != 'running' or not self.pages_done or not self.imdb.pages:
+            return None
+        per_page = (time.time() - self.started) / self.pages_done
+        return per_page * max(0, self.imdb.pages - self.pages_done)
+
+    def progress(self) -> dict:
+        return dict(list_id=self.list_id, state=self.state, pages_done=self.pages_done, pages=self.imdb.pages,
+                    films=self.films, eta=self.eta(), error=self.error)
+
+
+class ScrapeManager():
+    '''Runs list scrapes on a pool of worker threads, off the Streamlit script thread.
+    Requests for a list that is already queued or running join that task rather than scraping IMDb again (single flight, keyed by list_id).
+    Finished tasks are forgotten finished_ttl seconds after they end; their lists stay in the FrameStore and the registry.
+    '''
+    def __init__(self, workers: int=2, store: Optional[FrameStore]=None, finished_ttl: float=FINISHED_TTL, **imdb_kwargs) -> None:
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scrape')
+        self.store = store
+        self.finished_ttl = finished_ttl
+        self.imdb_kwargs = imdb_kwargs
+        self.tasks = {}     ## list_id: latest task
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, refresh: bool=False, revalidate: bool=False) -> ScrapeTask:
+        imdb = IMDB(url, scrape=False, **self.imdb_kwargs)
+        list_id = imdb.get_list_id(url)
+        with self._lock:
+            self._evict_finished()
+            task = self.tasks.get(list_id)
+            if task is not None and not task.done.is_set():
+                logging.info(f'{get_now()} Joining scrape of {list_id} already {task.state}')
+                return task
+            task = ScrapeTask(list_id, url, imdb, refresh, revalidate, self.store)
+            self.tasks[list_id] = task
+        self.pool.submit(task.run)
+        return task
+
+    def get(self, list_id: Optional[str]) -> Optional[ScrapeTask]:
+        with self._lock:
+            self._evict_finished()
+            return self.tasks.get(list_id)
+
+    def _evict_finished(self) -> None:
+        '''Drop tasks finished more than finished_ttl ago.  Call with the lock held.'''
+        now = time.time()
+        for list_id, task in list(self.tasks.items()):
+            if task.done.is_set() and now - task.finished > self.finished_ttl:
+                del self.tasks[list_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_scrape_manager() -> ScrapeManager:
+    '''Manager shared by every session in the process, so two users asking for the same list share one scrape.'''
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ScrapeManager()
+        return _manager
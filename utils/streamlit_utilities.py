@@ -7,6 +7,9 @@ from collections.abc import Callable
 import requests
 from pandas import read_csv, DataFrame
 import time
+from utils.inflation import get_cpi_table, add_gross_adj_cols
+from utils.frame_schema import read_film_list
+from utils.frame_store import get_frame_store
 
 def local_css(file_name):
     """
@@ -56,19 +59,21 @@ def init_to_null(state, key, val):
     # return state
 
 # @st.cache_data(persist='disk')
-def set_frame(load_demo: bool=False, url: Optional[str]=None):
+def set_frame(load_demo: bool=False, url: Optional[str]=None, columns: Optional[List[str]]=None):
     """ Probably just a function for use during development but should be removed before deployment b/c every user will have to load the data from a URL they provide.?
     
-    Set the DataFrame in st.session_state.df. If it's already set, return it.
+    Set the handle of the shared DataFrame in st.session_state.df_handle. If it's already set, return its frame.
     It is also possible to use the @st.cache_data decorator to cache the data instead of storing it in st.session_state.
     But with multiple pages, it's not clear how to use the decorator in a way that makes the data available to all pages.
 
     load_demo : bool : whether to load the demo list [used in testing]
+    columns : list : only these columns.  A demo list loaded for just some columns isn't kept in st.session_state.df_handle, as other pages need the rest.
     """
 
     
-    if st.session_state.df is not None:
-        frame = st.session_state.df
+    if st.session_state.df_handle is not None:
+        frame = st.session_state.df_handle.frame()
+        frame = frame if columns is None else frame[columns]
     elif url:
         pass
         ## Make this scrape the IMDb list URL?
@@ -78,9 +83,12 @@ def set_frame(load_demo: bool=False, url: Optional[str]=None):
     elif load_demo:
         with st.spinner('Loading Data...'):
             # time.sleep(3)
-            frame = read_csv('data/input/imdb_demo_list_WFF.csv', dtype=({'year': int, 'gross': float}))
             # frame = read_csv('data/input/imdb_big_list.csv', dtype=({'year': int, 'decade': int, 'gross': float}))
-            st.session_state.df = frame
+            if columns is None:
+                st.session_state.df_handle = get_frame_store().share_file('imdb_demo_list_wff', 'data/input/imdb_demo_list_wff.parquet')
+                frame = st.session_state.df_handle.frame()
+            else:
+                frame = read_film_list('data/input/imdb_demo_list_wff.parquet', columns)
     else:
         st.error('🚨 No data found or URL to scrape provided. Please provide a URL or use the Demo List.')
         raise Exception('No data found or URL to scrape provided. Please provide a URL or use the Demo List.')
@@ -88,6 +96,25 @@ def set_frame(load_demo: bool=False, url: Optional[str]=None):
     return frame        
 
 
+def set_cube():
+    '''Aggregate cube of the list in st.session_state.df_handle (see utils.frame_cube), or None when no list is shared, e.g. a demo loaded for just some columns.'''
+    handle = st.session_state.df_handle
+    return handle.cube() if handle is not None else None
+
+
+def set_adjusted_frame(frame: DataFrame, target_year: int) -> DataFrame:
+    '''frame with inflation adjusted gross for target_year.  For the list in st.session_state.df_handle that's the store's frame for the year,
+    shared by every session and keeping the shared frame's fingerprint path; otherwise the columns are added to frame.'''
+    handle = st.session_state.df_handle
+    return handle.adjusted(target_year) if handle is not None else add_gross_adj_cols(frame, target_year)
+
+
+def set_titles():
+    '''TitleIndex of the list in st.session_state.df_handle (see utils.title_index), or None when no list is shared.'''
+    handle = st.session_state.df_handle
+    return handle.titles() if handle is not None else None
+
+
 def get_movie_poster(title: str, width: int=200, height: int=300):
     '''Get the movie poster from OMDB API.
     title : str : the title of the movie
@@ -175,6 +202,12 @@ def plot_xy_radio_buttons(x_label: str='', y_label: str='', x_buttons: Sequence[
 
 
 
+def select_inflation_year(key: str='inflation_year_select') -> int:
+    '''Sidebar selector for the year inflation adjusted gross is shown in ("dollars as of year X").  Defaults to the latest year in the CPI data.'''
+    years = get_cpi_table().years[::-1]
+    return st.sidebar.selectbox('Dollars as of Year', years, index=0, key=key, help='Inflation adjusted gross is shown in dollars of this year.')
+
+
 def set_sidebar_menu():
     with st.sidebar:
         st.markdown('## IMDb Lists')
@@ -21,7 +21,7 @@ def show_avg_gross_per_genre(frame: pd.DataFrame) -> pd.DataFrame:
 
 def show_avg_combo_rating_per_primary_genre(frame: pd.DataFrame) -> pd.Series:
     '''Show average combo rating per genre'''
-    return frame.groupby('genre1')['combo'].mean().sort_values(ascending=False).round(1)
+    return frame.groupby('genre1', observed=True)['combo'].mean().sort_values(ascending=False).round(1)
 
 def show_avg_combo_rating_per_decade(frame: pd.DataFrame) -> pd.Series:
     '''Show average combo rating per decade'''
@@ -29,7 +29,7 @@ def show_avg_combo_rating_per_decade(frame: pd.DataFrame) -> pd.Series:
 
 def show_avg_combo_rating_per_director(frame: pd.DataFrame) -> pd.Series:
     '''Show average combo rating per director'''
-    return frame.groupby('director')['combo'].mean().sort_values(ascending=False).round(1)
+    return frame.groupby('director', observed=True)['combo'].mean().sort_values(ascending=False).round(1)
 
 def show_most_common_actors(frame: pd.DataFrame, n: int=10) -> pd.Series:
     '''Show most common actors and number of appearances'''
@@ -2,15 +2,16 @@ import pandas as pd
 from numpy import nan
 from datetime import datetime as dt
 from itertools import chain
-from re import sub
+import re
 from typing import Union
+from utils.inflation import get_cpi_table
 
 
 def adjust_for_inflation(dollars: Union[float, int], cpi_start_year: Union[str, int, float], cpi_target_year: Union[str, int, float]) -> float:
-    '''present_value = (dollars * cpi_target_year) / cpi_start_year'''
-
-    cpi = pd.read_csv('data/input/inflation_cpi_history.csv', dtype={'Year': int, 'CPI': float})
-
+    '''present_value = (dollars * cpi_target_year) / cpi_start_year
+    Scalar wrapper around the CPI table in utils.inflation, which is loaded once per process.
+    Use get_cpi_table().adjust() directly to adjust a whole column at once.
+    '''
     if isinstance(cpi_start_year, float):
         cpi_start_year = int(cpi_start_year)
     
@@ -27,22 +28,9 @@ def adjust_for_inflation(dollars: Union[float, int], cpi_start_year: Union[str,
             cpi_target_year = int(cpi_target_year)
         else:
             raise ValueError(f'cpi_target_year {cpi_target_year} must be an integer or a string of an integer.')
-    
-    ## temporarily cap max year at 2023 b/c it is the last year in the cpi data atm.
-    if cpi_target_year > cpi['Year'].max():
-        cpi_target_year = cpi['Year'].max() 
-    if cpi_start_year > cpi['Year'].max():
-        cpi_start_year = cpi['Year'].max()
-
-    ## temporarily cap min year at 1921 b/c it is the first year in the cpi data atm.
-    if cpi_target_year < cpi['Year'].min():
-        cpi_target_year = cpi['Year'].min() 
-    if cpi_start_year < cpi['Year'].min():
-        cpi_start_year = cpi['Year'].min()
-        
-    cpi = cpi.set_index('Year')
-    present_value = (dollars * cpi.loc[cpi_target_year]).div(cpi.loc[cpi_start_year]).round(2).item()
-    return present_value
+
+    ## years outside the CPI data (currently 1920 - 2023) are capped to its first/last year by the table
+    return get_cpi_table().adjust(dollars, cpi_start_year, cpi_target_year).item()
 
 
 def get_now() -> str:
@@ -95,6 +83,17 @@ def dummy_all_stars(frame: pd.DataFrame) -> pd.DataFrame:
     return pd.concat([frame, dummies.rename(lambda col: f"star_{col}", axis=1)], axis=1)
 
 
+## clean_film_name()'s substitutions, in order, compiled once
+FILM_NAME_SUBS = [
+    (re.compile(r'(\&a?m?p?;?)'), 'and'),      # replace '&' or '&amp;' with 'and'
+    (re.compile(r'\'n\s'), 'and'),            # replace 'n with "and"
+    (re.compile(r'\s?((T|t)he)\s'), ''),      # remove 'the' from the title
+    (re.compile(r'(p?a?rt)'), ''),            # remove 'part' or 'pt' from the title
+    (re.compile(r'[\'\,\-\:\.\!\"\?\·]+'), ''),    # remove punctuation
+    (re.compile(r'(\s| )+'), ''),             # finally, remove spaces
+]
+
+
 def clean_film_name(film: str) -> str:
     '''removes punctuation and converts to lowercase for easier comparison.
     Output: str
@@ -105,10 +104,14 @@ def clean_film_name(film: str) -> str:
     ## consider removing numbers for comparison too? Avoids '2' vs 'two' vs 'II' issues.
     ## but then also results in Godfather == Godfather2 == Godfather3 b/c the numbers are removed.
     film = film.strip().lower()
-    film = sub(r'(\&a?m?p?;?)', 'and', film)   # replace '&' or '&amp;' with 'and'
-    film = sub(r'\'n\s', 'and', film) # replace 'n with "and"
-    film = sub(r'\s?((T|t)he)\s', '', film) # remove 'the' from the title
-    film = sub(r'(p?a?rt)', '', film) # remove 'part' or 'pt' from the title
-    film = sub(r'[\'\,\-\:\.\!\"\?\·]+', '', film) # remove punctuation
-    film = sub(r'(\s| )+', '', film) # finally, remove spaces
-    return film
\ No newline at end of file
+    for pattern, repl in FILM_NAME_SUBS:
+        film = pattern.sub(repl, film)
+    return film
+
+
+def clean_film_names(films: pd.Series) -> pd.Series:
+    '''clean_film_name() of a whole column, e.g. the title_norm column a list is built with.  Missing titles stay missing.'''
+    films = films.astype(object).str.strip().str.lower()
+    for pattern, repl in FILM_NAME_SUBS:
+        films = films.str.replace(pattern, repl, regex=True)
+    return films
\ No newline at end of file